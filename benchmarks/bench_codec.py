@@ -0,0 +1,62 @@
+"""
+Compares the JSON codecs of reolinkapi.utils.codec on typical camera payloads.
+    PYTHONPATH=. python benchmarks/bench_codec.py [repeat]
+"""
+import json
+import os
+import sys
+import timeit
+
+from reolinkapi.utils.codec import CODECS, get_codec
+
+RESPONSES = os.path.join(os.path.dirname(__file__), os.pardir, "examples", "response")
+
+
+def _get_enc() -> list:
+    with open(os.path.join(RESPONSES, "GetEnc.json")) as f:
+        return json.load(f)
+
+
+def _get_ability() -> list:
+    """A GetAbility answer is a few hundred small permission dicts per channel."""
+    permission = {"permit": 6, "ver": 1}
+    channel = {f"ability{i}": dict(permission) for i in range(120)}
+    return [{"cmd": "GetAbility", "code": 0, "value": {"Ability": {
+        "abilityChn": [dict(channel) for _ in range(16)],
+        **{f"global{i}": dict(permission) for i in range(80)},
+    }}}]
+
+
+def _search() -> list:
+    """A day of recordings, as returned by Search."""
+    files = [{
+        "StartTime": {"year": 2024, "mon": 8, "day": 12, "hour": h, "min": m, "sec": 0},
+        "EndTime": {"year": 2024, "mon": 8, "day": 12, "hour": h, "min": m + 4, "sec": 59},
+        "frameRate": 0, "height": 0, "width": 0, "size": 12_345_678, "type": "main",
+        "name": f"Mp4Record/2024-08-12/RecM13_20240812_{h:02}{m:02}00_{h:02}{m + 4:02}59_6D28808_DE.mp4",
+    } for h in range(24) for m in range(0, 60, 5)]
+    return [{"cmd": "Search", "code": 0, "value": {"SearchResult": {"channel": 0, "File": files}}}]
+
+
+PAYLOADS = {"GetEnc": _get_enc(), "GetAbility": _get_ability(), "Search": _search()}
+
+
+def main(repeat: int = 200) -> None:
+    codecs = []
+    for name in CODECS:
+        codec = get_codec(name)
+        if codec.name != name:
+            print(f"{name}: not installed, skipped")
+            continue
+        codecs.append(codec)
+    print(f"{'payload':<12}{'codec':<8}{'bytes':>9}{'dumps us':>11}{'loads us':>11}")
+    for payload_name, payload in PAYLOADS.items():
+        for codec in codecs:
+            encoded = codec.dumps(payload)
+            dumps = timeit.timeit(lambda: codec.dumps(payload), number=repeat) / repeat * 1e6
+            loads = timeit.timeit(lambda: codec.loads(encoded), number=repeat) / repeat * 1e6
+            print(f"{payload_name:<12}{codec.name:<8}{len(encoded):>9}{dumps:>11.1f}{loads:>11.1f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,45 @@
+"""
+Decodes a month of recording names one by one with parse_filename and in bulk with decode_filenames,
+then filters the person-triggered clips.
+    PYTHONPATH=. python benchmarks/bench_filenames.py [days]
+"""
+import random
+import sys
+import time
+
+from reolinkapi.utils.filenames import decode_filenames, parse_filename
+
+
+def names(days: int) -> list:
+    """A clip every two minutes, a fifth of them with a person."""
+    rng = random.Random(0)
+    out = []
+    for day in range(1, days + 1):
+        for minute in range(0, 24 * 60, 2):
+            h, m = divmod(minute, 60)
+            flags = 0x1F1E808 | (0x400 if rng.random() < 0.2 else 0)
+            out.append(f"Mp4Record/2024-08-{day:02}/RecM13_DST202408{day:02}_{h:02}{m:02}00_{h:02}{m:02}59_"
+                       f"{flags:X}_{rng.randrange(1 << 24):X}.mp4")
+    return out
+
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<34}{(time.perf_counter() - start) * 1000:9.1f} ms")
+    return result
+
+
+def main(days: int = 31) -> None:
+    files = names(days)
+    print(f"{len(files)} names")
+    timed("parse_filename, one by one", lambda: [parse_filename(f) for f in files])
+    table = timed("decode_filenames", lambda: decode_filenames(files))
+    timed("first select, imports NumPy", lambda: table.select(ai_pd=1))
+    timed("select ai_pd=1", lambda: table.select(ai_pd=1))
+    people = timed("filter ai_pd=1", lambda: table.filter(ai_pd=1))
+    print(f"{len(people)} person clips")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,57 @@
+"""
+Compares a new array per decoded frame plus a resize and colour conversion allocating their outputs, with
+decoding into a FramePool and running the FrameTransform stage into pooled buffers.
+Decoding is simulated by filling the target array, as VideoCapture.read(image) does.
+    PYTHONPATH=. python benchmarks/bench_frame_pool.py [frames] [width] [height]
+"""
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from reolinkapi.utils.frame_pool import FramePool, FrameTransform
+
+SIZE = (640, 360)
+
+
+def decode(index: int, image=None, shape=None):
+    frame = np.empty(shape, dtype=np.uint8) if image is None else image
+    frame.fill(index % 256)
+    return frame
+
+
+def allocating(frames: int, shape: tuple) -> None:
+    for index in range(frames):
+        frame = decode(index, shape=shape)
+        cv2.cvtColor(cv2.resize(frame, SIZE), cv2.COLOR_BGR2RGB)
+
+
+def pooled(frames: int, shape: tuple) -> None:
+    transform = FrameTransform(SIZE, cv2.COLOR_BGR2RGB)
+    pool = FramePool(4, transform.output_shape(shape))
+    scratch = np.empty(shape, dtype=np.uint8)
+    for index in range(frames):
+        frame = decode(index, image=scratch)
+        with pool.acquire() as out:
+            transform.apply(frame, out.array)
+
+
+def timed(label: str, fn, frames: int) -> None:
+    start = time.perf_counter()
+    cpu = time.process_time()
+    fn()
+    elapsed = time.perf_counter() - start
+    cpu_per_frame = (time.process_time() - cpu) * 1000 / frames
+    print(f"{label:<28}{frames / elapsed:9.1f} frames/s {cpu_per_frame:7.2f} ms CPU/frame")
+
+
+def main(frames: int = 200, width: int = 3840, height: int = 2160) -> None:
+    shape = (height, width, 3)
+    print(f"{frames} frames of {width}x{height} to {SIZE[0]}x{SIZE[1]} RGB")
+    timed("new arrays", lambda: allocating(frames, shape), frames)
+    timed("pool + in-place transform", lambda: pooled(frames, shape), frames)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,49 @@
+"""
+Measures the time of `import reolinkapi` in fresh interpreters and checks it against a budget.
+The optional dependencies (OpenCV, Pillow, NumPy, aiohttp) must not be loaded by the import.
+    PYTHONPATH=. python benchmarks/bench_import.py [runs] [budget_ms]
+Exits with status 1 when the median import time exceeds the budget or a heavy module was loaded.
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+# Milliseconds, measured from inside the interpreter so that its own startup is not counted
+DEFAULT_BUDGET_MS = 250
+HEAVY_MODULES = ("cv2", "PIL", "numpy", "aiohttp")
+
+SCRIPT = f"""
+import sys, time
+start = time.perf_counter()
+import reolinkapi
+elapsed = (time.perf_counter() - start) * 1000
+print(elapsed, ",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))
+"""
+
+
+def measure() -> tuple:
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    out = subprocess.run([sys.executable, "-c", SCRIPT], env=env, check=True, capture_output=True, text=True)
+    elapsed, _, loaded = out.stdout.strip().partition(" ")
+    return float(elapsed), [m for m in loaded.split(",") if m]
+
+
+def main(runs: int = 10, budget_ms: float = DEFAULT_BUDGET_MS) -> int:
+    timings = []
+    loaded = set()
+    for _ in range(runs):
+        elapsed, heavy = measure()
+        timings.append(elapsed)
+        loaded.update(heavy)
+    median = statistics.median(timings)
+    print(f"import reolinkapi: median {median:.1f} ms, min {min(timings):.1f} ms over {runs} runs "
+          f"(budget {budget_ms:.0f} ms)")
+    if loaded:
+        print("heavy modules loaded on import:", ", ".join(sorted(loaded)))
+    return 0 if median <= budget_ms and not loaded else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(float(arg) if i else int(arg) for i, arg in enumerate(sys.argv[1:]))))
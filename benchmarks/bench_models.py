@@ -0,0 +1,46 @@
+"""
+Memory held by raw Search responses versus their SearchResult models, and the cost of converting.
+    PYTHONPATH=. python benchmarks/bench_models.py [responses]
+"""
+import json
+import sys
+import time
+import tracemalloc
+
+from reolinkapi.models import SearchResult
+
+
+def _search_response() -> bytes:
+    """A day of recordings, as returned by Search."""
+    files = [{
+        "StartTime": {"year": 2024, "mon": 8, "day": 12, "hour": h, "min": m, "sec": 0},
+        "EndTime": {"year": 2024, "mon": 8, "day": 12, "hour": h, "min": m + 4, "sec": 59},
+        "frameRate": 0, "height": 1440, "width": 2560, "size": "12345678", "type": "main",
+        "name": f"Mp4Record/2024-08-12/RecM13_20240812_{h:02}{m:02}00_{h:02}{m + 4:02}59_6D28808_DE.mp4",
+    } for h in range(24) for m in range(0, 60, 5)]
+    return json.dumps([{"cmd": "Search", "code": 0, "value": {"SearchResult": {"channel": 0, "File": files}}}]
+                      ).encode()
+
+
+def _held(build) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size, elapsed
+
+
+def main(responses: int = 200) -> None:
+    body = _search_response()
+    raw_size, raw_time = _held(lambda: [json.loads(body) for _ in range(responses)])
+    model_size, model_time = _held(lambda: [SearchResult.from_response(json.loads(body)) for _ in range(responses)])
+    print(f"{responses} Search responses of 288 files")
+    print(f"raw dicts:    {raw_size / 2 ** 20:8.1f} MiB  {raw_time * 1000:8.1f} ms")
+    print(f"SearchResult: {model_size / 2 ** 20:8.1f} MiB  {model_time * 1000:8.1f} ms (decode + convert)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
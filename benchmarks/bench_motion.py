@@ -0,0 +1,67 @@
+"""
+Parses a month of motion search results with the original get_motion_files parser, the current one and
+MotionEvents, and reports time and retained memory.
+    PYTHONPATH=. python benchmarks/bench_motion.py [days]
+"""
+import copy
+import sys
+import time
+import tracemalloc
+from datetime import datetime as dt
+
+from reolinkapi.mixins.motion import MotionAPIMixin
+from reolinkapi.utils.motion import MotionEvents
+
+
+def legacy_process_motion_files(motion_files):
+    """The parser as it was before MotionEvents: renames keys in place and builds datetimes with dt(**raw)."""
+    processed_motions = []
+    replace_fields = {'mon': 'month', 'sec': 'second', 'min': 'minute'}
+    for file in motion_files:
+        time_range = {}
+        for x in ['Start', 'End']:
+            raw = file[f'{x}Time']
+            for k, v in replace_fields.items():
+                if k in raw.keys():
+                    raw[v] = raw.pop(k)
+            time_range[x.lower()] = dt(**raw)
+        start, end = time_range.values()
+        processed_motions.append({'start': start, 'end': end, 'filename': file['name']})
+    return processed_motions
+
+
+def search_files(days: int) -> list:
+    """One 5 minute recording every 5 minutes, the busiest a camera gets."""
+    return [{
+        "StartTime": {"year": 2024, "mon": 8, "day": d, "hour": h, "min": m, "sec": 0},
+        "EndTime": {"year": 2024, "mon": 8, "day": d, "hour": h, "min": m + 4, "sec": 59},
+        "frameRate": 0, "height": 0, "width": 0, "size": "12345678", "type": "sub",
+        "name": f"Mp4Record/2024-08-{d:02}/RecS03_202408{d:02}_{h:02}{m:02}00_{h:02}{m + 4:02}59_6D28808_DE.mp4",
+    } for d in range(1, days + 1) for h in range(24) for m in range(0, 60, 5)]
+
+
+def run(name: str, parse, files: list, repeat: int = 5) -> None:
+    # The legacy parser mutates its input, give every run its own copy
+    copies = [copy.deepcopy(files) for _ in range(repeat + 1)]
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        parse(copies[i])
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    result = parse(copies[-1])
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<22}{min(timings) * 1000:10.1f} ms{size / 2 ** 20:10.2f} MiB  ({len(result)} events)")
+
+
+def main(days: int = 31) -> None:
+    files = search_files(days)
+    print(f"{len(files)} files: best parse time, memory held by the result")
+    run("legacy dicts", legacy_process_motion_files, files)
+    run("get_motion_files", MotionAPIMixin._process_motion_files, files)
+    run("MotionEvents", MotionEvents.from_search, files)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
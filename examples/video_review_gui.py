@@ -4,13 +4,13 @@
 import os
 import signal
 import sys
-import re
 import datetime
 import subprocess
 import argparse
 from configparser import RawConfigParser
 from datetime import datetime as dt, timedelta
 from reolinkapi import Camera
+from reolinkapi.utils.filenames import parse_filename as decode_filename
 from PyQt6.QtWidgets import QApplication, QVBoxLayout, QHBoxLayout, QWidget, QTableWidget, QTableWidgetItem, QPushButton, QLabel, QFileDialog, QHeaderView, QStyle, QSlider, QStyleOptionSlider, QSplitter, QTreeWidget, QTreeWidgetItem, QTreeWidgetItemIterator
 from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
 from PyQt6.QtMultimediaWidgets import QVideoWidget
@@ -25,87 +25,19 @@ def path_name_from_camera_path(fname):
    # Mp4Record/2024-08-12/RecM13_DST20240812_214255_214348_1F1E828_4DDA4D.mp4
    return fname.replace('/', '_')
 
-# Function to decode hex values into individual flags
-def decode_hex_to_flags(hex_value):
-    flags_mapping = {
-        'resolution_index': (21, 7), 
-        'tv_system': (20, 1),        
-        'framerate': (13, 7),        
-        'audio_index': (11, 2),      
-        'ai_pd': (10, 1),          # person  
-        'ai_fd': (9, 1),              # face
-        'ai_vd': (8, 1),             # vehicle
-        'ai_ad': (7, 1),             # animal
-        'encoder_type_index': (5, 2),
-        'is_schedule_record': (4, 1), #scheduled
-        'is_motion_record': (3, 1),  # motion detected
-        'is_rf_record': (2, 1),      
-        'is_doorbell_press_record': (1, 1),
-        'ai_other': (0, 1)               
-    }
-    hex_value = int(hex_value, 16)  # Convert hex string to integer
-    flag_values = {}
-    for flag, (bit_position, bit_size) in flags_mapping.items():
-        mask = ((1 << bit_size) - 1) << bit_position
-        flag_values[flag] = (hex_value & mask) >> bit_position
-    return flag_values
-
 def parse_filename(file_name):
     #  Mp4Record_2024-08-12_RecM13_DST20240812_214255_214348_1F1E828_4DDA4D.mp4
     #  Mp4Record_2024-09-13-RecS09_DST20240907_084519_084612_0_55289080000000_307BC0.mp4
-    # https://github.com/sven337/ReolinkLinux/wiki/Figuring-out-the-file-names#file-name-structure
-    pattern = r'.*?Mp4Record_(\d{4}-\d{2}-\d{2})_Rec[MS](\d)(\d)_(DST)?(\d{8})_(\d{6})_(\d{6})'
-    v3_suffix = r'.*_(\w{4,8})_(\w{4,8})\.mp4'
-    v9_suffix = r'.*_(\d)_(\w{7})(\w{7})_(\w{1,8})\.mp4'
-    match = re.match(pattern, file_name)
-
-    out = {}
-    version = 0
-
-    if match:
-        date = match.group(1)  # YYYY-MM-DD
-        channel = int(match.group(2))  
-        version = int(match.group(3)) # version
-        start_date = match.group(5)  # YYYYMMDD
-        start_time = match.group(6)  # HHMMSS
-        end_time = match.group(7)  # HHMMSS
-
-        # Combine date and start time into a datetime object
-        start_datetime = datetime.datetime.strptime(f"{start_date} {start_time}", "%Y%m%d %H%M%S")
-        
-        out = {'start_datetime': start_datetime, 'channel': channel, 'end_time': end_time }
-    else:
-        print("parse error")
+    decoded = decode_filename(file_name)
+    if decoded is None:
+        print(f"parse error for {file_name}")
         return None
-       
-    if version == 9:
-        match = re.match(v9_suffix, file_name)
-        if not match:
-            print(f"v9 parse error for {file_name}")
-            return None
-
-        animal_type = match.group(1)
-        flags_hex1 = match.group(2)
-        flags_hex2 = match.group(3)
-        file_size = int(match.group(4), 16)
-
-        triggers = decode_hex_to_flags(flags_hex1)
-
-        out.update({'animal_type' : animal_type, 'file_size' : file_size, 'triggers' : triggers })
-
-    elif version == 2 or version == 3:
-        match = re.match(v3_suffix, file_name)
-        if not match:
-            print(f"v3 parse error for {file_name}")
-            return None
-
-        flags_hex = match.group(1)
-        file_size = int(match.group(2), 16)
-
-        triggers = decode_hex_to_flags(flags_hex)
-
-        out.update({'file_size' : file_size, 'triggers' : triggers })
 
+    out = {'start_datetime': decoded.start, 'channel': decoded.channel, 'end_time': decoded.end.strftime("%H%M%S")}
+    if decoded.flags is not None:
+        out.update({'file_size': decoded.size, 'triggers': decoded.triggers})
+    if decoded.animal_type is not None:
+        out['animal_type'] = str(decoded.animal_type)
     return out
 
 class ClickableSlider(QSlider):
@@ -1,4 +1,7 @@
 from reolinkapi.handlers.api_handler import APIHandler
 from .camera import Camera
+from .async_camera import AsyncCamera
+from .download_manager import DownloadManager
+from .camera_pool import CameraPool, PoolResult
 
 __version__ = "0.4.1"
@@ -0,0 +1,39 @@
+from reolinkapi.handlers.async_api_handler import AsyncAPIHandler
+
+
+class AsyncCamera(AsyncAPIHandler):
+
+    def __init__(self, ip: str,
+                 username: str = "admin",
+                 password: str = "",
+                 https: bool = False,
+                 profile: str = "main",
+                 **kwargs):
+        """
+        Initialise the AsyncCamera object by passing the ip address.
+        Logging in needs the event loop, so it is never done here. Either await cam.login() or use the
+        camera as an async context manager, which logs in on enter and logs out and closes the connections on exit:
+            async with AsyncCamera("192.168.1.10", "admin", "pass") as cam:
+                info = await cam.get_information()
+        :param ip:
+        :param username:
+        :param password:
+        :param https: connect to the camera over https
+        :param proxy: Add a proxy dict, eg: {"http": "http://127.0.0.1:8000"}
+        :param session: use an existing aiohttp.ClientSession instead of the camera's own connection pool
+        :param pool_size: maximum number of connections kept open to the camera
+        :param verify: TLS verification for https, either a bool or a path to a CA bundle
+        """
+        if profile not in ["main", "sub"]:
+            raise Exception("Profile argument must be either \"main\" or \"sub\"")
+
+        AsyncAPIHandler.__init__(self, ip, username, password, https=https, **kwargs)
+        self.profile = profile
+
+    async def __aenter__(self) -> "AsyncCamera":
+        await self.login()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.logout()
+        await self.close()
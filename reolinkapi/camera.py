@@ -23,6 +23,13 @@ class Camera(APIHandler):
         :param proxy: Add a proxy dict for requests to consume.
         eg: {"http":"socks5://[username]:[password]@[host]:[port], "https": ...}
         More information on proxies in requests: https://stackoverflow.com/a/15661226/9313679
+        :param session: use an existing requests.Session instead of the camera's own connection pool
+        :param pool_size: maximum number of keep-alive connections kept open to the camera
+        :param verify: TLS verification for https, either a bool or a path to a CA bundle
+        :param cache: cache the responses of read-only commands such as get_information, True for the default
+        TTLs or a reolinkapi.handlers.cache.ResponseCache
+        :param codec: JSON codec for request and response bodies: "json" (default), "orjson", "ujson" or "auto"
+        :param timeout: seconds to wait for the camera on each command, None (default) to wait forever
         """
         if profile not in ["main", "sub"]:
             raise Exception("Profile argument must be either \"main\" or \"sub\"")
@@ -0,0 +1,190 @@
+import asyncio
+import threading
+import time
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+
+class PoolResult:
+    """
+    Outcome of a call across a CameraPool.
+    `results` maps camera names to what the call returned, `errors` maps camera names to the exception raised,
+    a TimeoutError for the cameras that did not answer in time.
+    """
+    __slots__ = ("results", "errors")
+
+    def __init__(self):
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, Exception] = {}
+
+    def ok(self) -> bool:
+        """:return: whether every camera answered"""
+        return not self.errors
+
+    def __repr__(self) -> str:
+        return f"PoolResult(results={len(self.results)}, errors={sorted(self.errors)})"
+
+
+class CameraPool:
+    """
+    Runs API calls on many cameras concurrently.
+        pool = CameraPool([Camera(ip, user, password, defer_login=True) for ip in ips], timeout=5)
+        inventory = pool.call("get_information")
+        inventory.results["192.168.1.10"], inventory.errors
+
+    Cameras that are not logged in yet are logged in on their first call, in parallel.
+    A whole call takes about as long as the slowest camera (or the timeout), not the sum of them.
+    Cameras answering after the timeout are reported as TimeoutError. Their requests are sent with the same
+    timeout, so a camera that does not answer frees its worker for the cameras queued behind it.
+    Pools of AsyncCamera are driven from an event loop with `await pool.acall(...)`.
+    """
+
+    def __init__(self, cameras: Union[Iterable[Any], Dict[str, Any]] = (), max_workers: int = 32,
+                 timeout: Optional[float] = 10):
+        """
+        :param cameras: the cameras, either a dict of name -> camera or an iterable named by their ip
+        :param max_workers: threads running calls at once
+        :param timeout: default seconds allowed to each camera per call, None to wait forever
+        """
+        self.cameras: Dict[str, Any] = {}
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        items = cameras.items() if isinstance(cameras, dict) else ((None, cam) for cam in cameras)
+        for name, camera in items:
+            self.add(camera, name)
+
+    def add(self, camera: Any, name: str = None) -> str:
+        """
+        :param camera: a Camera, preferably created with defer_login=True
+        :param name: defaults to the camera's ip
+        :return: the camera's name in the pool
+        """
+        name = camera.ip if name is None else name
+        self.cameras[name] = camera
+        return name
+
+    def remove(self, name: str) -> Any:
+        return self.cameras.pop(name)
+
+    def __len__(self) -> int:
+        return len(self.cameras)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="CameraPool")
+            return self._executor
+
+    def map(self, fn: Callable[[Any], Any], timeout: Optional[float] = None, login: bool = True) -> PoolResult:
+        """
+        Run fn(camera) for every camera in the pool.
+        :param fn: called with each camera on a worker thread
+        :param timeout: seconds allowed to each camera, counted from when its call starts. Defaults to the pool's.
+        :param login: log in the cameras that have no token first
+        :return: PoolResult
+        """
+        timeout = self.timeout if timeout is None else timeout
+        started: Dict[str, float] = {}
+
+        def run(name: str, camera: Any) -> Any:
+            started[name] = time.monotonic()
+            scope = getattr(getattr(camera, "transport", None), "timeout_scope", None)
+            with nullcontext() if scope is None or timeout is None else scope(timeout):
+                if login and camera.token is None and not camera.login():
+                    raise ConnectionError(f"Could not log in to {name}")
+                return fn(camera)
+
+        executor = self._get_executor()
+        futures = {executor.submit(run, name, camera): name for name, camera in self.cameras.items()}
+        result = PoolResult()
+        pending = set(futures)
+        while pending:
+            wait_for = None
+            if timeout is not None:
+                # Cameras still queued behind busy workers have no deadline yet, check back on them regularly
+                now = time.monotonic()
+                deadlines = [started[futures[f]] + timeout - now for f in pending if futures[f] in started]
+                wait_for = max(0.0, min(deadlines + [0.05]))
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    result.results[futures[future]] = future.result()
+                else:
+                    result.errors[futures[future]] = error
+            if timeout is not None:
+                now = time.monotonic()
+                for future in [f for f in pending if futures[f] in started and now - started[futures[f]] >= timeout]:
+                    pending.discard(future)
+                    future.cancel()
+                    result.errors[futures[future]] = TimeoutError(f"{futures[future]} did not answer in {timeout}s")
+        return result
+
+    def call(self, method: str, *args, timeout: Optional[float] = None, **kwargs) -> PoolResult:
+        """
+        Call an API method on every camera, eg: pool.call("get_hdd_info")
+        :param method: name of the camera method
+        :param timeout: seconds allowed to each camera. Defaults to the pool's.
+        :return: PoolResult
+        """
+        return self.map(lambda camera: getattr(camera, method)(*args, **kwargs), timeout=timeout)
+
+    def login(self, timeout: Optional[float] = None) -> PoolResult:
+        """
+        Log in every camera that has no token yet, in parallel.
+        :return: PoolResult of the login results
+        """
+        return self.map(lambda camera: True, timeout=timeout)
+
+    async def acall(self, method: str, *args, timeout: Optional[float] = None, limit: Optional[int] = None,
+                    **kwargs) -> PoolResult:
+        """
+        Await an API method on every AsyncCamera of the pool.
+        :param method: name of the camera method
+        :param timeout: seconds allowed to each camera. Defaults to the pool's.
+        :param limit: maximum number of cameras called at once. Defaults to max_workers.
+        :return: PoolResult
+        """
+        timeout = self.timeout if timeout is None else timeout
+        semaphore = asyncio.Semaphore(limit or self.max_workers)
+
+        async def run(camera: Any) -> Any:
+            if camera.token is None and not await camera.login():
+                raise ConnectionError(f"Could not log in to {camera.ip}")
+            return await getattr(camera, method)(*args, **kwargs)
+
+        async def bounded(camera: Any) -> Any:
+            async with semaphore:
+                return await asyncio.wait_for(run(camera), timeout)
+
+        names = list(self.cameras)
+        outcomes = await asyncio.gather(*(bounded(self.cameras[name]) for name in names), return_exceptions=True)
+        result = PoolResult()
+        for name, outcome in zip(names, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                result.errors[name] = TimeoutError(f"{name} did not answer in {timeout}s")
+            elif isinstance(outcome, BaseException):
+                result.errors[name] = outcome
+            else:
+                result.results[name] = outcome
+        return result
+
+    def close(self) -> None:
+        """Stop the worker threads and release the cameras' connections."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        for camera in self.cameras.values():
+            close = getattr(camera, "close", None)
+            if close is not None and not asyncio.iscoroutinefunction(close):
+                close()
+
+    def __enter__(self) -> "CameraPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
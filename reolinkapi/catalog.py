@@ -0,0 +1,213 @@
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, List, Optional, Tuple, Union
+
+from reolinkapi.utils.filenames import decode_filenames
+from reolinkapi.utils.motion import MotionEvents, from_epoch, to_epoch
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    camera TEXT NOT NULL,
+    channel INTEGER NOT NULL,
+    stream TEXT NOT NULL,
+    source TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (camera, channel, stream, source, filename)
+);
+CREATE INDEX IF NOT EXISTS recordings_by_time ON recordings (camera, channel, stream, source, start);
+CREATE TABLE IF NOT EXISTS synced (
+    camera TEXT NOT NULL,
+    channel INTEGER NOT NULL,
+    stream TEXT NOT NULL,
+    source TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS synced_by_key ON synced (camera, channel, stream, source);
+"""
+
+Window = Tuple[int, int]
+
+
+class RecordingCatalog:
+    """
+    Local SQLite index of the recordings of cameras, filled incrementally.
+        catalog = RecordingCatalog("recordings.db")
+        week = catalog.query(cam, datetime.now() - timedelta(days=7))
+
+    The catalog remembers which time windows it already searched, per camera, channel, stream and source,
+    and only asks the camera for the parts of a query it has not seen. Past windows never change, but the
+    last `settle` seconds before now may still be recording: they are searched again on every query.
+    Times are the camera's local time, stored as naive epoch seconds (see utils/motion.py).
+
+    Sources:
+        "motion": get_motion_events (Search), with exact start and end times and sizes
+        "playback": get_playback_files (NvrDownload), which only lists filenames: times and sizes are
+            decoded from the names (utils/filenames.py), unknown names keep the bounds of their search window
+    Only synchronous cameras are supported.
+    """
+
+    SOURCES = ("motion", "playback")
+
+    def __init__(self, path: str = ":memory:", settle: float = 600):
+        """
+        :param path: SQLite database file, ":memory:" for a catalog that lasts as long as the object
+        :param settle: seconds before now during which recordings may still change
+        """
+        self.path = path
+        self.settle = settle
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "RecordingCatalog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @staticmethod
+    def _name(camera: Any) -> str:
+        return camera if isinstance(camera, str) else camera.ip
+
+    def synced(self, camera: Any, channel: int = 0, stream: str = 'sub', source: str = 'motion') -> List[Window]:
+        """:return: the (start, end) epoch windows already searched, merged and in order"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT start, end FROM synced WHERE camera=? AND channel=? AND stream=? AND source=? "
+                "ORDER BY start", (self._name(camera), channel, stream, source)).fetchall()
+        return [(start, end) for start, end in rows]
+
+    def missing(self, camera: Any, start: Union[datetime, float], end: Union[datetime, float],
+                channel: int = 0, stream: str = 'sub', source: str = 'motion') -> List[Window]:
+        """:return: the (start, end) epoch windows of [start, end] the catalog has not searched yet"""
+        start, end = int(to_epoch(start)), int(to_epoch(end))
+        gaps = []
+        cursor = start
+        for synced_start, synced_end in self.synced(camera, channel, stream, source):
+            if synced_end < cursor:
+                continue
+            if synced_start > end:
+                break
+            if synced_start > cursor:
+                gaps.append((cursor, synced_start))
+            cursor = max(cursor, synced_end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def sync(self, camera: Any, start: Union[datetime, float], end: Union[datetime, float, None] = None,
+             channel: int = 0, stream: str = 'sub', source: str = 'motion') -> int:
+        """
+        Search the camera for the parts of [start, end] the catalog has not searched yet.
+        :param camera: a logged in Camera
+        :param start: datetime or naive epoch seconds
+        :param end: defaults to now
+        :param channel: channel to search
+        :param stream: 'main' or 'sub'
+        :param source: "motion" or "playback"
+        :return: the number of recordings found
+        """
+        if source not in self.SOURCES:
+            raise ValueError(f"Unknown source {source!r}, expected one of {self.SOURCES}")
+        settled = int(to_epoch(datetime.now())) - int(self.settle)
+        end = datetime.now() if end is None else end
+        found = 0
+        for window_start, window_end in self.missing(camera, start, end, channel, stream, source):
+            rows = self._search(camera, window_start, window_end, channel, stream, source)
+            with self._lock, self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO recordings (camera, channel, stream, source, filename, start, end, size) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(self._name(camera), channel, stream, source, *row) for row in rows])
+                if min(window_end, settled) > window_start:
+                    self._mark_synced(self._name(camera), channel, stream, source,
+                                      (window_start, min(window_end, settled)))
+            found += len(rows)
+        return found
+
+    def _search(self, camera: Any, start: int, end: int, channel: int, stream: str,
+                source: str) -> List[Tuple[str, int, int, int]]:
+        """
+        :return: (filename, start, end, size) rows found by the camera in the window
+        :raises ResponseError: if the camera answered with an error, so that the window is not marked searched
+        """
+        # Strict searches: an error answered like an empty search must not mark the window as searched
+        if source == 'motion':
+            events = camera.get_motion_events(from_epoch(start), from_epoch(end), streamtype=stream,
+                                              channel=channel, strict=True)
+            return list(zip(events.filenames, events.starts, events.ends, events.sizes))
+        files = camera.get_playback_files(from_epoch(start), from_epoch(end), channel=channel, streamtype=stream,
+                                          strict=True)
+        decoded = decode_filenames(files)
+        rows = list(zip(decoded.filenames, decoded.starts, decoded.ends,
+                        (max(size, 0) for size in decoded.sizes)))
+        # Names in an unknown format keep the bounds of the window they were found in
+        return rows + [(name, start, end, 0) for name in decoded.invalid]
+
+    def _mark_synced(self, name: str, channel: int, stream: str, source: str, window: Window) -> None:
+        """Record a searched window, merged with the windows it touches. Called with the lock held."""
+        key = (name, channel, stream, source)
+        start, end = window
+        touching = self._db.execute(
+            "SELECT rowid, start, end FROM synced WHERE camera=? AND channel=? AND stream=? AND source=? "
+            "AND start <= ? AND end >= ?", (*key, end, start)).fetchall()
+        for _, other_start, other_end in touching:
+            start, end = min(start, other_start), max(end, other_end)
+        self._db.executemany("DELETE FROM synced WHERE rowid=?", [(rowid,) for rowid, _, _ in touching])
+        self._db.execute("INSERT INTO synced (camera, channel, stream, source, start, end) VALUES (?, ?, ?, ?, ?, ?)",
+                         (*key, start, end))
+
+    def recordings(self, camera: Any, start: Union[datetime, float, None] = None,
+                   end: Union[datetime, float, None] = None, channel: int = 0, stream: str = 'sub',
+                   source: str = 'motion') -> MotionEvents:
+        """
+        The recordings of the catalog overlapping [start, end], without asking the camera.
+        :param camera: a Camera or its ip
+        :return: MotionEvents in time order
+        """
+        sql = "SELECT start, end, filename, size FROM recordings WHERE camera=? AND channel=? AND stream=? AND source=?"
+        args: list = [self._name(camera), channel, stream, source]
+        if end is not None:
+            sql += " AND start < ?"
+            args.append(int(to_epoch(end)))
+        if start is not None:
+            sql += " AND end > ?"
+            args.append(int(to_epoch(start)))
+        with self._lock:
+            rows = self._db.execute(sql + " ORDER BY start, filename", args).fetchall()
+        return MotionEvents(*zip(*rows)) if rows else MotionEvents()
+
+    def query(self, camera: Any, start: Union[datetime, float], end: Union[datetime, float, None] = None,
+              channel: int = 0, stream: str = 'sub', source: str = 'motion') -> MotionEvents:
+        """
+        Sync the missing parts of [start, end], then answer from the catalog.
+        :return: MotionEvents in time order
+        """
+        end = datetime.now() if end is None else end
+        self.sync(camera, start, end, channel, stream, source)
+        return self.recordings(camera, start, end, channel, stream, source)
+
+    def forget(self, camera: Any, before: Optional[Union[datetime, float]] = None) -> None:
+        """
+        Drop what the catalog knows of a camera, eg: after its SD card was formatted.
+        :param before: only drop the recordings and searched windows ending before that time
+        """
+        name = self._name(camera)
+        with self._lock, self._db:
+            if before is None:
+                self._db.execute("DELETE FROM recordings WHERE camera=?", (name,))
+                self._db.execute("DELETE FROM synced WHERE camera=?", (name,))
+                return
+            before = int(to_epoch(before))
+            self._db.execute("DELETE FROM recordings WHERE camera=? AND end <= ?", (name, before))
+            self._db.execute("DELETE FROM synced WHERE camera=? AND end <= ?", (name, before))
+            self._db.execute("UPDATE synced SET start=? WHERE camera=? AND start < ?", (before, name, before))
@@ -0,0 +1,191 @@
+import heapq
+import itertools
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+
+class DownloadJob:
+    """A file queued on a DownloadManager."""
+    __slots__ = ("camera", "filename", "output_path", "priority", "options", "future", "_seq")
+
+    def __init__(self, camera: Any, filename: str, output_path: str, priority: float, options: Dict):
+        self.camera = camera
+        self.filename = filename
+        self.output_path = output_path
+        self.priority = priority
+        self.options = options
+        self.future: Future = Future()
+        self._seq = None
+
+    def __repr__(self) -> str:
+        return f"DownloadJob({self.filename!r}, priority={self.priority})"
+
+
+class DownloadManager:
+    """
+    Downloads recordings with get_file on a pool of worker threads.
+        manager = DownloadManager(max_workers=4, per_camera=2)
+        future = manager.submit(cam, "Mp4Record/2024-08-12/RecM13_....mp4", "/tmp/clip.mp4")
+        manager.reprioritise(future, -1)  # the user wants to watch this one now
+        future.result()  # what get_file returned
+
+    Queued jobs run in priority order, lower values first, then in submission order.
+    At most max_workers files are downloaded at once, and at most per_camera from the same camera.
+    Cancel a queued job with future.cancel(). A job whose output_path already exists is skipped
+    (get_file only creates output_path once the file is complete) and its future resolves to True.
+    """
+
+    def __init__(self, max_workers: int = 4, per_camera: int = 1, **get_file_options):
+        """
+        :param max_workers: maximum number of downloads running at once
+        :param per_camera: maximum number of downloads running at once on the same camera
+        :param get_file_options: default get_file arguments for every job, eg: method='Download', resume=True
+        """
+        self.max_workers = max_workers
+        self.per_camera = per_camera
+        self.get_file_options = get_file_options
+        self._queue: List[tuple] = []
+        self._jobs: Dict[str, DownloadJob] = {}
+        self._active: Dict[int, int] = {}
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        self._shutdown = False
+
+    def submit(self, camera: Any, filename: str, output_path: str, priority: float = 0, **options) -> Future:
+        """
+        Queue a download.
+        Submitting an output_path that is already queued returns the queued job's future, moved up to
+        `priority` if that is more urgent.
+        :param camera: the Camera to download from
+        :param filename: the name of the file on the camera
+        :param output_path: where to save the file
+        :param priority: lower values are downloaded first
+        :param options: get_file arguments for this job, overriding the manager's defaults
+        :return: a Future resolving to the result of get_file
+        """
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("cannot submit a download after shutdown")
+            queued = self._jobs.get(output_path)
+            if queued is not None and not queued.future.done():
+                if priority < queued.priority and not queued.future.running():
+                    self._push(queued, priority)
+                return queued.future
+            job = DownloadJob(camera, filename, output_path, priority, {**self.get_file_options, **options})
+            if os.path.exists(output_path):
+                job.future.set_result(True)
+                return job.future
+            self._jobs[output_path] = job
+            self._push(job, priority)
+            self._cond.notify()
+            if len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, daemon=True)
+                self._workers.append(worker)
+                worker.start()
+            return job.future
+
+    def reprioritise(self, future: Future, priority: float) -> bool:
+        """
+        Change the priority of a queued job.
+        :return: False if the job already started, finished or was cancelled
+        """
+        with self._cond:
+            for job in self._jobs.values():
+                if job.future is future:
+                    if future.running() or future.done():
+                        return False
+                    self._push(job, priority)
+                    return True
+        return False
+
+    def cancel(self, future: Future) -> bool:
+        """
+        Cancel a queued job, same as future.cancel()
+        :return: False if the job already started or finished
+        """
+        return future.cancel()
+
+    def pending(self) -> int:
+        """:return: the number of jobs waiting to start"""
+        with self._cond:
+            return sum(1 for job in self._jobs.values() if not job.future.running() and not job.future.done())
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False) -> None:
+        """
+        Stop the workers once the queue is drained.
+        :param wait: block until the running downloads are done
+        :param cancel_pending: cancel the queued jobs instead of downloading them
+        """
+        with self._cond:
+            self._shutdown = True
+            if cancel_pending:
+                for job in self._jobs.values():
+                    job.future.cancel()
+            self._cond.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def __enter__(self) -> "DownloadManager":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+    def _push(self, job: DownloadJob, priority: float) -> None:
+        # Entries left behind by a reprioritisation are recognised by their stale sequence number and dropped
+        job.priority = priority
+        job._seq = next(self._counter)
+        heapq.heappush(self._queue, (priority, job._seq, job))
+
+    def _next_job(self) -> Optional[DownloadJob]:
+        """Pop the most urgent job whose camera has a free slot. Called with the condition held."""
+        skipped = []
+        found = None
+        while self._queue:
+            entry = heapq.heappop(self._queue)
+            _, seq, job = entry
+            if seq != job._seq or job.future.done() or job.future.running():
+                if job.future.cancelled() and self._jobs.get(job.output_path) is job:
+                    # Forget cancelled jobs so their output_path can be submitted again
+                    del self._jobs[job.output_path]
+                continue
+            if self._active.get(id(job.camera), 0) >= self.per_camera:
+                skipped.append(entry)
+                continue
+            found = job
+            break
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+        return found
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    if self._shutdown and not self._queue:
+                        return
+                    self._cond.wait()
+                    job = self._next_job()
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                key = id(job.camera)
+                self._active[key] = self._active.get(key, 0) + 1
+            try:
+                if os.path.exists(job.output_path):
+                    result = True
+                else:
+                    result = job.camera.get_file(job.filename, job.output_path, **job.options)
+                job.future.set_result(result)
+            except Exception as e:
+                job.future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._active[key] -= 1
+                    if self._jobs.get(job.output_path) is job:
+                        del self._jobs[job.output_path]
+                    self._cond.notify_all()
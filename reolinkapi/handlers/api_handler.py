@@ -1,5 +1,8 @@
-import requests
-from typing import Dict, List, Optional, Union
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from reolinkapi.mixins.alarm import AlarmAPIMixin
 from reolinkapi.mixins.device import DeviceAPIMixin
 from reolinkapi.mixins.display import DisplayAPIMixin
@@ -9,7 +12,10 @@ from reolinkapi.mixins.motion import MotionAPIMixin
 from reolinkapi.mixins.network import NetworkAPIMixin
 from reolinkapi.mixins.ptz import PtzAPIMixin
 from reolinkapi.mixins.record import RecordAPIMixin
+from reolinkapi.handlers.batch import Batch
+from reolinkapi.handlers.cache import ResponseCache
 from reolinkapi.handlers.rest_handler import Request
+from reolinkapi.utils.download import parse_content_range, split_ranges
 from reolinkapi.mixins.stream import StreamAPIMixin
 from reolinkapi.mixins.system import SystemAPIMixin
 from reolinkapi.mixins.user import UserAPIMixin
@@ -39,6 +45,12 @@ class APIHandler(AlarmAPIMixin,
 
     All Code will try to follow the PEP 8 standard as described here: https://www.python.org/dev/peps/pep-0008/
     """
+    # Response codes telling that the token expired or was never valid: "please login first"
+    INVALID_TOKEN_CODES = (-6,)
+    # Suffix of the file a download is written to until it is complete
+    PARTIAL_SUFFIX = '.part'
+    # get_file options consumed locally by _download rather than sent to the camera
+    DOWNLOAD_OPTIONS = ('chunk_size', 'progress_callback', 'resume', 'parallel')
 
     def __init__(self, ip: str, username: str, password: str, https: bool = False, **kwargs):
         """
@@ -50,6 +62,16 @@ class APIHandler(AlarmAPIMixin,
         :param proxy: Add a proxy dict for requests to consume.
         eg: {"http":"socks5://[username]:[password]@[host]:[port], "https": ...}
         More information on proxies in requests: https://stackoverflow.com/a/15661226/9313679
+        :param session: use an existing requests.Session instead of a pooled one owned by this camera
+        :param pool_size: maximum number of keep-alive connections to keep open to this camera
+        :param verify: TLS verification for https, either a bool or a path to a CA bundle. Defaults to False.
+        :param auto_relogin: log in again when the token is about to expire or is rejected. Defaults to True.
+        :param token_refresh_margin: seconds before the end of the token lease at which it is refreshed. Defaults to 60.
+        :param cache: cache the responses of read-only commands, True for the default TTLs or a ResponseCache.
+        Defaults to no cache.
+        :param codec: JSON codec for request and response bodies: "json" (default), "orjson", "ujson", "auto"
+        or an object with dumps/loads. See utils/codec.py
+        :param timeout: seconds to wait for the camera on each command. Defaults to waiting forever.
         """
         scheme = 'https' if https else 'http'
         self.url = f"{scheme}://{ip}/cgi-bin/api.cgi"
@@ -57,8 +79,49 @@ class APIHandler(AlarmAPIMixin,
         self.token = None
         self.username = username
         self.password = password
-        Request.proxies = kwargs.get("proxy")  # Defaults to None if key isn't found
-        Request.session = kwargs.get("session")  # Defaults to None if key isn't found
+        self.transport = self._create_transport(**kwargs)
+        # Token lease, as reported by the camera at login
+        self.lease_time = None
+        self._token_expires_at = None
+        self.auto_relogin = kwargs.get("auto_relogin", True)
+        self.token_refresh_margin = kwargs.get("token_refresh_margin", 60)
+        # Only one login runs at a time, other callers wait for its token
+        self._login_lock = self._create_login_lock()
+        cache = kwargs.get("cache")
+        # Not `cache or None`: an empty ResponseCache is falsy
+        self.cache = ResponseCache() if cache is True else None if cache is False else cache
+
+    @staticmethod
+    def _create_login_lock() -> Any:
+        return threading.Lock()
+
+    @staticmethod
+    def _create_transport(**kwargs) -> Request:
+        # Each handler owns its transport, so cameras never share (or overwrite) each other's connection pool
+        return Request(session=kwargs.get("session"), proxies=kwargs.get("proxy"), verify=kwargs.get("verify", False),
+                       pool_size=kwargs.get("pool_size", Request.DEFAULT_POOL_SIZE), codec=kwargs.get("codec"),
+                       timeout=kwargs.get("timeout"))
+
+    def _login_request(self) -> Tuple[List[Dict], Dict[str, str]]:
+        """:return: the body and url parameters of a Login command"""
+        body = [{"cmd": "Login", "action": 0,
+                 "param": {"User": {"userName": self.username, "password": self.password}}}]
+        param = {"cmd": "Login", "token": "null"}
+        return body, param
+
+    def _handle_login_response(self, response: List[Dict]) -> bool:
+        """Store the token from a Login response. Shared with the async handler."""
+        data = response[0]
+        code = data["code"]
+        if int(code) == 0:
+            token = data["value"]["Token"]
+            self.token = token["name"]
+            self.lease_time = token.get("leaseTime")
+            self._token_expires_at = None if self.lease_time is None else monotonic() + self.lease_time
+            print("Login success")
+            return True
+        print(self.token)
+        return False
 
     def login(self) -> bool:
         """
@@ -66,20 +129,15 @@ class APIHandler(AlarmAPIMixin,
         Must be called first, before any other operation can be performed
         :return: bool
         """
+        with self._login_lock:
+            return self._login()
+
+    def _login(self) -> bool:
         try:
-            body = [{"cmd": "Login", "action": 0,
-                     "param": {"User": {"userName": self.username, "password": self.password}}}]
-            param = {"cmd": "Login", "token": "null"}
-            response = Request.post(self.url, data=body, params=param)
+            body, param = self._login_request()
+            response = self.transport.post(self.url, data=body, params=param)
             if response is not None:
-                data = response.json()[0]
-                code = data["code"]
-                if int(code) == 0:
-                    self.token = data["value"]["Token"]["name"]
-                    print("Login success")
-                    return True
-                print(self.token)
-                return False
+                return self._handle_login_response(self.transport.decode(response))
             else:
                 # TODO: Verify this change w/ owner. Delete old code if acceptable.
                 #  A this point, response is NoneType. There won't be a status code property.
@@ -99,13 +157,177 @@ class APIHandler(AlarmAPIMixin,
             data = [{"cmd": "Logout", "action": 0}]
             self._execute_command('Logout', data)
             # print(ret)
+            self.token = None
+            self._token_expires_at = None
             return True
         except Exception as e:
             print("Error Logout\n", e)
             return False
 
-    def _execute_command(self, command: str, data: List[Dict], multi: bool = False) -> \
-            Optional[Union[Dict, bool]]:
+    def close(self) -> None:
+        """
+        Release the pooled connections held by this camera.
+        """
+        self.transport.close()
+
+    def token_ttl(self) -> Optional[float]:
+        """
+        :return: seconds left on the token lease, None when not logged in or the lease is unknown
+        """
+        if self.token is None or self._token_expires_at is None:
+            return None
+        return self._token_expires_at - monotonic()
+
+    def _token_expiring(self) -> bool:
+        ttl = self.token_ttl()
+        # Never refresh earlier than half-way through the lease, even with a large margin
+        return ttl is not None and ttl <= min(self.token_refresh_margin, self.lease_time / 2)
+
+    def _is_token_rejected(self, response: Any) -> bool:
+        """:return: whether the camera answered a command with an invalid token error"""
+        return isinstance(response, list) and any(
+            isinstance(r, dict) and r.get("error", {}).get("rspCode") in self.INVALID_TOKEN_CODES for r in response)
+
+    def _refresh_token(self, stale_token: str) -> bool:
+        """
+        Log in again to replace stale_token. When several threads find the token stale at once only the
+        first one logs in, the others wait for it and reuse its token.
+        :return: whether a valid token is available
+        """
+        with self._login_lock:
+            if self.token != stale_token:
+                return self.token is not None
+            return self._login()
+
+    def _ensure_token(self) -> None:
+        if self.auto_relogin and self._token_expiring():
+            self._refresh_token(self.token)
+
+    def _download(self, params: Dict, output_path: str, chunk_size: int = DownloadAPIMixin.DEFAULT_CHUNK_SIZE,
+                  progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+                  resume: bool = False, parallel: int = 1) -> bool:
+        """
+        Stream a Download/Playback response to disk chunk by chunk, through "<output_path>.part"
+        which is atomically renamed to output_path once the whole file was received.
+        See DownloadAPIMixin.get_file for the options.
+        :return: whether the file was downloaded
+        """
+        if parallel > 1:
+            total = self._probe_download_size(params)
+            # Cameras that ignore Range requests are downloaded over a single connection
+            if total is not None and total >= parallel * chunk_size:
+                return self._download_ranges(params, output_path, total, parallel, chunk_size, progress_callback)
+        part_path = output_path + self.PARTIAL_SUFFIX
+        offset = os.path.getsize(part_path) if resume and os.path.exists(part_path) else 0
+        headers = {'Range': f'bytes={offset}-'} if offset else None
+        with self.transport.get(self.url, params=params, timeout=(1, None), stream=True, headers=headers) as req:
+            content_range = parse_content_range(req.headers.get('Content-Range'))
+            if req.status_code == 416 and content_range is not None and content_range[2] == offset:
+                # The partial file already holds the whole recording
+                os.replace(part_path, output_path)
+                return True
+            if req.status_code == 416 and offset:
+                # The partial file is larger than the recording, so it is not a part of it: start over
+                os.remove(part_path)
+                return self._download(params, output_path, chunk_size, progress_callback, resume)
+            if req.status_code == 206 and content_range is not None and content_range[0] == offset:
+                total = content_range[2]
+            elif req.status_code == 200:
+                # The camera ignored the Range header, start over
+                offset = 0
+                total = int(req.headers.get('Content-Length', 0)) or None
+            else:
+                print(f'Error received: {req.status_code}')
+                return False
+            written = offset
+            try:
+                with open(part_path, 'ab' if offset else 'wb') as f:
+                    for chunk in req.iter_content(chunk_size=chunk_size):
+                        f.write(chunk)
+                        written += len(chunk)
+                        if progress_callback is not None:
+                            progress_callback(written, total)
+                os.replace(part_path, output_path)
+            except BaseException:
+                # Keep what was received when the download can be resumed
+                if not resume and os.path.exists(part_path):
+                    os.remove(part_path)
+                raise
+        return True
+
+    def _probe_download_size(self, params: Dict) -> Optional[int]:
+        """:return: the size of the file to download, None if the camera does not honour Range requests"""
+        with self.transport.get(self.url, params=params, timeout=(1, None), stream=True,
+                                headers={'Range': 'bytes=0-0'}) as req:
+            content_range = parse_content_range(req.headers.get('Content-Range'))
+            if req.status_code == 206 and content_range is not None:
+                return content_range[2]
+        return None
+
+    def _download_ranges(self, params: Dict, output_path: str, total: int, parallel: int, chunk_size: int,
+                         progress_callback: Optional[Callable[[int, Optional[int]], None]]) -> bool:
+        """
+        Download `parallel` byte ranges of the file at once, each written in place into a preallocated
+        "<output_path>.part" which is renamed to output_path once every range is complete.
+        :return: whether the file was downloaded
+        """
+        part_path = output_path + self.PARTIAL_SUFFIX
+        lock = threading.Lock()
+        written = [0]
+
+        def fetch(first: int, last: int) -> None:
+            with self.transport.get(self.url, params=params, timeout=(1, None), stream=True,
+                                    headers={'Range': f'bytes={first}-{last}'}) as req:
+                content_range = parse_content_range(req.headers.get('Content-Range'))
+                if req.status_code != 206 or content_range is None or content_range[0] != first:
+                    raise ValueError(f"Range {first}-{last} was answered with status {req.status_code}")
+                with open(part_path, 'r+b') as f:
+                    f.seek(first)
+                    for chunk in req.iter_content(chunk_size=chunk_size):
+                        f.write(chunk)
+                        with lock:
+                            written[0] += len(chunk)
+                            if progress_callback is not None:
+                                progress_callback(written[0], total)
+                    if f.tell() != last + 1:
+                        raise ValueError(f"Range {first}-{last} ended early at byte {f.tell()}")
+
+        try:
+            with open(part_path, 'wb') as f:
+                f.truncate(total)
+            with ThreadPoolExecutor(max_workers=parallel) as executor:
+                list(executor.map(lambda r: fetch(*r), split_ranges(total, parallel)))
+            os.replace(part_path, output_path)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+        return True
+
+    def batch(self) -> Batch:
+        """
+        Group several API calls into a single request to the camera.
+            with cam.batch() as b:
+                b.get_osd()
+                b.get_hdd_info()
+            osd, hdd = b.results
+        See handlers/batch.py
+        :return: Batch
+        """
+        return Batch(self)
+
+    def _command_params(self, command: str, multi: bool) -> Dict[str, str]:
+        """:return: the url parameters for a command, raises ValueError when not logged in"""
+        if self.token is None:
+            raise ValueError("Login first")
+        params = {"token": self.token, 'cmd': command}
+        if multi:
+            del params['cmd']
+        return params
+
+    def _execute_command(self, command: str, data: List[Dict], multi: bool = False,
+                         on_response: Callable[[Any], Any] = None,
+                         on_error: Callable[[Exception], Any] = None) -> Optional[Union[Dict, bool]]:
         """
         Send a POST request to the IP camera with given data.
         :param command: name of the command to send
@@ -113,32 +335,39 @@ class APIHandler(AlarmAPIMixin,
         :param multi: whether the given command name should be added to the
         url parameters of the request. Defaults to False. (Some multi-step
         commands seem to not have a single command name)
+        :param on_response: optional post-processing of the response JSON, its result is returned instead.
+        The mixins use this rather than inspecting the return value so the same method works on the
+        sync and async handlers.
+        :param on_error: optional handler for a failed command, its result is returned instead of raising
         :return: response JSON as python object
         """
-        params = {"token": self.token, 'cmd': command}
-        if multi:
-            del params['cmd']
+        if self.cache is not None:
+            cached = self.cache.get(data, self.url)
+            if cached is not None:
+                return cached if on_response is None else on_response(cached)
         try:
-            if self.token is None:
-                raise ValueError("Login first")
+            self._ensure_token()
+            params = self._command_params(command, multi)
             if command == 'Download' or command == 'Playback':
                 # Special handling for downloading an mp4
-                # Pop the filepath from data
+                # Pop the filepath and the local download options from data
                 tgt_filepath = data[0].pop('filepath')
+                options = {k: data[0].pop(k) for k in self.DOWNLOAD_OPTIONS if k in data[0]}
                 # Apply the data to the params
                 params.update(data[0])
-                with requests.get(self.url, params=params, stream=True, verify=False, timeout=(1, None), proxies=Request.proxies) as req:
-                    if req.status_code == 200:
-                        with open(tgt_filepath, 'wb') as f:
-                            f.write(req.content)
-                        return True
-                    else:
-                        print(f'Error received: {req.status_code}')
-                        return False
-
+                result = self._download(params, tgt_filepath, **options)
             else:
-                response = Request.post(self.url, data=data, params=params)
-                return response.json()
+                response = self.transport.post(self.url, data=data, params=params)
+                result = self.transport.decode(response)
+                if self.auto_relogin and self._is_token_rejected(result) and self._refresh_token(params["token"]):
+                    # Retry once with the new token
+                    params = self._command_params(command, multi)
+                    result = self.transport.decode(self.transport.post(self.url, data=data, params=params))
+                if self.cache is not None:
+                    self.cache.store(data, result, self.url)
         except Exception as e:
             print(f"Command {command} failed: {e}")
+            if on_error is not None:
+                return on_error(e)
             raise
+        return result if on_response is None else on_response(result)
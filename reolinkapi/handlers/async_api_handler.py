@@ -0,0 +1,238 @@
+import asyncio
+import os
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Optional, Union, TYPE_CHECKING
+from reolinkapi.handlers.api_handler import APIHandler
+from reolinkapi.handlers.async_rest_handler import AsyncRequest
+from reolinkapi.mixins.download import DownloadAPIMixin
+from reolinkapi.mixins.stream import _open_image, _snap_params
+from reolinkapi.utils.download import parse_content_range, split_ranges
+
+if TYPE_CHECKING:
+    from PIL.Image import Image
+
+
+class AsyncAPIHandler(APIHandler):
+    """
+    asyncio version of the APIHandler.
+    All the mixin methods are inherited unchanged: they build the same request bodies and hand them to
+    _execute_command, which here returns a coroutine. Every API call therefore has to be awaited,
+    eg: `await cam.get_information()`.
+    open_video_stream is the exception, RTSP streaming is not HTTP and stays synchronous.
+    """
+
+    @staticmethod
+    def _create_transport(**kwargs) -> AsyncRequest:
+        return AsyncRequest(session=kwargs.get("session"), proxies=kwargs.get("proxy"),
+                            verify=kwargs.get("verify", False),
+                            pool_size=kwargs.get("pool_size", AsyncRequest.DEFAULT_POOL_SIZE),
+                            codec=kwargs.get("codec"))
+
+    @staticmethod
+    def _create_login_lock() -> asyncio.Lock:
+        return asyncio.Lock()
+
+    async def login(self) -> bool:
+        """
+        Get login token
+        Must be called first, before any other operation can be performed
+        :return: bool
+        """
+        async with self._login_lock:
+            return await self._login()
+
+    async def _login(self) -> bool:
+        try:
+            body, param = self._login_request()
+            response = await self.transport.post(self.url, data=body, params=param)
+            return self._handle_login_response(response)
+        except Exception as e:
+            print("Error Login\n", e)
+            raise
+
+    async def logout(self) -> bool:
+        """
+        Logout of the camera
+        :return: bool
+        """
+        try:
+            data = [{"cmd": "Logout", "action": 0}]
+            await self._execute_command('Logout', data)
+            self.token = None
+            self._token_expires_at = None
+            return True
+        except Exception as e:
+            print("Error Logout\n", e)
+            return False
+
+    async def close(self) -> None:
+        """
+        Release the pooled connections held by this camera.
+        """
+        await self.transport.close()
+
+    async def get_snap(self, timeout: float = 3, proxies: Any = None) -> Optional['Image']:
+        """
+        Gets a "snap" of the current camera video data and returns a Pillow Image or None
+        :param timeout: Request timeout to camera in seconds
+        :param proxies: http/https proxies to pass to the request object. Defaults to the camera's proxies.
+        :return: Image or None
+        """
+        open_image = _open_image()
+        try:
+            async with self.transport.get(self.url, params=_snap_params(self.username, self.password),
+                                          timeout=timeout, proxies=proxies) as response:
+                if response.status == 200:
+                    return open_image(BytesIO(await response.read()))
+                print("Could not retrieve data from camera successfully. Status:", response.status)
+                return None
+        except Exception as e:
+            print("Could not get Image data\n", e)
+            raise
+
+    async def _refresh_token(self, stale_token: str) -> bool:
+        """
+        Log in again to replace stale_token, only one login runs at a time. See APIHandler._refresh_token
+        :return: whether a valid token is available
+        """
+        async with self._login_lock:
+            if self.token != stale_token:
+                return self.token is not None
+            return await self._login()
+
+    async def _ensure_token(self) -> None:
+        if self.auto_relogin and self._token_expiring():
+            await self._refresh_token(self.token)
+
+    async def _download(self, params: Dict, output_path: str, chunk_size: int = DownloadAPIMixin.DEFAULT_CHUNK_SIZE,
+                        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+                        resume: bool = False, parallel: int = 1) -> bool:
+        """
+        Stream a Download/Playback response to disk, see APIHandler._download
+        :return: whether the file was downloaded
+        """
+        if parallel > 1:
+            total = await self._probe_download_size(params)
+            if total is not None and total >= parallel * chunk_size:
+                return await self._download_ranges(params, output_path, total, parallel, chunk_size,
+                                                   progress_callback)
+        part_path = output_path + self.PARTIAL_SUFFIX
+        offset = os.path.getsize(part_path) if resume and os.path.exists(part_path) else 0
+        headers = {'Range': f'bytes={offset}-'} if offset else None
+        async with self.transport.get(self.url, params=params, timeout=(1, None), headers=headers) as req:
+            content_range = parse_content_range(req.headers.get('Content-Range'))
+            if req.status == 416 and content_range is not None and content_range[2] == offset:
+                os.replace(part_path, output_path)
+                return True
+            if req.status == 416 and offset:
+                os.remove(part_path)
+                return await self._download(params, output_path, chunk_size, progress_callback, resume)
+            if req.status == 206 and content_range is not None and content_range[0] == offset:
+                total = content_range[2]
+            elif req.status == 200:
+                offset = 0
+                total = req.content_length
+            else:
+                print(f'Error received: {req.status}')
+                return False
+            written = offset
+            try:
+                with open(part_path, 'ab' if offset else 'wb') as f:
+                    async for chunk in req.content.iter_chunked(chunk_size):
+                        f.write(chunk)
+                        written += len(chunk)
+                        if progress_callback is not None:
+                            progress_callback(written, total)
+                os.replace(part_path, output_path)
+            except BaseException:
+                if not resume and os.path.exists(part_path):
+                    os.remove(part_path)
+                raise
+        return True
+
+    async def _probe_download_size(self, params: Dict) -> Optional[int]:
+        """:return: the size of the file to download, None if the camera does not honour Range requests"""
+        async with self.transport.get(self.url, params=params, timeout=(1, None),
+                                      headers={'Range': 'bytes=0-0'}) as req:
+            content_range = parse_content_range(req.headers.get('Content-Range'))
+            if req.status == 206 and content_range is not None:
+                return content_range[2]
+        return None
+
+    async def _download_ranges(self, params: Dict, output_path: str, total: int, parallel: int, chunk_size: int,
+                               progress_callback: Optional[Callable[[int, Optional[int]], None]]) -> bool:
+        """
+        Download `parallel` byte ranges of the file at once, see APIHandler._download_ranges
+        :return: whether the file was downloaded
+        """
+        part_path = output_path + self.PARTIAL_SUFFIX
+        written = [0]
+
+        async def fetch(first: int, last: int) -> None:
+            async with self.transport.get(self.url, params=params, timeout=(1, None),
+                                          headers={'Range': f'bytes={first}-{last}'}) as req:
+                content_range = parse_content_range(req.headers.get('Content-Range'))
+                if req.status != 206 or content_range is None or content_range[0] != first:
+                    raise ValueError(f"Range {first}-{last} was answered with status {req.status}")
+                with open(part_path, 'r+b') as f:
+                    f.seek(first)
+                    async for chunk in req.content.iter_chunked(chunk_size):
+                        f.write(chunk)
+                        written[0] += len(chunk)
+                        if progress_callback is not None:
+                            progress_callback(written[0], total)
+                    if f.tell() != last + 1:
+                        raise ValueError(f"Range {first}-{last} ended early at byte {f.tell()}")
+
+        try:
+            with open(part_path, 'wb') as f:
+                f.truncate(total)
+            tasks = [asyncio.ensure_future(fetch(first, last)) for first, last in split_ranges(total, parallel)]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                # Stop the other ranges as soon as one fails
+                for task in tasks:
+                    task.cancel()
+            os.replace(part_path, output_path)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+        return True
+
+    async def _execute_command(self, command: str, data: List[Dict], multi: bool = False,
+                               on_response: Callable[[Any], Any] = None,
+                               on_error: Callable[[Exception], Any] = None) -> Optional[Union[Dict, bool]]:
+        """
+        Send a POST request to the IP camera with given data.
+        See APIHandler._execute_command for the parameters.
+        :return: response JSON as python object
+        """
+        if self.cache is not None:
+            cached = self.cache.get(data, self.url)
+            if cached is not None:
+                return cached if on_response is None else on_response(cached)
+        try:
+            await self._ensure_token()
+            params = self._command_params(command, multi)
+            if command == 'Download' or command == 'Playback':
+                # Special handling for downloading an mp4
+                tgt_filepath = data[0].pop('filepath')
+                options = {k: data[0].pop(k) for k in self.DOWNLOAD_OPTIONS if k in data[0]}
+                params.update(data[0])
+                result = await self._download(params, tgt_filepath, **options)
+            else:
+                result = await self.transport.post(self.url, data=data, params=params)
+                if self.auto_relogin and self._is_token_rejected(result) and await self._refresh_token(params["token"]):
+                    # Retry once with the new token
+                    params = self._command_params(command, multi)
+                    result = await self.transport.post(self.url, data=data, params=params)
+                if self.cache is not None:
+                    self.cache.store(data, result, self.url)
+        except Exception as e:
+            print(f"Command {command} failed: {e}")
+            if on_error is not None:
+                return on_error(e)
+            raise
+        return result if on_response is None else on_response(result)
@@ -0,0 +1,130 @@
+import ssl
+from typing import Any, Dict, List, Union, Optional, TYPE_CHECKING
+from reolinkapi.utils.codec import get_codec
+
+if TYPE_CHECKING:
+    import aiohttp
+
+
+def _aiohttp() -> Any:
+    """:return: the aiohttp module, imported on first use to keep `import reolinkapi` fast"""
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError('AsyncCamera requires the async extra dependencies\nFor instance "pip install '
+                          'reolinkapi[async]"')
+    return aiohttp
+
+
+class AsyncRequest:
+    """
+    Per-camera asyncio HTTP transport, the aiohttp counterpart of rest_handler.Request.
+    The aiohttp session is created lazily on first use so the object can be built outside an event loop.
+    """
+
+    DEFAULT_POOL_SIZE = 10
+
+    def __init__(self, session: Any = None, proxies: Dict[str, str] = None,
+                 verify: Union[bool, str] = False, pool_size: int = DEFAULT_POOL_SIZE, codec: Any = None):
+        """
+        :param session: an existing aiohttp.ClientSession to use. The caller stays responsible for closing it.
+        :param proxies: proxy dict, eg: {"http": "http://127.0.0.1:8000"}. aiohttp only supports http proxies.
+        :param verify: TLS verification, either a bool or a path to a CA bundle
+        :param pool_size: maximum number of connections kept open to the camera
+        :param codec: JSON codec for request and response bodies, see utils.codec.get_codec. Defaults to json.
+        """
+        _aiohttp()
+        self.codec = get_codec(codec)
+        self.proxies = proxies
+        self.verify = verify
+        self.pool_size = pool_size
+        self._owns_session = session is None
+        self.session = session
+        self._stats = {"connections": 0, "requests": 0}
+
+    def _ssl(self) -> Any:
+        if self.verify is False:
+            return False
+        if isinstance(self.verify, str):
+            return ssl.create_default_context(cafile=self.verify)
+        return None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        if self.session is None:
+            aiohttp = _aiohttp()
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(self._count("connections"))
+            trace.on_request_start.append(self._count("requests"))
+            connector = aiohttp.TCPConnector(limit=self.pool_size, ssl=self._ssl())
+            self.session = aiohttp.ClientSession(connector=connector, trace_configs=[trace])
+        return self.session
+
+    def _count(self, key: str):
+        async def on_event(*_):
+            self._stats[key] += 1
+        return on_event
+
+    def _proxy(self, url: str) -> Optional[str]:
+        if not self.proxies:
+            return None
+        return self.proxies.get(url.split(":", 1)[0])
+
+    async def post(self, url: str, data: List[Dict], params: Dict[str, Union[str, float]] = None) -> List[Dict]:
+        """
+        Post request
+        :param params:
+        :param url:
+        :param data:
+        :return: the decoded response JSON
+        """
+        try:
+            headers = {'content-type': 'application/json'}
+            async with self._get_session().post(url, params=_str_params(params), data=self.codec.dumps(data),
+                                                headers=headers, proxy=self._proxy(url)) as r:
+                if r.status == 200:
+                    return self.codec.loads(await r.read())
+                raise ValueError(f"Http Request had non-200 Status: {r.status}", r.status)
+        except Exception as e:
+            print("Post Error\n", e)
+            raise
+
+    def get(self, url: str, params: Any, timeout: Any = 1, proxies: Dict[str, str] = None,
+            headers: Dict[str, str] = None) -> Any:
+        """
+        Get request
+        Use as an async context manager: `async with transport.get(...) as response:`
+        :param url:
+        :param params:
+        :param timeout: total timeout in seconds, or a (connect, read) tuple as with requests
+        :param proxies: override the transport proxies for this request only
+        :param headers: extra request headers, eg: Range
+        :return: aiohttp request context manager
+        """
+        aiohttp = _aiohttp()
+        if isinstance(timeout, tuple):
+            timeout = aiohttp.ClientTimeout(total=None, sock_connect=timeout[0], sock_read=timeout[1])
+        elif not isinstance(timeout, aiohttp.ClientTimeout):
+            timeout = aiohttp.ClientTimeout(total=timeout)
+        proxy = proxies.get(url.split(":", 1)[0]) if proxies is not None else self._proxy(url)
+        return self._get_session().get(url, params=_str_params(params), timeout=timeout, proxy=proxy,
+                                       headers=headers)
+
+    def connection_stats(self) -> Dict[str, int]:
+        """
+        Count the connections opened and the requests sent by the session this transport created.
+        :return: {"connections": int, "requests": int}
+        """
+        return dict(self._stats)
+
+    async def close(self) -> None:
+        """Close the pooled connections. Sessions passed in by the caller are left open."""
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+def _str_params(params: Any) -> Any:
+    # aiohttp only accepts str values in query parameters
+    if isinstance(params, dict):
+        return {k: str(v) for k, v in params.items()}
+    return params
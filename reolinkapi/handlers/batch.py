@@ -0,0 +1,127 @@
+from inspect import getattr_static
+from typing import Any, Callable, Dict, List
+
+
+class BatchResult:
+    """Placeholder returned by an API call made on a Batch. It holds the call's result once the batch was sent."""
+    __slots__ = ("command", "_done", "_value", "_error")
+
+    def __init__(self, command: str):
+        self.command = command
+        self._done = False
+        self._value = None
+        self._error = None
+
+    def done(self) -> bool:
+        return self._done
+
+    def result(self) -> Any:
+        """
+        :return: what the API call would have returned on its own. Raises the call's error if it failed.
+        """
+        if not self._done:
+            raise RuntimeError(f"The batch containing {self.command} has not been sent yet")
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def _set(self, value: Any = None, error: Exception = None) -> None:
+        self._value = value
+        self._error = error
+        self._done = True
+
+
+class Batch:
+    """
+    Groups API calls into a single POST, the camera's api.cgi accepts a JSON array of commands.
+    Obtain one with APIHandler.batch(). Any API call made on the batch is recorded instead of sent and
+    returns a BatchResult. Leaving the with block (or calling send) posts all the recorded commands at once:
+
+        with cam.batch() as b:
+            osd = b.get_osd()
+            enc = b.get_recording_encoding()
+            hdd = b.get_hdd_info()
+        osd.result(), b.results  # one result per call, in call order
+
+    The async handlers support `async with cam.batch() as b:` the same way.
+    Only calls that go through _execute_command can be batched, file downloads cannot.
+    """
+
+    def __init__(self, handler: Any):
+        self._handler = handler
+        self._calls: List[tuple] = []
+        self.results: List[Any] = []
+
+    def __getattr__(self, name: str) -> Any:
+        # Methods of the handler are bound to the batch, so the commands they send are recorded here.
+        # Everything else (ip, token, profile, ...) is read from the handler.
+        attr = getattr_static(type(self._handler), name, None)
+        if hasattr(attr, "__get__") and not isinstance(attr, property):
+            return attr.__get__(self, type(self._handler))
+        return getattr(self._handler, name)
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def _execute_command(self, command: str, data: List[Dict], multi: bool = False,
+                         on_response: Callable[[Any], Any] = None,
+                         on_error: Callable[[Exception], Any] = None) -> BatchResult:
+        if command == 'Download' or command == 'Playback':
+            raise ValueError(f"{command} cannot be batched")
+        result = BatchResult(command)
+        # Per-call on_error handlers are not used: a failed request fails every call of the batch
+        self._calls.append((data, on_response, result))
+        return result
+
+    def send(self) -> Any:
+        """
+        Post all the recorded commands in one request.
+        :return: the list of results, one per call. Calls whose response could not be processed hold their
+        exception. If the request itself fails, the error is raised. On the async handlers this is a coroutine.
+        """
+        calls, self._calls = self._calls, []
+        if not calls:
+            self.results = []
+            return self.results
+        body = [command for data, *_ in calls for command in data]
+
+        def on_response(response: List[Dict]) -> List[Any]:
+            offset = 0
+            for data, call_response, result in calls:
+                part = response[offset:offset + len(data)]
+                offset += len(data)
+                try:
+                    if len(part) != len(data):
+                        raise ValueError(f"The camera did not answer {result.command}")
+                    result._set(part if call_response is None else call_response(part))
+                except Exception as e:
+                    result._set(error=e)
+            return self._collect(calls)
+
+        def on_error(e: Exception) -> List[Any]:
+            for *_, result in calls:
+                result._set(error=e)
+            self._collect(calls)
+            raise e
+
+        return self._handler._execute_command(body[0]["cmd"], body, multi=True,
+                                              on_response=on_response, on_error=on_error)
+
+    def _collect(self, calls: List[tuple]) -> List[Any]:
+        self.results = [result._error if result._error is not None else result._value
+                        for *_, result in calls]
+        return self.results
+
+    def __enter__(self) -> "Batch":
+        return self
+
+    def __exit__(self, exc_type, *_) -> None:
+        if exc_type is None:
+            self.send()
+
+    async def __aenter__(self) -> "Batch":
+        return self
+
+    async def __aexit__(self, exc_type, *_) -> None:
+        if exc_type is None:
+            await self.send()
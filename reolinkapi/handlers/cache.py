@@ -0,0 +1,137 @@
+import copy
+import json
+import threading
+from time import monotonic
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ResponseCache:
+    """
+    Opt-in TTL cache for the responses of read-only commands, enabled with Camera(..., cache=True)
+    or Camera(..., cache=ResponseCache({"GetEnc": 600})).
+    Entries are keyed by the camera and the whole request body, so the same command with other params is cached
+    separately, and one instance can be shared by many cameras, eg: those of a CameraPool.
+    A request is only cached when every command in it has a TTL, and only when the camera answered all of them
+    successfully. Sending a Set* command drops the cached answers of the Get* commands it changes.
+    """
+
+    # Seconds a response stays fresh, per command
+    DEFAULT_TTLS = {
+        "GetDevInfo": 300,
+        "GetDevName": 300,
+        "GetEnc": 60,
+        "GetOsd": 60,
+        "GetNetPort": 300,
+        "GetUpnp": 300,
+        "GetP2p": 300,
+        "GetTime": 30,
+        "GetNorm": 300,
+    }
+    # Write command -> read commands whose cached answers it invalidates
+    INVALIDATES = {
+        "SetOsd": ("GetOsd",),
+        "SetEnc": ("GetEnc",),
+        "SetNetPort": ("GetNetPort",),
+        "SetDevName": ("GetDevName", "GetDevInfo"),
+        "SetTime": ("GetTime",),
+        "SetNtp": ("GetNtp",),
+        "SetLocalLink": ("GetLocalLink",),
+        "SetWifi": ("GetWifi",),
+        "SetIsp": ("GetIsp",),
+        "SetImage": ("GetImage",),
+        "SetPtzPreset": ("GetPtzPreset",),
+        "SetAutoFocus": ("GetAutoFocus",),
+        "Format": ("GetHddInfo",),
+    }
+    # Commands after which nothing cached can be trusted
+    INVALIDATES_ALL = ("Reboot", "Restore", "Upgrade")
+
+    def __init__(self, ttls: Dict[str, float] = None, invalidates: Dict[str, Tuple[str, ...]] = None):
+        """
+        :param ttls: seconds to cache each command for, replacing DEFAULT_TTLS
+        :param invalidates: extra or replacement entries for INVALIDATES
+        """
+        self.ttls = dict(self.DEFAULT_TTLS if ttls is None else ttls)
+        self.invalidates = {**self.INVALIDATES, **(invalidates or {})}
+        # (camera, request body) -> (expiry, commands, response)
+        self._entries: Dict[Tuple[str, str], Tuple[float, Tuple[str, ...], List[Dict]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _ttl(self, commands: Tuple[str, ...]) -> Optional[float]:
+        ttls = [self.ttls.get(cmd) for cmd in commands]
+        if not ttls or None in ttls:
+            return None
+        return min(ttls)
+
+    @staticmethod
+    def _commands(data: List[Dict]) -> Tuple[str, ...]:
+        return tuple(command.get("cmd") for command in data)
+
+    def get(self, data: List[Dict], camera: str = "") -> Optional[List[Dict]]:
+        """
+        :param data: the request body
+        :param camera: the camera the request is sent to, eg: its url
+        :return: a copy of the cached response, None if there is no fresh one
+        """
+        commands = self._commands(data)
+        if self._ttl(commands) is None:
+            return None
+        key = (camera, json.dumps(data, sort_keys=True))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= monotonic():
+                self.misses += 1
+                return None
+            self.hits += 1
+            response = entry[2]
+        return copy.deepcopy(response)
+
+    def store(self, data: List[Dict], response: Any, camera: str = "") -> None:
+        """
+        Record the response to a request: invalidate what its write commands changed, then cache it if cacheable.
+        :param data: the request body
+        :param response: the decoded response
+        :param camera: the camera the request was sent to, eg: its url
+        """
+        commands = self._commands(data)
+        self.invalidate(*commands, camera=camera)
+        ttl = self._ttl(commands)
+        if ttl is None or not isinstance(response, list) or len(response) != len(data):
+            return
+        if any(not isinstance(r, dict) or r.get("code") != 0 for r in response):
+            return
+        key = (camera, json.dumps(data, sort_keys=True))
+        with self._lock:
+            self._entries[key] = (monotonic() + ttl, commands, copy.deepcopy(response))
+
+    def invalidate(self, *commands: str, camera: Optional[str] = None) -> None:
+        """
+        Drop the cached responses made stale by the given write commands, see INVALIDATES.
+        :param camera: only drop the responses of this camera, None for every camera
+        """
+        stale = set()
+        for cmd in commands:
+            if cmd in self.INVALIDATES_ALL:
+                self.clear(camera)
+                return
+            stale.update(self.invalidates.get(cmd, ()))
+        if not stale:
+            return
+        with self._lock:
+            for key in [k for k, (_, cmds, _) in self._entries.items()
+                        if stale.intersection(cmds) and camera in (None, k[0])]:
+                del self._entries[key]
+
+    def clear(self, camera: Optional[str] = None) -> None:
+        """:param camera: only drop the responses of this camera, None for every camera"""
+        with self._lock:
+            if camera is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == camera]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
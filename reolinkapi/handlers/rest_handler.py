@@ -1,32 +1,63 @@
+import threading
+from contextlib import contextmanager
 import requests
-from typing import List, Dict, Union, Optional
+from requests.adapters import HTTPAdapter
+from typing import Any, Iterator, List, Dict, Union, Optional
+from reolinkapi.utils.codec import get_codec
 
 
 class Request:
-    proxies = None
-    session = None
+    """
+    Per-camera HTTP transport.
+    Every APIHandler owns its own Request object, which wraps a requests.Session with a keep-alive
+    connection pool so that consecutive commands to the same camera reuse the TCP/TLS connection.
+    """
 
-    @staticmethod
-    def __getSession():
-        reqHandler = requests
-        if Request.session is not None:
-            reqHandler = Request.session
-        return reqHandler
+    DEFAULT_POOL_SIZE = 10
 
-    @staticmethod
-    def post(url: str, data: List[Dict], params: Dict[str, Union[str, float]] = None) -> \
-            Optional[requests.Response]:
+    def __init__(self, session: requests.Session = None, proxies: Dict[str, str] = None,
+                 verify: Union[bool, str] = False, pool_size: int = DEFAULT_POOL_SIZE, codec: Any = None,
+                 timeout: Optional[float] = None):
+        """
+        :param session: an existing requests.Session to use instead of creating a pooled one.
+        The caller stays responsible for its adapters and for closing it.
+        :param proxies: proxy dict for requests to consume, eg: {"http": "socks5://127.0.0.1:8000"}
+        :param verify: TLS verification, either a bool or a path to a CA bundle
+        :param pool_size: maximum number of keep-alive connections kept open to the camera
+        :param codec: JSON codec for request and response bodies, see utils.codec.get_codec. Defaults to json.
+        :param timeout: seconds to wait for the camera on each command, None to wait forever
+        """
+        self.codec = get_codec(codec)
+        self.proxies = proxies
+        self.verify = verify
+        self.pool_size = pool_size
+        self.timeout = timeout
+        # Timeouts set by timeout_scope, per thread
+        self._local = threading.local()
+        self._owns_session = session is None
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+
+    def post(self, url: str, data: List[Dict], params: Dict[str, Union[str, float]] = None,
+             timeout: Optional[float] = None) -> Optional[requests.Response]:
         """
         Post request
         :param params:
         :param url:
         :param data:
+        :param timeout: seconds to wait for the camera, defaults to the timeout_scope or the transport's timeout
         :return:
         """
+        if timeout is None:
+            timeout = getattr(self._local, "timeout", self.timeout)
         try:
             headers = {'content-type': 'application/json'}
-            r = Request.__getSession().post(url, verify=False, params=params, json=data, headers=headers,
-                              proxies=Request.proxies)
+            r = self.session.post(url, verify=self.verify, params=params, data=self.codec.dumps(data),
+                                  headers=headers, proxies=self.proxies, timeout=timeout)
             if r.status_code == 200:
                 return r
             else:
@@ -35,18 +66,63 @@ class Request:
             print("Post Error\n", e)
             raise
 
-    @staticmethod
-    def get(url: str, params: Dict[str, Union[str, float]], timeout: float = 1) -> Optional[requests.Response]:
+    @contextmanager
+    def timeout_scope(self, timeout: Optional[float]) -> Iterator[None]:
+        """Use another timeout for the commands sent by the current thread inside the with block."""
+        previous = getattr(self._local, "timeout", self.timeout)
+        self._local.timeout = timeout
+        try:
+            yield
+        finally:
+            self._local.timeout = previous
+
+    def decode(self, response: requests.Response) -> Any:
+        """:return: the response body decoded with the transport's codec"""
+        return self.codec.loads(response.content)
+
+    def get(self, url: str, params: Any, timeout: Any = 1, stream: bool = False,
+            proxies: Dict[str, str] = None, headers: Dict[str, str] = None) -> Optional[requests.Response]:
         """
         Get request
         :param url:
         :param params:
         :param timeout:
+        :param stream: do not read the response body up front
+        :param proxies: override the transport proxies for this request only
+        :param headers: extra request headers, eg: Range
         :return:
         """
         try:
-            data = Request.__getSession().get(url=url, verify=False, params=params, timeout=timeout, proxies=Request.proxies)
+            data = self.session.get(url=url, verify=self.verify, params=params, timeout=timeout, stream=stream,
+                                    proxies=proxies if proxies is not None else self.proxies, headers=headers)
             return data
         except Exception as e:
             print("Get Error\n", e)
             raise
+
+    def connection_stats(self) -> Dict[str, int]:
+        """
+        Count the connections opened and the requests sent through the pooled adapters.
+        A "requests" figure much higher than "connections" means handshakes are being reused.
+        Sessions passed in by the caller are counted as well, as long as they use urllib3 pools.
+        :return: {"connections": int, "requests": int}
+        """
+        stats = {"connections": 0, "requests": 0}
+        seen = set()
+        for adapter in self.session.adapters.values():
+            pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+            if pools is None or id(pools) in seen:
+                continue
+            seen.add(id(pools))
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                stats["connections"] += getattr(pool, "num_connections", 0)
+                stats["requests"] += getattr(pool, "num_requests", 0)
+        return stats
+
+    def close(self) -> None:
+        """Close the pooled connections. Sessions passed in by the caller are left open."""
+        if self._owns_session:
+            self.session.close()
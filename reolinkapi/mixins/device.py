@@ -12,9 +12,11 @@ class DeviceAPIMixin:
         :return: bool indicating success
         """
         body = [{"cmd": "SetDevName", "action": 0, "param": {"DevName": {"name": name}}}]
-        self._execute_command('SetDevName', body)
-        print(f"Successfully set device name to: {name}")
-        return True
+
+        def on_response(_) -> bool:
+            print(f"Successfully set device name to: {name}")
+            return True
+        return self._execute_command('SetDevName', body, on_response=on_response)
 
     def get_device_name(self) -> Dict:
         """
@@ -42,8 +44,11 @@ class DeviceAPIMixin:
         if hdd_id is None:
             hdd_id = self.DEFAULT_HDD_ID
         body = [{"cmd": "Format", "action": 0, "param": {"HddInfo": {"id": hdd_id}}}]
-        r_data = self._execute_command('Format', body)[0]
-        if r_data["value"]["rspCode"] == 200:
-            return True
-        print("Could not format HDD/SD. Camera responded with:", r_data["value"])
-        return False
+
+        def on_response(response) -> bool:
+            r_data = response[0]
+            if r_data["value"]["rspCode"] == 200:
+                return True
+            print("Could not format HDD/SD. Camera responded with:", r_data["value"])
+            return False
+        return self._execute_command('Format', body, on_response=on_response)
@@ -50,8 +50,11 @@ class DisplayAPIMixin:
                         "osdTime": {"enable": osd_time_enabled, "pos": osd_time_pos},
                         "watermark": osd_watermark_enabled,
                     }}}]
-        r_data = self._execute_command('SetOsd', body)[0]
-        if 'value' in r_data and r_data["value"]["rspCode"] == 200:
-            return True
-        print("Could not set OSD. Camera responded with status:", r_data["error"])
-        return False
+
+        def on_response(response) -> bool:
+            r_data = response[0]
+            if 'value' in r_data and r_data["value"]["rspCode"] == 200:
+                return True
+            print("Could not set OSD. Camera responded with status:", r_data["error"])
+            return False
+        return self._execute_command('SetOsd', body, on_response=on_response)
@@ -1,19 +1,43 @@
+from typing import Callable, Optional
+
+
 class DownloadAPIMixin:
     """API calls for downloading video files."""
-    def get_file(self, filename: str, output_path: str, method = 'Playback') -> bool:
+    # Bytes read from the camera and written to disk at a time, memory use does not grow with the file size
+    DEFAULT_CHUNK_SIZE = 256 * 1024
+
+    def get_file(self, filename: str, output_path: str, method = 'Playback', chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+                 resume: bool = False, parallel: int = 1) -> bool:
         """
         Download the selected video file
         On at least Trackmix Wifi, it was observed that the Playback method
         yields much improved download speeds over the Download method, for
         unknown reasons.
-        :return: response json
+        The file is streamed to "<output_path>.part" and renamed to output_path once complete, so output_path
+        never holds a partial download.
+        :param filename: the name of the file on the camera, as returned by get_motion_files or get_playback_files
+        :param output_path: where to save the file
+        :param method: 'Playback' or 'Download'
+        :param chunk_size: bytes read and written at a time
+        :param progress_callback: called after each chunk with (bytes written, total bytes or None if unknown)
+        :param resume: keep the ".part" file of a failed download and continue it with an HTTP Range request
+        next time. Cameras that ignore Range requests restart the download from the beginning.
+        :param parallel: download this many byte ranges of the file over separate connections at once, which
+        helps when the camera throttles each connection. Falls back to a single connection when the camera
+        does not honour Range requests. Parallel downloads are not resumed.
+        :return: whether the file was downloaded
         """
         body = [
             {
                 "cmd": method,
                 "source": filename,
                 "output": filename,
-                "filepath": output_path
+                "filepath": output_path,
+                "chunk_size": chunk_size,
+                "progress_callback": progress_callback,
+                "resume": resume,
+                "parallel": parallel,
             }
         ]
         resp = self._execute_command(method, body)
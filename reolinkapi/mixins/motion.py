@@ -1,5 +1,8 @@
-from typing import Union, List, Dict
-from datetime import datetime as dt
+from typing import Union, List, Dict, Optional, Iterator
+from datetime import datetime as dt, timedelta
+from reolinkapi.models import response_value
+from reolinkapi.utils.motion import MotionEvent, MotionEvents
+from reolinkapi.utils.util import ordered_parallel_map, split_time_range
 
 
 # Type hints for input and output of the motion api response
@@ -20,6 +23,64 @@ class MotionAPIMixin:
             streamtype: 'main' or 'sub' - the stream to examine
         :return: response json
         """
+        body = self._motion_search_body(start, end, streamtype, channel)
+
+        def on_response(response) -> PROCESSED_MOTION_LIST_TYPE:
+            files = self._search_result_files(response)
+            if len(files) > 0:
+                # Begin processing files
+                processed_files = self._process_motion_files(files)
+                return processed_files
+            return []
+        return self._execute_command('Search', body, on_response=on_response)
+
+    def get_motion_events(self, start: dt, end: Optional[dt] = None, streamtype: str = 'sub',
+                          channel: int = 0, strict: bool = False) -> MotionEvents:
+        """
+        Same search as get_motion_files, returned as a compact MotionEvents table.
+        Timestamps are kept as epoch seconds of the camera's local time, datetimes are only built when read.
+        :param start: the starting time range to examine
+        :param end: the end time of the time range to examine. Defaults to now.
+        :param streamtype: 'main' or 'sub' - the stream to examine
+        :param channel: the channel to examine
+        :param strict: raise ResponseError when the camera answers with an error, rather than finding no events
+        :return: MotionEvents, in time order
+        """
+        body = self._motion_search_body(start, dt.now() if end is None else end, streamtype, channel)
+
+        def on_response(response) -> MotionEvents:
+            if strict:
+                response_value(response, 'Search')
+            return MotionEvents.from_search(self._search_result_files(response))
+        return self._execute_command('Search', body, on_response=on_response)
+
+    def iter_motion_events(self, start: dt, end: Optional[dt] = None, window: timedelta = timedelta(days=1),
+                           max_workers: int = 4, streamtype: str = 'sub', channel: int = 0) -> Iterator[MotionEvent]:
+        """
+        Search a long time range as several smaller searches running concurrently, and yield the events
+        in time order as the windows complete. Recordings spanning a window boundary are yielded once.
+        Only for synchronous cameras.
+        :param start: the starting time range to examine
+        :param end: the end time of the time range to examine. Defaults to now.
+        :param window: length of each search, eg: timedelta(hours=1) for busy cameras
+        :param max_workers: maximum number of searches running at once
+        :param streamtype: 'main' or 'sub' - the stream to examine
+        :param channel: the channel to examine
+        :return: generator of MotionEvent
+        """
+        def search(bounds) -> MotionEvents:
+            return self.get_motion_events(bounds[0], bounds[1], streamtype=streamtype, channel=channel)
+
+        previous = set()
+        windows = split_time_range(start, dt.now() if end is None else end, window)
+        for events in ordered_parallel_map(search, windows, max_workers):
+            for event in events:
+                if event.filename not in previous:
+                    yield event
+            previous = set(events.filenames)
+
+    @staticmethod
+    def _motion_search_body(start: dt, end: dt, streamtype: str, channel: int) -> List[Dict]:
         search_params = {
             'Search': {
                 'channel': channel,
@@ -43,43 +104,28 @@ class MotionAPIMixin:
                 }
             }
         }
-        body = [{"cmd": "Search", "action": 1, "param": search_params}]
+        return [{"cmd": "Search", "action": 1, "param": search_params}]
 
-        resp = self._execute_command('Search', body)[0]
+    @staticmethod
+    def _search_result_files(response) -> RAW_MOTION_LIST_TYPE:
+        resp = response[0]
         if 'value' not in resp:
             return []
         values = resp['value']
         if 'SearchResult' not in values:
             return []
-        result = values['SearchResult']
-        files = result.get('File', [])
-        if len(files) > 0:
-            # Begin processing files
-            processed_files = self._process_motion_files(files)
-            return processed_files
-        return []
+        return values['SearchResult'].get('File', [])
 
     @staticmethod
     def _process_motion_files(motion_files: RAW_MOTION_LIST_TYPE) -> PROCESSED_MOTION_LIST_TYPE:
         """Processes raw list of dicts containing motion timestamps
-        and the filename associated with them"""
-        # Process files
+        and the filename associated with them. The raw dicts are left untouched."""
         processed_motions = []
-        replace_fields = {'mon': 'month', 'sec': 'second', 'min': 'minute'}
         for file in motion_files:
-            time_range = {}
-            for x in ['Start', 'End']:
-                # Get raw dict
-                raw = file[f'{x}Time']
-                # Replace certain keys
-                for k, v in replace_fields.items():
-                    if k in raw.keys():
-                        raw[v] = raw.pop(k)
-                time_range[x.lower()] = dt(**raw)
-            start, end = time_range.values()
+            start, end = file['StartTime'], file['EndTime']
             processed_motions.append({
-                'start': start,
-                'end': end,
+                'start': dt(start['year'], start['mon'], start['day'], start['hour'], start['min'], start['sec']),
+                'end': dt(end['year'], end['mon'], end['day'], end['hour'], end['min'], end['sec']),
                 'filename': file['name']
             })
         return processed_motions
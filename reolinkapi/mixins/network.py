@@ -60,9 +60,11 @@ class NetworkAPIMixin:
             "rtmpPort": rtmp_port,
             "rtspPort": rtsp_port
         }}}]
-        self._execute_command('SetNetPort', body, multi=True)
-        print("Successfully Set Network Ports")
-        return True
+
+        def on_response(_) -> bool:
+            print("Successfully Set Network Ports")
+            return True
+        return self._execute_command('SetNetPort', body, multi=True, on_response=on_response)
 
     def set_wifi(self, ssid: str, password: str) -> Dict:
         body = [{"cmd": "SetWifi", "action": 0, "param": {
@@ -89,9 +91,11 @@ class NetworkAPIMixin:
                 "port": port,
                 "server": server
             }}}]
-        response = self._execute_command('SetNtp', body)
-        print("Successfully Set NTP Settings")
-        return response
+
+        def on_response(response) -> Dict:
+            print("Successfully Set NTP Settings")
+            return response
+        return self._execute_command('SetNtp', body, on_response=on_response)
 
     def get_net_ports(self) -> Dict:
         """
@@ -1,9 +1,12 @@
-from datetime import datetime as dt
+from datetime import datetime as dt, timedelta
+from typing import Dict, Iterator, List, Optional
+from reolinkapi.models import response_value
+from reolinkapi.utils.util import ordered_parallel_map, split_time_range
 
 class NvrDownloadAPIMixin:
     """API calls for NvrDownload."""
     def get_playback_files(self, start: dt, end: dt = dt.now(), channel: int = 0,
-                         streamtype: str = 'sub'):
+                         streamtype: str = 'sub', strict: bool = False):
         """
         Get the filenames of the videos for the time range provided.
 
@@ -12,8 +15,57 @@ class NvrDownloadAPIMixin:
             end: the end time of the time range to examine
             channel: which channel to download from
             streamtype: 'main' or 'sub' - the stream to examine
+            strict: raise instead of listing no files when the request fails or the camera answers with an
+            error, eg: ResponseError
         :return: response json
         """
+        body = self._playback_search_body(start, end, channel, streamtype)
+
+        def on_error(e: Exception) -> List[str]:
+            print(f"Error: {e}")
+            return []
+
+        def on_response(response) -> List[str]:
+            if strict:
+                response_value(response, 'NvrDownload')
+                return self._playback_file_names(response)
+            # A malformed answer lists no files, like a failed request
+            try:
+                return self._playback_file_names(response)
+            except Exception as e:
+                return on_error(e)
+        return self._execute_command('NvrDownload', body, on_response=on_response,
+                                     on_error=None if strict else on_error)
+
+    def iter_playback_files(self, start: dt, end: Optional[dt] = None, window: timedelta = timedelta(days=1),
+                            max_workers: int = 4, channel: int = 0, streamtype: str = 'sub') -> Iterator[str]:
+        """
+        get_playback_files split into concurrent searches of `window` each, yielding the filenames window by
+        window in time order. Files spanning a window boundary are yielded once.
+        Unlike get_playback_files, a failed search raises instead of listing no files.
+        Only for synchronous cameras.
+        :param start: the starting time range to examine
+        :param end: the end time of the time range to examine. Defaults to now.
+        :param window: length of each search
+        :param max_workers: maximum number of searches running at once
+        :param channel: which channel to download from
+        :param streamtype: 'main' or 'sub' - the stream to examine
+        :return: generator of filenames
+        """
+        def search(bounds) -> List[str]:
+            body = self._playback_search_body(bounds[0], bounds[1], channel, streamtype)
+            return self._execute_command('NvrDownload', body, on_response=self._playback_file_names)
+
+        previous = set()
+        windows = split_time_range(start, dt.now() if end is None else end, window)
+        for files in ordered_parallel_map(search, windows, max_workers):
+            for name in files:
+                if name not in previous:
+                    yield name
+            previous = set(files)
+
+    @staticmethod
+    def _playback_search_body(start: dt, end: dt, channel: int, streamtype: str) -> List[Dict]:
         search_params = {
             'NvrDownload': {
                 'channel': channel,
@@ -37,18 +89,14 @@ class NvrDownloadAPIMixin:
                 }
             }
         }
-        body = [{"cmd": "NvrDownload", "action": 1, "param": search_params}]
-        try:
-            resp = self._execute_command('NvrDownload', body)[0]
-        except Exception as e:
-            print(f"Error: {e}")
-            return []
+        return [{"cmd": "NvrDownload", "action": 1, "param": search_params}]
+
+    @staticmethod
+    def _playback_file_names(response) -> List[str]:
+        resp = response[0]
         if 'value' not in resp:
             return []
         values = resp['value']
         if 'fileList' not in values:
             return []
-        files = values['fileList']
-        if len(files) > 0:
-            return [file['fileName'] for file in files]
-        return []
+        return [file['fileName'] for file in values['fileList']]
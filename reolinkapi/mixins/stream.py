@@ -1,67 +1,87 @@
 import string
 from random import choices
-from typing import Any, Optional
+from typing import Any, Callable, Optional, TYPE_CHECKING
 from urllib import parse
 from io import BytesIO
 
-import requests
+if TYPE_CHECKING:
+    from PIL.Image import Image
+    from reolinkapi.utils.rtsp_client import RtspClient
 
-try:
-    from PIL.Image import Image, open as open_image
+# PIL and OpenCV are only imported when a snapshot or a stream is first requested,
+# so that `import reolinkapi` stays fast for the callers that only use the HTTP API.
 
-    from reolinkapi.utils.rtsp_client import RtspClient
+
+def _snap_params(username: str, password: str) -> str:
+    """Url parameters of a Snap request, shared by the sync and async handlers."""
+    data = {
+        'cmd': 'Snap',
+        'channel': 0,
+        'rs': ''.join(choices(string.ascii_uppercase + string.digits, k=10)),
+        'user': username,
+        'password': password,
+    }
+    return parse.urlencode(data, safe="!")
 
 
-    class StreamAPIMixin:
-        """ API calls for opening a video stream or capturing an image from the camera."""
+def _open_image() -> Callable[[Any], 'Image']:
+    """:return: PIL.Image.open, imported on first use"""
+    try:
+        from PIL.Image import open as open_image
+    except ImportError:
+        raise ImportError(
+            'get_snap requires streaming extra dependencies\nFor instance "pip install reolinkapi[streaming]"')
+    return open_image
 
-        def open_video_stream(self, callback: Any = None, proxies: Any = None) -> Any:
-            """
-            'https://support.reolink.com/hc/en-us/articles/360007010473-How-to-Live-View-Reolink-Cameras-via-VLC-Media-Player'
-            Blocking function creates a generator and returns the frames as it is spawned
-            :param callback:
-            :param proxies: Default is none, example: {"host": "localhost", "port": 8000}
-            """
-            rtsp_client = RtspClient(
-                ip=self.ip, username=self.username, password=self.password, profile=self.profile, proxies=proxies, callback=callback)
-            return rtsp_client.open_stream()
 
-        def get_snap(self, timeout: float = 3, proxies: Any = None) -> Optional[Image]:
-            """
-            Gets a "snap" of the current camera video data and returns a Pillow Image or None
-            :param timeout: Request timeout to camera in seconds
-            :param proxies: http/https proxies to pass to the request object.
-            :return: Image or None
-            """
-            data = {
-                'cmd': 'Snap',
-                'channel': 0,
-                'rs': ''.join(choices(string.ascii_uppercase + string.digits, k=10)),
-                'user': self.username,
-                'password': self.password,
-            }
-            parms = parse.urlencode(data, safe="!").encode("utf-8")
+class StreamAPIMixin:
+    """ API calls for opening a video stream or capturing an image from the camera."""
 
-            try:
-                response = requests.get(self.url, proxies=proxies, params=parms, timeout=timeout)
-                if response.status_code == 200:
-                    return open_image(BytesIO(response.content))
-                print("Could not retrieve data from camera successfully. Status:", response.status_code)
-                return None
+    def open_video_stream(self, callback: Any = None, proxies: Any = None, **options) -> Any:
+        """
+        'https://support.reolink.com/hc/en-us/articles/360007010473-How-to-Live-View-Reolink-Cameras-via-VLC-Media-Player'
+        Blocking function creates a generator and returns the frames as it is spawned
+        :param callback:
+        :param proxies: Default is none, example: {"host": "localhost", "port": 8000}
+        :param options: RtspClient options, eg: latest=True to always get the newest frame
+        """
+        return self.rtsp_client(callback=callback, proxies=proxies, **options).open_stream()
 
-            except Exception as e:
-                print("Could not get Image data\n", e)
-                raise
-except ImportError as err:
-    print("ImportError", err)
+    def rtsp_client(self, callback: Any = None, proxies: Any = None, **options) -> 'RtspClient':
+        """
+        Create an RtspClient for the camera's stream, without opening it.
+        :param callback: see open_video_stream
+        :param proxies: Default is none, example: {"host": "localhost", "port": 8000}
+        :param options: RtspClient options
+        :return: RtspClient
+        """
+        try:
+            from reolinkapi.utils.rtsp_client import RtspClient
+            import cv2  # noqa: F401
+        except ImportError:
+            raise ImportError('open_video_stream requires streaming extra dependencies\nFor instance "pip install '
+                              'reolinkapi[streaming]"')
+        return RtspClient(
+            ip=self.ip, username=self.username, password=self.password, profile=self.profile, proxies=proxies, callback=callback,
+            **options)
 
-    class StreamAPIMixin:
-        """ API calls for opening a video stream or capturing an image from the camera."""
+    def get_snap(self, timeout: float = 3, proxies: Any = None) -> Optional['Image']:
+        """
+        Gets a "snap" of the current camera video data and returns a Pillow Image or None
+        :param timeout: Request timeout to camera in seconds
+        :param proxies: http/https proxies to pass to the request object. Defaults to the camera's proxies.
+        :return: Image or None
+        """
+        open_image = _open_image()
+        parms = _snap_params(self.username, self.password).encode("utf-8")
 
-        def open_video_stream(self, callback: Any = None, proxies: Any = None) -> Any:
-            raise ImportError(f'open_video_stream requires streaming extra dependencies\nFor instance "pip install '
-                              f'reolinkapi[streaming]"')
+        try:
+            response = self.transport.get(self.url, params=parms, timeout=timeout, proxies=proxies)
+            if response.status_code == 200:
+                return open_image(BytesIO(response.content))
+            print("Could not retrieve data from camera successfully. Status:", response.status_code)
+            return None
 
-        def get_snap(self, timeout: float = 3, proxies: Any = None) -> Optional['Image']:
-            raise ImportError(
-                f'get_snap requires streaming extra dependencies\nFor instance "pip install reolinkapi[streaming]"')
+        except Exception as e:
+            print("Could not get Image data\n", e)
+            raise
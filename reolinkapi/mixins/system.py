@@ -26,6 +26,16 @@ class SystemAPIMixin:
         body = [{"cmd": "GetDevInfo", "action": 0, "param": {}}]
         return self._execute_command('GetDevInfo', body)
 
+    def get_ability(self, username: str = None) -> Dict:
+        """
+        Get what the camera and each of its channels support, for a user
+        See reolinkapi.models.Ability for a typed view of the response.
+        :param username: defaults to the logged in user
+        :return: response json
+        """
+        body = [{"cmd": "GetAbility", "action": 0, "param": {"User": {"userName": username or self.username}}}]
+        return self._execute_command('GetAbility', body)
+
     def reboot_camera(self) -> Dict:
         """
         Reboots the camera
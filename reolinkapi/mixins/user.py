@@ -31,11 +31,14 @@ class UserAPIMixin:
         """
         body = [{"cmd": "AddUser", "action": 0,
                  "param": {"User": {"userName": username, "password": password, "level": level}}}]
-        r_data = self._execute_command('AddUser', body)[0]
-        if r_data["value"]["rspCode"] == 200:
-            return True
-        print("Could not add user. Camera responded with:", r_data["value"])
-        return False
+
+        def on_response(response) -> bool:
+            r_data = response[0]
+            if r_data["value"]["rspCode"] == 200:
+                return True
+            print("Could not add user. Camera responded with:", r_data["value"])
+            return False
+        return self._execute_command('AddUser', body, on_response=on_response)
 
     def modify_user(self, username: str, password: str) -> bool:
         """
@@ -45,11 +48,14 @@ class UserAPIMixin:
         :return: whether the user was modified successfully
         """
         body = [{"cmd": "ModifyUser", "action": 0, "param": {"User": {"userName": username, "password": password}}}]
-        r_data = self._execute_command('ModifyUser', body)[0]
-        if r_data["value"]["rspCode"] == 200:
-            return True
-        print(f"Could not modify user: {username}\nCamera responded with: {r_data['value']}")
-        return False
+
+        def on_response(response) -> bool:
+            r_data = response[0]
+            if r_data["value"]["rspCode"] == 200:
+                return True
+            print(f"Could not modify user: {username}\nCamera responded with: {r_data['value']}")
+            return False
+        return self._execute_command('ModifyUser', body, on_response=on_response)
 
     def delete_user(self, username: str) -> bool:
         """
@@ -58,8 +64,11 @@ class UserAPIMixin:
         :return: whether the user was deleted successfully
         """
         body = [{"cmd": "DelUser", "action": 0, "param": {"User": {"userName": username}}}]
-        r_data = self._execute_command('DelUser', body)[0]
-        if r_data["value"]["rspCode"] == 200:
-            return True
-        print(f"Could not delete user: {username}\nCamera responded with: {r_data['value']}")
-        return False
+
+        def on_response(response) -> bool:
+            r_data = response[0]
+            if r_data["value"]["rspCode"] == 200:
+                return True
+            print(f"Could not delete user: {username}\nCamera responded with: {r_data['value']}")
+            return False
+        return self._execute_command('DelUser', body, on_response=on_response)
@@ -0,0 +1,268 @@
+"""
+Typed, slotted views of the most common responses.
+The API methods keep returning the raw response lists; convert them when typed access is wanted:
+    info = DevInfo.from_response(cam.get_information())
+    info.model, info.firm_ver
+    from_response(cam.get_hdd_info())  # picks the model from the "cmd" of the response
+
+The models only keep the fields they declare, so holding many of them takes a fraction of the memory
+of the nested dicts they are built from. They are frozen: build a new request to change a setting.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ResponseError(ValueError):
+    """The camera answered the command with an error instead of a value."""
+
+
+def response_value(response: Any, cmd: str) -> Dict:
+    """
+    :return: the "value" of the first answer to `cmd` in a raw response list
+    :raises ResponseError: if the camera answered `cmd` with an error, or not at all
+    """
+    answers = response if isinstance(response, list) else [response]
+    for answer in answers:
+        if answer.get("cmd") != cmd:
+            continue
+        if answer.get("code", 0) != 0 or "value" not in answer:
+            raise ResponseError(f"{cmd} failed: {answer.get('error', answer)}")
+        return answer["value"]
+    raise ResponseError(f"No {cmd} answer in the response")
+
+
+def _time(raw: Dict) -> datetime:
+    return datetime(raw["year"], raw["mon"], raw["day"], raw.get("hour", 0), raw.get("min", 0), raw.get("sec", 0))
+
+
+@dataclass(frozen=True, slots=True)
+class DevInfo:
+    """GetDevInfo, see examples/response/GetDevInfo.json"""
+    model: str
+    name: str
+    serial: str
+    type: str
+    firm_ver: str
+    hard_ver: str
+    build_day: str
+    cfg_ver: str
+    detail: str
+    channel_num: int
+    disk_num: int
+    audio_num: int
+    io_input_num: int
+    io_output_num: int
+    wifi: int
+    b485: int
+
+    @classmethod
+    def from_response(cls, response: Any) -> "DevInfo":
+        raw = response_value(response, "GetDevInfo")["DevInfo"]
+        return cls(
+            model=raw.get("model", ""), name=raw.get("name", ""), serial=raw.get("serial", ""),
+            type=raw.get("type", ""), firm_ver=raw.get("firmVer", ""), hard_ver=raw.get("hardVer", ""),
+            build_day=raw.get("buildDay", ""), cfg_ver=raw.get("cfgVer", ""), detail=raw.get("detail", ""),
+            channel_num=raw.get("channelNum", 0), disk_num=raw.get("diskNum", 0), audio_num=raw.get("audioNum", 0),
+            io_input_num=raw.get("IOInputNum", 0), io_output_num=raw.get("IOOutputNum", 0),
+            wifi=raw.get("wifi", 0), b485=raw.get("B485", 0),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class StreamEnc:
+    """Encoding of one stream, part of Enc."""
+    bit_rate: int
+    frame_rate: int
+    profile: str
+    size: str
+    gop: Optional[int] = None
+
+    @property
+    def resolution(self) -> Tuple[int, int]:
+        """:return: (width, height), parsed from size, eg: "3072*1728" """
+        width, _, height = self.size.partition("*")
+        return int(width), int(height)
+
+    @classmethod
+    def from_dict(cls, raw: Dict) -> "StreamEnc":
+        return cls(bit_rate=raw.get("bitRate", 0), frame_rate=raw.get("frameRate", 0),
+                   profile=raw.get("profile", ""), size=raw.get("size", ""), gop=raw.get("gop"))
+
+
+@dataclass(frozen=True, slots=True)
+class Enc:
+    """GetEnc, see examples/response/GetEnc.json"""
+    channel: int
+    audio: int
+    main_stream: StreamEnc
+    sub_stream: StreamEnc
+
+    @classmethod
+    def from_response(cls, response: Any) -> "Enc":
+        raw = response_value(response, "GetEnc")["Enc"]
+        return cls(channel=raw.get("channel", 0), audio=raw.get("audio", 0),
+                   main_stream=StreamEnc.from_dict(raw["mainStream"]),
+                   sub_stream=StreamEnc.from_dict(raw["subStream"]))
+
+
+@dataclass(frozen=True, slots=True)
+class HddInfo:
+    """One disk or SD card of GetHddInfo, see examples/response/GetHddInfo.json. Sizes are in MB."""
+    id: int
+    capacity: int
+    size: int
+    format: int
+    mount: int
+
+    @property
+    def formatted(self) -> bool:
+        return bool(self.format)
+
+    @property
+    def mounted(self) -> bool:
+        return bool(self.mount)
+
+    @classmethod
+    def from_response(cls, response: Any) -> List["HddInfo"]:
+        """:return: one HddInfo per disk"""
+        return [cls(id=raw.get("id", 0), capacity=raw.get("capacity", 0), size=raw.get("size", 0),
+                    format=raw.get("format", 0), mount=raw.get("mount", 0))
+                for raw in response_value(response, "GetHddInfo")["HddInfo"]]
+
+
+@dataclass(frozen=True, slots=True)
+class Performance:
+    """GetPerformance, see examples/response/GetPerformance.json"""
+    codec_rate: int
+    cpu_used: int
+    net_throughput: int
+
+    @classmethod
+    def from_response(cls, response: Any) -> "Performance":
+        raw = response_value(response, "GetPerformance")["Performance"]
+        return cls(codec_rate=raw.get("codecRate", 0), cpu_used=raw.get("cpuUsed", 0),
+                   net_throughput=raw.get("netThroughput", 0))
+
+
+@dataclass(frozen=True, slots=True)
+class SearchFile:
+    """A recording listed by Search."""
+    name: str
+    start: datetime
+    end: datetime
+    size: int
+    type: str
+    width: int
+    height: int
+    frame_rate: int
+
+    @classmethod
+    def from_dict(cls, raw: Dict) -> "SearchFile":
+        return cls(name=raw["name"], start=_time(raw["StartTime"]), end=_time(raw["EndTime"]),
+                   size=int(raw.get("size", 0)), type=raw.get("type", ""), width=raw.get("width", 0),
+                   height=raw.get("height", 0), frame_rate=raw.get("frameRate", 0))
+
+
+@dataclass(frozen=True, slots=True)
+class SearchStatus:
+    """Which days of a month have recordings, as answered by Search."""
+    year: int
+    mon: int
+    table: str
+
+    def days(self) -> List[int]:
+        """:return: the days of the month with recordings"""
+        return [day for day, flag in enumerate(self.table, 1) if flag == "1"]
+
+
+@dataclass(frozen=True, slots=True)
+class SearchResult:
+    """Search, as sent by get_motion_files and get_playback_files."""
+    channel: int
+    files: Tuple[SearchFile, ...]
+    status: Tuple[SearchStatus, ...]
+
+    @classmethod
+    def from_response(cls, response: Any) -> "SearchResult":
+        raw = response_value(response, "Search").get("SearchResult", {})
+        return cls(channel=raw.get("channel", 0),
+                   files=tuple(SearchFile.from_dict(f) for f in raw.get("File", ())),
+                   status=tuple(SearchStatus(year=s["year"], mon=s["mon"], table=s.get("table", ""))
+                                for s in raw.get("Status", ())))
+
+
+@dataclass(frozen=True, slots=True)
+class Permission:
+    """An entry of GetAbility. permit is a bit field: 1 option, 2 read, 4 write."""
+    permit: int
+    ver: int
+
+    OPTION = 1
+    READ = 2
+    WRITE = 4
+
+    @property
+    def supported(self) -> bool:
+        return self.ver > 0
+
+
+# Abilities are a few hundred entries repeated per channel, with only a handful of distinct values
+_PERMISSIONS: Dict[Tuple[int, int], Permission] = {}
+
+
+def _permission(raw: Dict) -> Permission:
+    key = (raw.get("permit", 0), raw.get("ver", 0))
+    permission = _PERMISSIONS.get(key)
+    if permission is None:
+        permission = _PERMISSIONS.setdefault(key, Permission(*key))
+    return permission
+
+
+@dataclass(frozen=True, slots=True)
+class Ability:
+    """GetAbility: what the device and each of its channels support."""
+    device: Dict[str, Permission]
+    channels: Tuple[Dict[str, Permission], ...]
+
+    def supports(self, name: str, channel: Optional[int] = None) -> bool:
+        """
+        :param name: ability name, eg: "ptzCtrl", "supportFtpEnable"
+        :param channel: look the ability up on that channel instead of the device
+        """
+        abilities = self.device if channel is None else self.channels[channel]
+        permission = abilities.get(name)
+        return permission is not None and permission.supported
+
+    @classmethod
+    def from_response(cls, response: Any) -> "Ability":
+        raw = response_value(response, "GetAbility")["Ability"]
+        device = {k: _permission(v) for k, v in raw.items() if k != "abilityChn" and isinstance(v, dict)}
+        channels = tuple({k: _permission(v) for k, v in chn.items() if isinstance(v, dict)}
+                         for chn in raw.get("abilityChn", ()))
+        return cls(device=device, channels=channels)
+
+
+MODELS = {
+    "GetDevInfo": DevInfo,
+    "GetEnc": Enc,
+    "GetHddInfo": HddInfo,
+    "GetPerformance": Performance,
+    "Search": SearchResult,
+    "GetAbility": Ability,
+}
+
+
+def from_response(response: Any) -> Any:
+    """
+    Build the model of a raw response, chosen by the "cmd" of its first answer.
+    :param response: the raw response list returned by an API method
+    :return: the model, as returned by its from_response
+    """
+    answers = response if isinstance(response, list) else [response]
+    if not answers:
+        raise ResponseError("Empty response")
+    cmd = answers[0].get("cmd")
+    if cmd not in MODELS:
+        raise ResponseError(f"No model for {cmd}, expected one of {sorted(MODELS)}")
+    return MODELS[cmd].from_response(answers)
@@ -0,0 +1,68 @@
+import json
+from typing import Any, Union
+
+
+class JsonCodec:
+    """Encodes request bodies and decodes responses with the standard library json module."""
+    name = "json"
+
+    @staticmethod
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def loads(data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    """orjson codec, usually the fastest. Requires "pip install orjson"."""
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self.dumps = orjson.dumps
+        self.loads = orjson.loads
+
+
+class UjsonCodec:
+    """ujson codec. Requires "pip install ujson"."""
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+        self.loads = ujson.loads
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+CODECS = {
+    "json": JsonCodec,
+    "orjson": OrjsonCodec,
+    "ujson": UjsonCodec,
+}
+
+
+def get_codec(codec: Any = None) -> Any:
+    """
+    Resolve the codec option of a transport.
+    :param codec: None or "json" for the standard library, "orjson" or "ujson", "auto" for the fastest one
+    installed, or any object with dumps(obj) -> bytes and loads(bytes) -> obj.
+    A named codec that is not installed falls back to the standard library json.
+    :return: codec object
+    """
+    if codec is None:
+        return JsonCodec()
+    if not isinstance(codec, str):
+        return codec
+    names = ["orjson", "ujson"] if codec == "auto" else [codec]
+    for name in names:
+        if name not in CODECS:
+            raise ValueError(f"Unknown JSON codec {name!r}, expected one of {sorted(CODECS)} or 'auto'")
+        try:
+            return CODECS[name]()
+        except ImportError:
+            continue
+    return JsonCodec()
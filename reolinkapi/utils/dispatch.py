@@ -0,0 +1,191 @@
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from queue import Empty, Full, Queue
+from typing import Any, Callable, Dict, List, Optional
+
+# Marks the end of the queue for a worker
+_STOP = object()
+
+
+@dataclass(frozen=True)
+class DispatchOptions:
+    """
+    How a FrameDispatcher runs the callback, checked when built so that a client can reject bad options before
+    it starts any dispatcher, eg: RtspClient(..., callback=detect, dispatch=DispatchOptions(workers=2)).
+    See FrameDispatcher for the meaning of each option.
+    """
+    workers: int = 1
+    queue_size: int = 4
+    policy: str = "drop_oldest"
+    executor: str = "thread"
+
+    POLICIES = ("drop_oldest", "drop_newest", "block")
+    EXECUTORS = ("thread", "process")
+
+    def __post_init__(self):
+        if self.policy not in self.POLICIES:
+            raise ValueError(f"Unknown policy {self.policy!r}, expected one of {self.POLICIES}")
+        if self.executor not in self.EXECUTORS:
+            raise ValueError(f"Unknown executor {self.executor!r}, expected one of {self.EXECUTORS}")
+        if self.workers < 1 or self.queue_size < 1:
+            raise ValueError("workers and queue_size must be at least 1")
+
+
+class FrameDispatcher:
+    """
+    Runs a frame callback on worker threads or processes behind a bounded queue, so that a slow callback never
+    holds up the thread reading the stream.
+        dispatcher = FrameDispatcher(detect, workers=2, queue_size=4, policy="drop_oldest")
+        dispatcher.submit(frame)
+        dispatcher.metrics()
+
+    When the queue is full, the policy decides:
+        "drop_oldest": discard the oldest waiting frame, the callbacks stay close to real time
+        "drop_newest": discard the submitted frame, the callbacks get a gapless run of older frames
+        "block": wait for room, the reader is slowed down to the callbacks' pace and no frame is lost
+    With executor="process" the callback and frames must be picklable. Each worker thread then hands its
+    frame to a process pool of the same size and waits for the result, which keeps the queue bound.
+    """
+
+    POLICIES = DispatchOptions.POLICIES
+    EXECUTORS = DispatchOptions.EXECUTORS
+
+    def __init__(self, callback: Callable[[Any], Any], workers: int = 1, queue_size: int = 4,
+                 policy: str = "drop_oldest", executor: str = "thread",
+                 on_drop: Optional[Callable[[Any], Any]] = None):
+        """
+        :param callback: called with every frame that is not dropped
+        :param workers: number of callbacks running at once
+        :param queue_size: number of frames waiting for a worker
+        :param policy: "drop_oldest", "drop_newest" or "block"
+        :param executor: "thread" or "process"
+        :param on_drop: called with every dropped frame, eg: to give its buffer back to a FramePool
+        """
+        self.options = DispatchOptions(workers, queue_size, policy, executor)
+        self.callback = callback
+        self.policy = policy
+        self.on_drop = on_drop
+        self._queue: Queue = Queue(maxsize=queue_size)
+        # Counters updated by the workers
+        self._lock = threading.Lock()
+        # Serialises submissions and the queueing of the stop markers: once a submission holds it and saw the
+        # dispatcher open, no stop marker is in the queue yet
+        self._submit_lock = threading.Lock()
+        self._closed = False
+        self._stopper: Optional[threading.Thread] = None
+        self._pool: Optional[Executor] = ProcessPoolExecutor(max_workers=workers) if executor == "process" else None
+        self.submitted = 0
+        self.dropped = 0
+        self.completed = 0
+        self.errors = 0
+        self.max_queue_depth = 0
+        self._workers: List[threading.Thread] = []
+        for index in range(workers):
+            worker = threading.Thread(target=self._work, name=f"FrameDispatcher-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    @classmethod
+    def from_options(cls, callback: Callable[[Any], Any], options: DispatchOptions,
+                     on_drop: Optional[Callable[[Any], Any]] = None) -> "FrameDispatcher":
+        """:return: a dispatcher running callback as set by options"""
+        return cls(callback, options.workers, options.queue_size, options.policy, options.executor, on_drop)
+
+    def submit(self, frame: Any) -> bool:
+        """
+        Queue a frame for the callback, applying the policy if the queue is full.
+        :return: False if the frame was dropped, or the dispatcher is closed
+        """
+        with self._submit_lock:
+            if self._closed:
+                return False
+            self.submitted += 1
+            if self.policy == "block":
+                self._queue.put(frame)
+            else:
+                try:
+                    self._queue.put_nowait(frame)
+                except Full:
+                    if self.policy == "drop_newest":
+                        dropped = frame
+                    else:
+                        try:
+                            # Never a stop marker, see _submit_lock
+                            dropped = self._queue.get_nowait()
+                        except Empty:
+                            # A worker took it meanwhile
+                            dropped = None
+                        self._queue.put_nowait(frame)
+                    if dropped is not None:
+                        self.dropped += 1
+                        if self.on_drop is not None:
+                            self.on_drop(dropped)
+                    if dropped is frame:
+                        return False
+        depth = self._queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+        return True
+
+    def _work(self) -> None:
+        while True:
+            frame = self._queue.get()
+            if frame is _STOP:
+                return
+            try:
+                if self._pool is None:
+                    self.callback(frame)
+                else:
+                    self._pool.submit(self.callback, frame).result()
+            except Exception as e:
+                print("frame callback failed:", e)
+                with self._lock:
+                    self.errors += 1
+            else:
+                with self._lock:
+                    self.completed += 1
+
+    def metrics(self) -> Dict[str, int]:
+        """:return: frame counters and the current and largest number of frames waiting"""
+        return {
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "completed": self.completed,
+            "errors": self.errors,
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stop accepting frames. The frames already queued are still processed.
+        :param wait: wait until they are, also after an earlier close without waiting. Ignored when called
+        from the callback, which cannot wait for itself.
+        """
+        with self._lock:
+            stopper = self._stopper
+            if stopper is None:
+                self._closed = True
+                # The stop markers wait for room behind the queued frames on their own thread, so that closing
+                # without waiting never blocks on a slow callback
+                stopper = self._stopper = threading.Thread(target=self._stop_workers, daemon=True)
+                stopper.start()
+        if wait and threading.current_thread() not in self._workers:
+            stopper.join()
+
+    def _stop_workers(self) -> None:
+        with self._submit_lock:
+            for _ in self._workers:
+                self._queue.put(_STOP)
+        for worker in self._workers:
+            worker.join()
+        # Only once the workers are done: they hand the queued frames to the pool until then
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> "FrameDispatcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,35 @@
+import re
+from typing import List, Optional, Tuple
+
+_CONTENT_RANGE = re.compile(r'bytes\s+(?:(\d+)-(\d+)|\*)/(\d+|\*)')
+
+
+def parse_content_range(header: Optional[str]) -> Optional[Tuple[Optional[int], Optional[int], Optional[int]]]:
+    """
+    Parse a Content-Range response header, eg: "bytes 0-1023/4096" or "bytes */4096"
+    :return: (first byte, last byte, total size), parts the header leaves out are None. None if unparsable.
+    """
+    if not header:
+        return None
+    match = _CONTENT_RANGE.match(header.strip())
+    if match is None:
+        return None
+    start, end, total = match.groups()
+    return (None if start is None else int(start), None if end is None else int(end),
+            None if total == '*' else int(total))
+
+
+def split_ranges(total: int, parts: int) -> List[Tuple[int, int]]:
+    """
+    Split total bytes into at most `parts` contiguous inclusive byte ranges of near equal size.
+    :return: [(first byte, last byte), ...]
+    """
+    parts = max(1, min(parts, total))
+    size, extra = divmod(total, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append((start, end - 1))
+        start = end
+    return ranges
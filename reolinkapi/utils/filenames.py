@@ -0,0 +1,259 @@
+"""
+Decoder for the names of the recordings stored by the cameras, eg:
+    Mp4Record/2024-08-12/RecM13_DST20240812_214255_214348_1F1E828_4DDA4D.mp4
+    Mp4Record/2024-09-13/RecS09_DST20240907_084519_084612_0_55289080000000_307BC0.mp4
+Names carry the stream, channel, start and end time, file size and, since v2, what triggered the recording.
+See https://github.com/sven337/ReolinkLinux/wiki/Figuring-out-the-file-names#file-name-structure
+
+parse_filename decodes one name. decode_filenames decodes many into a columnar FilenameTable whose flag
+filters use NumPy bit operations when NumPy is installed:
+    table = decode_filenames(cam.iter_playback_files(start, end))
+    table.filter(ai_pd=1).filenames  # person-triggered clips
+"""
+import re
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from reolinkapi.utils.motion import _day_seconds, from_epoch
+
+# Any directory or flattened prefix (Mp4Record/2024-08-12/ or Mp4Record_2024-08-12_) is ignored
+_NAME = re.compile(r'(?:.*[/_-])?Rec([MS])(\d)(\d)_(DST)?(\d{8})_(\d{6})_(\d{6})_([0-9A-Fa-f_]+)\.mp4$')
+
+# Flag name -> (bit position, bit size) in the hex flags field of v2, v3 and v9 names
+FLAGS = {
+    'resolution_index': (21, 7),
+    'tv_system': (20, 1),
+    'framerate': (13, 7),
+    'audio_index': (11, 2),
+    'ai_pd': (10, 1),  # person
+    'ai_fd': (9, 1),  # face
+    'ai_vd': (8, 1),  # vehicle
+    'ai_ad': (7, 1),  # animal
+    'encoder_type_index': (5, 2),
+    'is_schedule_record': (4, 1),
+    'is_motion_record': (3, 1),
+    'is_rf_record': (2, 1),
+    'is_doorbell_press_record': (1, 1),
+    'ai_other': (0, 1),
+}
+_FLAG_MASKS = tuple((name, shift, (1 << size) - 1) for name, (shift, size) in FLAGS.items())
+
+# Marks a missing flags field or size in FilenameTable columns
+MISSING = -1
+
+
+def decode_flags(value: Union[int, str]) -> Dict[str, int]:
+    """
+    :param value: the flags field, as an int or the hex string of the filename
+    :return: flag name -> value, see FLAGS
+    """
+    if isinstance(value, str):
+        value = int(value, 16)
+    return {name: (value >> shift) & mask for name, shift, mask in _FLAG_MASKS}
+
+
+def _split_suffix(version: int, suffix: str) -> Optional[tuple]:
+    """:return: (flags, size, animal_type) from the part of the name after the end time, None if malformed"""
+    parts = suffix.split('_')
+    try:
+        if version == 9:
+            if len(parts) != 3 or len(parts[1]) != 14:
+                return None
+            return int(parts[1][:7], 16), int(parts[2], 16), int(parts[0])
+        if version in (2, 3):
+            if len(parts) != 2:
+                return None
+            return int(parts[0], 16), int(parts[1], 16), None
+    except ValueError:
+        return None
+    return None, None, None
+
+
+class RecordingName:
+    """A decoded recording filename. Trigger flags are decoded on access."""
+    __slots__ = ("filename", "stream", "channel", "version", "dst", "start", "end", "flags", "size", "animal_type")
+
+    def __init__(self, filename: str, stream: str, channel: int, version: int, dst: bool, start: datetime,
+                 end: datetime, flags: Optional[int], size: Optional[int], animal_type: Optional[int]):
+        self.filename = filename
+        self.stream = stream
+        self.channel = channel
+        self.version = version
+        self.dst = dst
+        self.start = start
+        self.end = end
+        self.flags = flags
+        self.size = size
+        self.animal_type = animal_type
+
+    @property
+    def triggers(self) -> Dict[str, int]:
+        """:return: decode_flags of the flags field, {} for names without one"""
+        return {} if self.flags is None else decode_flags(self.flags)
+
+    def __repr__(self) -> str:
+        return f"RecordingName({self.filename!r})"
+
+
+def parse_filename(filename: str) -> Optional[RecordingName]:
+    """
+    Decode a recording name, with or without its Mp4Record/<date>/ directory.
+    :return: RecordingName, None if the name is not a recording name
+    """
+    match = _NAME.match(filename)
+    if match is None:
+        return None
+    stream, channel, version, dst, day, start, end, suffix = match.groups()
+    version = int(version)
+    decoded = _split_suffix(version, suffix)
+    if decoded is None:
+        return None
+    start = datetime(int(day[:4]), int(day[4:6]), int(day[6:]), int(start[:2]), int(start[2:4]), int(start[4:]))
+    end = start.replace(hour=int(end[:2]), minute=int(end[2:4]), second=int(end[4:]))
+    if end < start:
+        # Recorded across midnight, the name only carries the start date
+        end += timedelta(days=1)
+    return RecordingName(filename, 'main' if stream == 'M' else 'sub', int(channel), version, dst is not None,
+                         start, end, *decoded)
+
+
+class _Midnights(dict):
+    """"YYYYMMDD" -> naive epoch seconds of that midnight"""
+
+    def __missing__(self, day: str) -> int:
+        seconds = self[day] = _day_seconds[(int(day[:4]) * 13 + int(day[4:6])) * 32 + int(day[6:])]
+        return seconds
+
+
+class _TimesOfDay(dict):
+    """"HHMMSS" -> seconds since midnight"""
+
+    def __missing__(self, hms: str) -> int:
+        seconds = self[hms] = int(hms[:2]) * 3600 + int(hms[2:4]) * 60 + int(hms[4:])
+        return seconds
+
+
+# Names repeat the same days and times over and over, these caches replace most int() parsing in bulk decoding
+_midnights = _Midnights()
+_times_of_day = _TimesOfDay()
+
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class FilenameTable:
+    """
+    Recording names decoded into columns, for filtering thousands of names at once.
+    starts / ends are naive epoch seconds like MotionEvents. flags, sizes and animal_types hold MISSING
+    where the name has no such field. Names that could not be decoded are left out and listed in `invalid`.
+    """
+    __slots__ = ("filenames", "streams", "channels", "versions", "dsts", "starts", "ends", "flags", "sizes",
+                 "animal_types", "invalid")
+    _COLUMNS = ("channels", "versions", "dsts", "starts", "ends", "flags", "sizes", "animal_types")
+
+    def __init__(self):
+        self.filenames: List[str] = []
+        self.streams: List[str] = []
+        self.channels = array("q")
+        self.versions = array("q")
+        self.dsts = array("b")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.flags = array("q")
+        self.sizes = array("q")
+        self.animal_types = array("q")
+        self.invalid: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.filenames)
+
+    def __getitem__(self, index: int) -> RecordingName:
+        flags, size, animal_type = (None if v == MISSING else v for v in
+                                    (self.flags[index], self.sizes[index], self.animal_types[index]))
+        return RecordingName(self.filenames[index], self.streams[index], self.channels[index], self.versions[index],
+                             bool(self.dsts[index]), from_epoch(self.starts[index]), from_epoch(self.ends[index]),
+                             flags, size, animal_type)
+
+    def flag(self, name: str) -> Any:
+        """
+        :param name: a FLAGS name, eg: "ai_pd"
+        :return: the flag of every row, a NumPy array if NumPy is installed, else a list. MISSING where unknown.
+        """
+        shift, size = FLAGS[name]
+        mask = (1 << size) - 1
+        np = _numpy()
+        if np is not None:
+            flags = np.frombuffer(self.flags, dtype=np.int64)
+            return np.where(flags == MISSING, MISSING, (flags >> shift) & mask)
+        return [MISSING if f == MISSING else (f >> shift) & mask for f in self.flags]
+
+    def select(self, **flags: int) -> List[int]:
+        """
+        :param flags: flag name -> required value, eg: ai_pd=1, ai_vd=1 for person and vehicle
+        :return: the indexes of the rows matching every condition
+        """
+        np = _numpy()
+        if np is not None:
+            keep = np.ones(len(self), dtype=bool)
+            for name, value in flags.items():
+                keep &= self.flag(name) == value
+            return np.flatnonzero(keep).tolist()
+        rows = range(len(self))
+        for name, value in flags.items():
+            column = self.flag(name)
+            rows = [i for i in rows if column[i] == value]
+        return list(rows)
+
+    def take(self, rows: Iterable[int]) -> "FilenameTable":
+        """:return: a table of the given rows"""
+        rows = list(rows)
+        table = FilenameTable()
+        table.filenames = [self.filenames[i] for i in rows]
+        table.streams = [self.streams[i] for i in rows]
+        for name in self._COLUMNS:
+            column = getattr(self, name)
+            setattr(table, name, array(column.typecode, [column[i] for i in rows]))
+        return table
+
+    def filter(self, **flags: int) -> "FilenameTable":
+        """:return: the rows matching every flag condition, eg: table.filter(ai_pd=1)"""
+        return self.take(self.select(**flags))
+
+
+def decode_filenames(filenames: Iterable[str]) -> FilenameTable:
+    """
+    Decode many recording names into columns.
+    :param filenames: recording names, eg: from get_playback_files or MotionEvents.filenames
+    :return: FilenameTable
+    """
+    table = FilenameTable()
+    match = _NAME.match
+    midnights, times_of_day = _midnights, _times_of_day
+    for filename in filenames:
+        m = match(filename)
+        decoded = None if m is None else _split_suffix(int(m.group(3)), m.group(8))
+        if decoded is None:
+            table.invalid.append(filename)
+            continue
+        stream, channel, version, dst, day, start, end, _ = m.groups()
+        midnight = midnights[day]
+        start = midnight + times_of_day[start]
+        end = midnight + times_of_day[end]
+        flags, size, animal_type = decoded
+        table.filenames.append(filename)
+        table.streams.append('main' if stream == 'M' else 'sub')
+        table.channels.append(int(channel))
+        table.versions.append(int(version))
+        table.dsts.append(dst is not None)
+        table.starts.append(start)
+        table.ends.append(end if end >= start else end + 86400)
+        table.flags.append(MISSING if flags is None else flags)
+        table.sizes.append(MISSING if size is None else size)
+        table.animal_types.append(MISSING if animal_type is None else animal_type)
+    return table
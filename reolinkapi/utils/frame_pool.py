@@ -0,0 +1,153 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class PooledFrame:
+    """
+    A frame decoded into a buffer of a FramePool. Hand it back when done, or the reader runs out of buffers:
+        with frame:
+            process(frame.array)
+    """
+    __slots__ = ("array", "_pool", "_released")
+
+    def __init__(self, array: Any, pool: "FramePool"):
+        self.array = array
+        self._pool = pool
+        self._released = False
+
+    def release(self) -> None:
+        """Return the buffer to its pool. The array must not be used afterwards. Releasing twice does nothing."""
+        if not self._released:
+            self._released = True
+            self._pool._give_back(self.array)
+
+    def __enter__(self) -> "PooledFrame":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.array.shape
+
+    def __repr__(self) -> str:
+        return f"PooledFrame({self.array.shape}{', released' if self._released else ''})"
+
+
+class FramePool:
+    """
+    Fixed set of preallocated frame buffers, recycled instead of allocating an array for every frame.
+    The buffers are allocated on the first acquire, or by allocate() when the shape is only known later.
+    """
+
+    def __init__(self, size: int, shape: Optional[Tuple[int, ...]] = None, dtype: str = "uint8"):
+        """
+        :param size: number of buffers, ie: frames that can be held at once
+        :param shape: shape of every buffer, eg: (1080, 1920, 3)
+        :param dtype: NumPy dtype of the buffers
+        """
+        if size < 1:
+            raise ValueError("A FramePool needs at least one buffer")
+        self.size = size
+        self.shape = None
+        self.dtype = dtype
+        self._free: List[Any] = []
+        self._cond = threading.Condition()
+        # Number of acquires that found no free buffer and had to wait
+        self.waits = 0
+        if shape is not None:
+            self.allocate(shape)
+
+    def allocate(self, shape: Tuple[int, ...]) -> None:
+        """Allocate the buffers, once."""
+        import numpy as np
+        with self._cond:
+            if self.shape is not None:
+                raise ValueError(f"The pool is already allocated with shape {self.shape}")
+            self.shape = tuple(shape)
+            self._free = [np.empty(self.shape, dtype=self.dtype) for _ in range(self.size)]
+            self._cond.notify_all()
+
+    @property
+    def available(self) -> int:
+        """:return: number of free buffers"""
+        return len(self._free)
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[PooledFrame]:
+        """
+        Take a free buffer, waiting for one to be released if there is none.
+        :param timeout: seconds to wait, None to wait forever
+        :return: PooledFrame, None on timeout
+        """
+        with self._cond:
+            if self.shape is None:
+                raise ValueError("The pool has no shape yet, call allocate first")
+            if not self._free:
+                self.waits += 1
+                if not self._cond.wait_for(lambda: self._free, timeout):
+                    return None
+            return PooledFrame(self._free.pop(), self)
+
+    def _give_back(self, array: Any) -> None:
+        with self._cond:
+            self._free.append(array)
+            self._cond.notify()
+
+
+class FrameTransform:
+    """
+    Resize and/or colour conversion writing into arrays given by the caller, eg: the buffers of a FramePool.
+    The intermediate resized frame of a combined resize and conversion is kept and reused.
+    """
+
+    def __init__(self, size: Optional[Tuple[int, int]] = None, color: Optional[int] = None):
+        """
+        :param size: (width, height) to resize to
+        :param color: OpenCV colour conversion code, eg: cv2.COLOR_BGR2RGB
+        """
+        self.size = size
+        self.color = color
+        self._resized = None
+        # Input shape -> output shape
+        self._shapes: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+
+    def output_shape(self, shape: Tuple[int, ...]) -> Tuple[int, ...]:
+        """:return: the shape of the output for an input frame of the given shape"""
+        shape = tuple(shape)
+        output = self._shapes.get(shape)
+        if output is None:
+            output = self._shapes[shape] = self._output_shape(shape)
+        return output
+
+    def _output_shape(self, shape: Tuple[int, ...]) -> Tuple[int, ...]:
+        if self.size is not None:
+            shape = (self.size[1], self.size[0]) + tuple(shape[2:])
+        if self.color is not None:
+            import cv2
+            import numpy as np
+            # Conversions may change the number of channels, let OpenCV tell on a single pixel
+            pixel = cv2.cvtColor(np.zeros((1, 1) + tuple(shape[2:]), dtype=np.uint8), self.color)
+            shape = tuple(shape[:2]) + pixel.shape[2:]
+        return tuple(shape)
+
+    def apply(self, frame: Any, dst: Any = None) -> Any:
+        """
+        :param frame: input frame
+        :param dst: output array of output_shape(frame.shape), allocated if None
+        :return: dst
+        """
+        import cv2
+        if self.size is None and self.color is None:
+            if dst is None:
+                return frame.copy()
+            dst[...] = frame
+            return dst
+        if self.color is None:
+            return cv2.resize(frame, self.size, dst=dst)
+        if self.size is not None:
+            resized_shape = (self.size[1], self.size[0]) + frame.shape[2:]
+            if self._resized is None or self._resized.shape != resized_shape:
+                self._resized = None
+            self._resized = frame = cv2.resize(frame, self.size, dst=self._resized)
+        return cv2.cvtColor(frame, self.color, dst=dst)
@@ -0,0 +1,171 @@
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Union
+
+# Cameras report their local wall clock time without a timezone. Timestamps here are that wall clock time
+# counted in seconds from 1970-01-01 00:00, so they convert back to the same naive datetimes.
+EPOCH = datetime(1970, 1, 1)
+_EPOCH_DATE = EPOCH.date()
+
+
+class _DaySeconds(dict):
+    """Epoch seconds of midnight, keyed by (year * 13 + month) * 32 + day so lookups stay a plain dict hit."""
+
+    def __missing__(self, key: int) -> int:
+        year, rest = divmod(key, 13 * 32)
+        month, day = divmod(rest, 32)
+        seconds = self[key] = (date(year, month, day) - _EPOCH_DATE).days * 86400
+        return seconds
+
+
+_day_seconds = _DaySeconds()
+
+
+def search_time_to_epoch(raw: Dict[str, int]) -> int:
+    """
+    :param raw: a StartTime / EndTime dict of a Search answer, eg: {"year": 2024, "mon": 8, "day": 12, ...}
+    :return: naive epoch seconds
+    """
+    return (_day_seconds[(raw["year"] * 13 + raw["mon"]) * 32 + raw["day"]]
+            + raw["hour"] * 3600 + raw["min"] * 60 + raw["sec"])
+
+
+def to_epoch(value: Union[datetime, float]) -> float:
+    """:return: naive epoch seconds of a datetime, numbers are returned as they are"""
+    if isinstance(value, datetime):
+        return (value.replace(tzinfo=None) - EPOCH).total_seconds()
+    return value
+
+
+def from_epoch(seconds: float) -> datetime:
+    """:return: the naive datetime of naive epoch seconds"""
+    return EPOCH + timedelta(seconds=seconds)
+
+
+class MotionEvent:
+    """One recording of a motion search. start and end are only turned into datetimes when read."""
+    __slots__ = ("start_ts", "end_ts", "filename", "size")
+
+    def __init__(self, start_ts: int, end_ts: int, filename: str, size: int):
+        self.start_ts = start_ts
+        self.end_ts = end_ts
+        self.filename = filename
+        self.size = size
+
+    @property
+    def start(self) -> datetime:
+        return from_epoch(self.start_ts)
+
+    @property
+    def end(self) -> datetime:
+        return from_epoch(self.end_ts)
+
+    @property
+    def duration(self) -> int:
+        """:return: seconds"""
+        return self.end_ts - self.start_ts
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, MotionEvent):
+            return NotImplemented
+        return (self.start_ts, self.end_ts, self.filename, self.size) == \
+            (other.start_ts, other.end_ts, other.filename, other.size)
+
+    def __repr__(self) -> str:
+        return f"MotionEvent({self.start.isoformat()} - {self.end.isoformat()}, {self.filename!r})"
+
+
+class MotionEvents:
+    """
+    Columnar, time-ordered table of motion events: start and end timestamps and sizes are kept in arrays
+    and the filenames in a list, instead of a dict and two datetimes per event.
+    Indexing and iterating yields MotionEvent records, slicing yields a MotionEvents.
+    The arrays support the buffer protocol, eg: numpy.frombuffer(events.starts, dtype=numpy.int64)
+    """
+    __slots__ = ("starts", "ends", "sizes", "filenames")
+
+    def __init__(self, starts: Iterable[int] = (), ends: Iterable[int] = (), filenames: Iterable[str] = (),
+                 sizes: Iterable[int] = ()):
+        self.starts = array("q", starts)
+        self.ends = array("q", ends)
+        self.filenames: List[str] = list(filenames)
+        self.sizes = array("q", sizes)
+
+    @classmethod
+    def from_search(cls, files: List[Dict]) -> "MotionEvents":
+        """
+        Parse the "File" list of a Search answer. The input is left untouched.
+        :param files: raw file dicts with StartTime, EndTime, name and size
+        """
+        day_seconds = _day_seconds
+        # search_time_to_epoch inlined, these run for every recording of every search
+        starts = [day_seconds[(s["year"] * 13 + s["mon"]) * 32 + s["day"]] + s["hour"] * 3600 + s["min"] * 60
+                  + s["sec"] for s in (f["StartTime"] for f in files)]
+        ends = [day_seconds[(e["year"] * 13 + e["mon"]) * 32 + e["day"]] + e["hour"] * 3600 + e["min"] * 60
+                + e["sec"] for e in (f["EndTime"] for f in files)]
+        filenames = [f["name"] for f in files]
+        sizes = [int(f.get("size", 0)) for f in files]
+        if any(a > b for a, b in zip(starts, starts[1:])):
+            order = sorted(range(len(starts)), key=starts.__getitem__)
+            starts, ends = [starts[i] for i in order], [ends[i] for i in order]
+            filenames, sizes = [filenames[i] for i in order], [sizes[i] for i in order]
+        return cls(starts, ends, filenames, sizes)
+
+    @classmethod
+    def concat(cls, parts: Iterable["MotionEvents"]) -> "MotionEvents":
+        """Join tables covering consecutive time ranges."""
+        events = cls()
+        for part in parts:
+            events.starts.extend(part.starts)
+            events.ends.extend(part.ends)
+            events.filenames.extend(part.filenames)
+            events.sizes.extend(part.sizes)
+        return events
+
+    def __len__(self) -> int:
+        return len(self.filenames)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[MotionEvent, "MotionEvents"]:
+        if isinstance(index, slice):
+            return MotionEvents(self.starts[index], self.ends[index], self.filenames[index], self.sizes[index])
+        return MotionEvent(self.starts[index], self.ends[index], self.filenames[index], self.sizes[index])
+
+    def __iter__(self) -> Iterator[MotionEvent]:
+        return map(MotionEvent, self.starts, self.ends, self.filenames, self.sizes)
+
+    def __repr__(self) -> str:
+        return f"MotionEvents({len(self)} events)"
+
+    def between(self, start: Union[datetime, float, None] = None,
+                end: Union[datetime, float, None] = None) -> "MotionEvents":
+        """
+        :param start: keep the events ending after start, datetime or naive epoch seconds
+        :param end: keep the events starting before end
+        :return: the overlapping events
+        """
+        last = len(self) if end is None else bisect_left(self.starts, to_epoch(end))
+        first = 0
+        if start is not None:
+            # Recordings follow each other, so only those just before the first one starting after `start` can
+            # still be running at `start`
+            start = to_epoch(start)
+            first = min(bisect_left(self.starts, start), last)
+            while first > 0 and self.ends[first - 1] > start:
+                first -= 1
+        return self[first:last]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """:return: the get_motion_files format, [{'start': datetime, 'end': datetime, 'filename': str}]"""
+        return [{'start': from_epoch(s), 'end': from_epoch(e), 'filename': name}
+                for s, e, name in zip(self.starts, self.ends, self.filenames)]
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """:return: {"starts", "ends", "sizes": int64 arrays sharing this table's memory, "filenames": object array}"""
+        import numpy as np
+        return {
+            "starts": np.frombuffer(self.starts, dtype=np.int64),
+            "ends": np.frombuffer(self.ends, dtype=np.int64),
+            "sizes": np.frombuffer(self.sizes, dtype=np.int64),
+            "filenames": np.array(self.filenames, dtype=object),
+        }
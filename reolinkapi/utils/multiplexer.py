@@ -0,0 +1,192 @@
+import math
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from reolinkapi.utils.rtsp_client import RtspClient
+
+
+class FrameBatch:
+    """
+    Frames of every camera of a FrameMultiplexer at one instant.
+    frames: uint8 array of shape (N, H, W, 3), or (N, H, W) for single channel frames, zeros where a camera had
+    no frame
+    timestamps: float64 array of shape (N,), time.time() each frame was read, NaN where missing
+    missing: bool array of shape (N,), True for the cameras without a recent enough frame
+    names: the camera names, in the order of the first axis
+    """
+    __slots__ = ("frames", "timestamps", "missing", "names")
+
+    def __init__(self, frames: Any, timestamps: Any, missing: Any, names: List[str]):
+        self.frames = frames
+        self.timestamps = timestamps
+        self.missing = missing
+        self.names = names
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __repr__(self) -> str:
+        return f"FrameBatch({self.frames.shape}, missing={int(self.missing.sum())})"
+
+
+class FrameMultiplexer:
+    """
+    Reads many RTSP streams at once and yields their frames as time-aligned batches.
+        with FrameMultiplexer.from_cameras(cameras, fps=5, profile="sub") as mux:
+            for batch in mux:
+                detections = detector(batch.frames[~batch.missing])
+
+    Every stream is read in latest mode by its own thread. At each tick the newest frame of every camera
+    is copied into the batch, so a slow camera or a slow consumer never delays the others.
+    A camera whose newest frame is older than max_age is reported missing.
+    """
+
+    def __init__(self, clients: Union[Dict[str, RtspClient], Iterable[RtspClient]], fps: float = 10,
+                 max_age: float = 1.0, size: Optional[Tuple[int, int]] = None):
+        """
+        :param clients: RtspClients, as a dict of name -> client or an iterable named by their ip. Name the
+        clients with a dict when several share an ip, eg: the channels of an NVR.
+        They are read in latest mode, so they must not use pool_size.
+        :param fps: batches per second
+        :param max_age: seconds after which a camera's last frame is considered missing
+        :param size: (width, height) every frame is resized to. Defaults to the size of the first frame received.
+        """
+        items = list(clients.items()) if isinstance(clients, dict) else [(client.ip, client) for client in clients]
+        self.clients: Dict[str, RtspClient] = dict(items)
+        if len(self.clients) < len(items):
+            duplicates = sorted(name for name, count in Counter(name for name, _ in items).items() if count > 1)
+            raise ValueError(f"Several clients named {duplicates}, pass them as a dict of name -> client")
+        for name, client in items:
+            if client.pool is not None:
+                raise ValueError(f"Client {name!r} uses pool_size, which is not available in latest mode")
+        self.names = list(self.clients)
+        self.interval = 1 / fps
+        self.max_age = max_age
+        self.size = size
+        self._last: List[Optional[Tuple[int, float, Any]]] = [None] * len(self.names)
+        self._started = False
+        self._closed = False
+
+    @classmethod
+    def from_cameras(cls, cameras: Iterable[Any], fps: float = 10, max_age: float = 1.0,
+                     size: Optional[Tuple[int, int]] = None, **rtsp_options) -> "FrameMultiplexer":
+        """
+        :param cameras: Camera objects, the streams are opened concurrently. They are named by their ip, which
+        must then be unique.
+        :param rtsp_options: RtspClient options for every stream, eg: profile="sub"
+        """
+        cameras = list(cameras)
+        ips = [camera.ip for camera in cameras]
+        if len(set(ips)) < len(ips):
+            raise ValueError("Several cameras share an ip, open their clients and pass them as a dict instead")
+
+        def open_client(camera: Any) -> RtspClient:
+            return camera.rtsp_client(**{**rtsp_options, "latest": True})
+
+        with ThreadPoolExecutor(max_workers=max(1, len(cameras))) as executor:
+            clients = list(executor.map(open_client, cameras))
+        return cls({camera.ip: client for camera, client in zip(cameras, clients)}, fps=fps, max_age=max_age,
+                   size=size)
+
+    def start(self) -> None:
+        """Start reading every stream. Called by the first iteration."""
+        if self._started:
+            return
+        for client in self.clients.values():
+            client.latest = True
+            client.start_reader()
+        self._started = True
+
+    def close(self) -> None:
+        """Stop every stream and end the iteration."""
+        self._closed = True
+        for client in self.clients.values():
+            if client.capture is not None:
+                client.stop_stream()
+
+    def __enter__(self) -> "FrameMultiplexer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def wait_ready(self, timeout: float = 10) -> bool:
+        """
+        Wait until every camera delivered a frame.
+        :return: False if some still had not when the timeout expired
+        """
+        self.start()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self._poll()
+            if all(item is not None for item in self._last):
+                return True
+            time.sleep(0.01)
+        return False
+
+    def _poll(self) -> None:
+        for i, name in enumerate(self.names):
+            item = self.clients[name].read_latest(timeout=0)
+            if item is not None:
+                self._last[i] = item
+
+    def _frame_shape(self) -> Optional[Tuple[int, ...]]:
+        """:return: the shape of a frame of the batch, from size and the first frame received"""
+        for item in self._last:
+            if item is not None:
+                if self.size is None:
+                    height, width = item[2].shape[:2]
+                    self.size = (width, height)
+                # Keep the channels of the frames, eg: none for grayscale
+                return (self.size[1], self.size[0]) + item[2].shape[2:]
+        return None
+
+    def batch(self) -> Optional[FrameBatch]:
+        """
+        :return: a batch of the newest frames now, None if no camera delivered a frame yet
+        """
+        import numpy as np
+        self.start()
+        self._poll()
+        shape = self._frame_shape()
+        if shape is None:
+            return None
+        count = len(self.names)
+        frames = np.empty((count,) + shape, dtype=np.uint8)
+        timestamps = np.full(count, math.nan)
+        missing = np.ones(count, dtype=bool)
+        now = time.time()
+        for i, item in enumerate(self._last):
+            if item is None or now - item[1] > self.max_age:
+                frames[i] = 0
+                continue
+            frame = item[2]
+            if frame.shape[2:] != shape[2:]:
+                raise ValueError(f"Camera {self.names[i]!r} delivers frames of shape {frame.shape}, without the "
+                                 f"channels {shape[2:]} of the other cameras")
+            if frame.shape[:2] != shape[:2]:
+                import cv2
+                cv2.resize(frame, self.size, dst=frames[i])
+            else:
+                frames[i] = frame
+            timestamps[i] = item[1]
+            missing[i] = False
+        return FrameBatch(frames, timestamps, missing, list(self.names))
+
+    def __iter__(self) -> Iterator[FrameBatch]:
+        self.start()
+        next_tick = time.monotonic()
+        while not self._closed:
+            next_tick += self.interval
+            batch = self.batch()
+            if batch is not None:
+                yield batch
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # The consumer is slower than fps: skip the missed ticks rather than bursting to catch up
+                next_tick = time.monotonic()
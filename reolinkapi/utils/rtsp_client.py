@@ -1,9 +1,66 @@
 import os
-from threading import ThreadError
-from typing import Any
-import cv2
+import random
+import threading
+import time
+from collections import deque
+from queue import Full
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+from reolinkapi.utils.dispatch import DispatchOptions, FrameDispatcher
+from reolinkapi.utils.frame_pool import FramePool, FrameTransform, PooledFrame
 from reolinkapi.utils.util import threaded
 
+if TYPE_CHECKING:
+    from reolinkapi.utils.shared_frames import SharedFrameRing
+
+# FFmpeg options that trade robustness to network jitter for the shortest delay to the first and every next frame
+LOW_LATENCY_OPTIONS = {
+    "fflags": "nobuffer",
+    "flags": "low_delay",
+    "probesize": 32768,
+    "analyzeduration": 500000,
+    "max_delay": 0,
+    "reorder_queue_size": 0,
+}
+
+
+class _CaptureOptions:
+    """
+    OpenCV only takes FFmpeg options from the OPENCV_FFMPEG_CAPTURE_OPTIONS environment variable, read while a
+    capture opens. This sets it for the duration of each open: clients with the same options open concurrently,
+    clients with other options wait for them to finish, and the previous value is restored afterwards.
+    """
+
+    VARIABLE = "OPENCV_FFMPEG_CAPTURE_OPTIONS"
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._current = None
+        self._opening = 0
+        self._previous = None
+
+    def acquire(self, options: str) -> None:
+        with self._cond:
+            self._cond.wait_for(lambda: self._opening == 0 or self._current == options)
+            if self._opening == 0:
+                self._previous = os.environ.get(self.VARIABLE)
+                os.environ[self.VARIABLE] = options
+                self._current = options
+            self._opening += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self._opening -= 1
+            if self._opening == 0:
+                if self._previous is None:
+                    os.environ.pop(self.VARIABLE, None)
+                else:
+                    os.environ[self.VARIABLE] = self._previous
+                self._current = None
+                self._cond.notify_all()
+
+
+_capture_options = _CaptureOptions()
+
 
 class RtspClient:
     """
@@ -14,8 +71,19 @@ class RtspClient:
         - https://stackoverflow.com/questions/55828451/video-streaming-from-ip-camera-in-python-using-opencv-cv2-videocapture
     """
 
+    # Seconds to wait after a failed read before trying again, while the stream is not yet considered stalled
+    FAILED_READ_DELAY = 0.01
+    BACKENDS = ("opencv", "ffmpeg")
+
     def __init__(self, ip: str, username: str, password: str, port: float = 554, profile: str = "main",
-                 use_udp: bool = True, callback: Any = None, **kwargs):
+                 use_udp: bool = True, callback: Any = None, latest: bool = False, buffer_size: int = 1,
+                 sample_fps: Optional[float] = None, keyframes_only: bool = False, reconnect: bool = False,
+                 stall_timeout: float = 10, max_reconnects: Optional[int] = None, backoff: float = 0.5,
+                 max_backoff: float = 30, capture_options: Optional[Dict[str, Any]] = None,
+                 low_latency: bool = False, open_timeout: Optional[float] = None,
+                 read_timeout: Optional[float] = None, dispatch: Optional[DispatchOptions] = None, pool_size: int = 0,
+                 resize: Optional[Tuple[int, int]] = None, color: Optional[int] = None, backend: str = "opencv",
+                 ffmpeg_executable: str = "ffmpeg", **kwargs):
         """
         RTSP client is used to retrieve frames from the camera in a stream
 
@@ -26,63 +94,490 @@ class RtspClient:
         :param profile: "main" or "sub"
         :param use_upd: True to use UDP, False to use TCP
         :param proxies: {"host": "localhost", "port": 8000}
+        :param latest: read frames on a background thread and only hand out the newest one, dropping the frames
+        the consumer was too slow for, so that a slow consumer stays close to real time
+        :param buffer_size: number of most recent frames kept by the latest mode, see recent_frames()
+        :param sample_fps: only deliver about this many frames per second. The frames in between are grabbed but
+        never retrieved, which skips their conversion to BGR and the copy into a new array.
+        :param keyframes_only: only deliver key frames, eg: for thumbnails. The "ffmpeg" backend has ffmpeg skip
+        every other frame. The "opencv" backend needs CAP_PROP_LRF_HAS_KEY_FRAME (4.6+), which tells whether the
+        last packet read was a key frame: the decoder is then limited to one thread (CAP_PROP_N_THREADS, 4.7+)
+        so that it returns each frame as soon as its packet is read. Streams with B-frames still decode out of
+        order and may then deliver other frames.
+        :param reconnect: reopen the stream when the camera closes it or it stalls, instead of ending it
+        :param stall_timeout: seconds without a frame after which the stream counts as stalled
+        :param max_reconnects: consecutive failed reconnection attempts before giving up, None to never give up
+        :param backoff: seconds before the first reconnection attempt, doubled after every failed one
+        :param max_backoff: upper bound of the delay between reconnection attempts
+        :param capture_options: FFmpeg options of this client's capture, eg: {"buffer_size": 4194304}. They
+        override use_udp and the low_latency preset.
+        :param low_latency: add LOW_LATENCY_OPTIONS, which shorten the time to the first frame and disable buffering
+        :param open_timeout: seconds to wait for the stream to open, OpenCV's default (30) if None
+        :param read_timeout: seconds to wait for a frame before a read fails, OpenCV's default (30) if None
+        :param dispatch: in callback mode, run the callback on workers behind a bounded queue instead of on the
+        reading thread, eg: DispatchOptions(workers=2, policy="block"), see utils/dispatch.py. None calls it on
+        the reading thread.
+        :param pool_size: decode into this many preallocated buffers, recycled instead of allocating every frame,
+        see utils/frame_pool.py. The stream then yields PooledFrame objects, which must be released (or used as
+        context managers) for their buffer to be reused. Not available in latest mode nor with process workers.
+        :param resize: (width, height) every frame is resized to, in place into the output buffers
+        :param color: OpenCV colour conversion applied to every frame, eg: cv2.COLOR_BGR2RGB
+        :param backend: "opencv" decodes with cv2.VideoCapture in this process, "ffmpeg" in an ffmpeg subprocess
+        per stream, see utils/ffmpeg_capture.py. With "ffmpeg", capture_options are passed as ffmpeg input options,
+        resize is done by ffmpeg before the frames cross the pipe, and read_timeout (else open_timeout) becomes
+        the socket timeout of ffmpeg. The url and its password are handed to ffmpeg in a temporary file only
+        readable by the user running the process, not on the command line.
+        :param ffmpeg_executable: the ffmpeg executable of the "ffmpeg" backend
         """
+        if sample_fps is not None and sample_fps <= 0:
+            raise ValueError("sample_fps must be positive")
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {self.BACKENDS}")
+        if pool_size and (latest or (dispatch is not None and dispatch.executor == "process")):
+            raise ValueError("pool_size is not available in latest mode nor with process workers")
         self.capture = None
+        # The background thread reading the capture, which then owns it: only that thread releases it
+        self._reader: Optional[threading.Thread] = None
+        self._cancelled = threading.Event()
         self.thread_cancelled = False
         self.callback = callback
+        self.latest = latest
+        # Ring of the newest (sequence number, time.time() of the read, frame), filled by the latest mode reader
+        self._ring: deque = deque(maxlen=max(1, buffer_size))
+        self._ring_cond = threading.Condition()
+        self._seq = 0
+        self._delivered_seq = 0
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.sample_fps = sample_fps
+        self.keyframes_only = keyframes_only
+        self._last_kept = None
+        self.frames_grabbed = 0
+        self.frames_skipped = 0
+        self._retrieve_seconds = 0.0
+        self.reconnect = reconnect
+        self.stall_timeout = stall_timeout
+        self.max_reconnects = max_reconnects
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.reconnects = 0
+        self.stalls = 0
+        self._last_frame_at = time.monotonic()
 
-        capture_options = 'rtsp_transport;'
         self.ip = ip
         self.username = username
         self.password = password
         self.port = port
         self.proxy = kwargs.get("proxies")
         self.url = f'rtsp://{self.username}:{self.password}@{self.ip}:{self.port}//h264Preview_01_{profile}'
-        capture_options += 'udp' if use_udp else 'tcp'
-
-        os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = capture_options
+        self.capture_options = {"rtsp_transport": 'udp' if use_udp else 'tcp'}
+        if low_latency:
+            self.capture_options.update(LOW_LATENCY_OPTIONS)
+        self.capture_options.update(capture_options or {})
+        self.open_timeout = open_timeout
+        self.read_timeout = read_timeout
+        self.dispatch = dispatch
+        self.dispatcher = None
+        self.pool = FramePool(pool_size) if pool_size else None
+        self.backend = backend
+        self.ffmpeg_executable = ffmpeg_executable
+        # The ffmpeg backend scales in the subprocess, leaving only the colour conversion to the transform stage
+        self.scale = resize if backend == "ffmpeg" else None
+        resize = None if backend == "ffmpeg" else resize
+        self.transform = FrameTransform(resize, color) if resize is not None or color is not None else None
+        # The pooled buffer the next frame is decoded into, and the decoding buffer of the transform stage
+        self._pending: Optional[PooledFrame] = None
+        self._scratch = None
 
         # opens the stream capture, but does not retrieve any frames yet.
         self._open_video_capture()
 
+    def _ffmpeg_options(self) -> str:
+        """:return: capture_options in the OPENCV_FFMPEG_CAPTURE_OPTIONS format, eg: rtsp_transport;tcp|fflags;nobuffer"""
+        return '|'.join(f'{key};{value}' for key, value in self.capture_options.items())
+
+    def _capture_params(self) -> List[int]:
+        """:return: the VideoCapture open parameters, [property, value, ...]"""
+        import cv2
+        params = []
+        if self.open_timeout is not None:
+            params += [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, int(self.open_timeout * 1000)]
+        if self.read_timeout is not None:
+            params += [cv2.CAP_PROP_READ_TIMEOUT_MSEC, int(self.read_timeout * 1000)]
+        if self.keyframes_only and hasattr(cv2, "CAP_PROP_N_THREADS"):
+            # Frame threading holds frames back: the key frame flag of the last packet read would then
+            # describe a newer frame than the one retrieved
+            params += [cv2.CAP_PROP_N_THREADS, 1]
+        return params
+
     def _open_video_capture(self):
-        # To CAP_FFMPEG or not To ?
-        self.capture = cv2.VideoCapture(self.url, cv2.CAP_FFMPEG)
+        if self.backend == "ffmpeg":
+            from reolinkapi.utils.ffmpeg_capture import FFmpegCapture
+            timeout = self.read_timeout if self.read_timeout is not None else self.open_timeout
+            self.capture = FFmpegCapture(self.url, self.capture_options, size=self.scale,
+                                         keyframes_only=self.keyframes_only, read_timeout=timeout,
+                                         ffmpeg=self.ffmpeg_executable)
+            return
+        # Imported here rather than at module level: loading OpenCV is slow and only streaming needs it
+        import cv2
+        params = self._capture_params()
+        _capture_options.acquire(self._ffmpeg_options())
+        try:
+            # To CAP_FFMPEG or not To ?
+            self.capture = cv2.VideoCapture(self.url, cv2.CAP_FFMPEG, params)
+        finally:
+            _capture_options.release()
+
+    def _read(self, image: Any = None) -> Tuple[bool, Any]:
+        """
+        Read the next frame to deliver. With sample_fps or keyframes_only, frames are grabbed until one is
+        worth keeping and only that one is retrieved.
+        :param image: array to decode into, OpenCV allocates a new one if None or not of the frame's shape
+        :return: (success, frame) like VideoCapture.read
+        """
+        if self.sample_fps is None and not self.keyframes_only:
+            return self.capture.read(image)
+        while not self.thread_cancelled:
+            if not self.capture.grab():
+                return False, None
+            self.frames_grabbed += 1
+            if self._keep_grabbed():
+                started = time.thread_time()
+                ret, frame = self.capture.retrieve(image)
+                self._retrieve_seconds += time.thread_time() - started
+                return ret, frame
+            self.frames_skipped += 1
+        return False, None
+
+    def _keep_grabbed(self) -> bool:
+        if self.keyframes_only:
+            import cv2
+            prop = getattr(cv2, "CAP_PROP_LRF_HAS_KEY_FRAME", None)
+            if prop is None:
+                raise RuntimeError("keyframes_only needs OpenCV 4.6 or later")
+            if self.capture.get(prop) <= 0:
+                return False
+        if self.sample_fps is not None:
+            now = time.monotonic()
+            if self._last_kept is not None and now - self._last_kept < 1 / self.sample_fps:
+                return False
+            self._last_kept = now
+        return True
+
+    @property
+    def thread_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @thread_cancelled.setter
+    def thread_cancelled(self, value: bool) -> None:
+        # An Event rather than a bool, so that the reconnection backoff wakes up as soon as the stream is stopped
+        if value:
+            self._cancelled.set()
+        else:
+            self._cancelled.clear()
+
+    def _next_frame(self) -> Optional[Any]:
+        """
+        Read until there is a frame to deliver, watching for stalls and reconnecting if enabled.
+        :return: the frame, None once the stream is stopped, closed or stalled and not reconnected
+        """
+        while not self.thread_cancelled:
+            if self.capture is None or not self.capture.isOpened():
+                if not self._recover("stream closed"):
+                    return None
+                continue
+            ret, frame = self._read(self._decode_target())
+            if ret:
+                self._last_frame_at = time.monotonic()
+                self.frames_read += 1
+                return self._output(frame)
+            if time.monotonic() - self._last_frame_at > self.stall_timeout:
+                self.stalls += 1
+                if not self._recover("stream stalled"):
+                    return None
+            else:
+                # A frozen stream makes read() fail immediately, don't spin on it
+                self._cancelled.wait(self.FAILED_READ_DELAY)
+        return None
+
+    def _decode_target(self) -> Any:
+        """:return: the array to decode the next frame into, None to let OpenCV allocate one"""
+        if self.transform is not None:
+            return self._scratch
+        if self.pool is None or self.pool.shape is None:
+            return None
+        if self._pending is None:
+            self._pending = self._acquire(self.pool.shape)
+        return None if self._pending is None else self._pending.array
+
+    def _acquire(self, shape: Tuple[int, ...]) -> Optional[PooledFrame]:
+        """
+        A free buffer of the given shape, waiting for the consumer to release one.
+        :return: None if the stream was stopped meanwhile
+        """
+        if self.pool.shape is None:
+            self.pool.allocate(shape)
+        elif self.pool.shape != tuple(shape):
+            # The resolution changed, eg: on reconnection. Frames still held go back to the old pool.
+            self.pool = FramePool(self.pool.size, shape, self.pool.dtype)
+        while not self.thread_cancelled:
+            pooled = self.pool.acquire(timeout=0.1)
+            if pooled is not None:
+                return pooled
+        return None
+
+    def _output(self, frame: Any) -> Any:
+        """:return: the decoded frame after the transform stage, in a pooled buffer if pool_size is set"""
+        if self.transform is not None:
+            self._scratch = frame
+            if self.pool is None:
+                return self.transform.apply(frame)
+            pooled = self._acquire(self.transform.output_shape(frame.shape))
+            if pooled is not None:
+                self.transform.apply(frame, pooled.array)
+            return pooled
+        if self.pool is None:
+            return frame
+        pooled, self._pending = self._pending, None
+        if pooled is not None and frame is pooled.array:
+            return pooled
+        # OpenCV allocated the frame: the first one sizes the pool, or the resolution changed
+        if pooled is not None:
+            pooled.release()
+        pooled = self._acquire(frame.shape)
+        if pooled is not None:
+            pooled.array[...] = frame
+        return pooled
+
+    def _release_pending(self) -> None:
+        """Give back the buffer acquired for a frame that will never be read. Called by the reading thread."""
+        if self._pending is not None:
+            self._pending.release()
+            self._pending = None
+
+    def _recover(self, reason: str) -> bool:
+        """
+        Reopen the stream with jittered exponential backoff.
+        :return: False if reconnecting is disabled, gave up or the stream was stopped meanwhile
+        """
+        print(reason)
+        if self.capture is not None:
+            self.capture.release()
+        if not self.reconnect:
+            return False
+        attempt = 0
+        while self.max_reconnects is None or attempt < self.max_reconnects:
+            delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+            # Half fixed, half random, so that cameras dropped together don't all reconnect at the same instant
+            if self._cancelled.wait(delay / 2 + random.uniform(0, delay / 2)):
+                return False
+            attempt += 1
+            try:
+                self._open_video_capture()
+            except Exception as e:
+                # Eg: ffprobe could not open the stream yet, try again after the next delay
+                print(e)
+                self.capture = None
+                continue
+            if self.capture is not None and self.capture.isOpened():
+                self.reconnects += 1
+                self._last_frame_at = time.monotonic()
+                print("stream reconnected")
+                return True
+            if self.capture is not None:
+                self.capture.release()
+        return False
 
     def _stream_blocking(self):
         while True:
             try:
-                if self.capture.isOpened():
-                    ret, frame = self.capture.read()
-                    if ret:
-                        yield frame
-                else:
-                    print("stream closed")
-                    self.capture.release()
-                    return
+                frame = self._next_frame()
             except Exception as e:
                 print(e)
-                self.capture.release()
+                frame = None
+            if frame is None:
+                self._release_pending()
+                self.stop_stream()
                 return
+            yield frame
 
     @threaded
     def _stream_non_blocking(self):
-        while not self.thread_cancelled:
+        deliver = self._deliver()
+        for frame in self._read_frames():
+            deliver(frame)
+
+    def _deliver(self) -> Any:
+        """:return: the function handing a frame to the callback, through a FrameDispatcher if workers are set"""
+        if self.dispatch is None:
+            return self.callback
+        if self.dispatcher is not None:
+            self.dispatcher.close(wait=False)
+        on_drop = _release if self.pool is not None else None
+        self.dispatcher = FrameDispatcher.from_options(self.callback, self.dispatch, on_drop=on_drop)
+        return self.dispatcher.submit
+
+    def _read_frames(self):
+        """Frames for the background readers, until the stream is stopped or closed. Releases the capture."""
+        while True:
             try:
-                if self.capture.isOpened():
-                    ret, frame = self.capture.read()
-                    if ret:
-                        self.callback(frame)
-                else:
-                    print("stream is closed")
-                    self.stop_stream()
-            except ThreadError as e:
+                frame = self._next_frame()
+            except Exception as e:
+                # Eg: a failed reconnection, the readers of read_latest must still see the stream end
+                print(e)
+                frame = None
+            if frame is None:
+                self._release_pending()
+                self.stop_stream()
+                return
+            yield frame
+
+    @threaded
+    def _read_latest(self):
+        for frame in self._read_frames():
+            self._push_frame(frame)
+
+    def _push_frame(self, frame: Any) -> None:
+        with self._ring_cond:
+            self._seq += 1
+            self._ring.append((self._seq, time.time(), frame))
+            self._ring_cond.notify_all()
+
+    def read_latest(self, timeout: Optional[float] = None) -> Optional[Tuple[int, float, Any]]:
+        """
+        Latest mode: wait for a frame newer than the last one handed out and return the newest.
+        The frames read in between are counted in frames_dropped.
+        :param timeout: seconds to wait, None to wait until a frame arrives or the stream stops
+        :return: (sequence number, time.time() of the read, frame), None on timeout or once the stream stopped
+        """
+        with self._ring_cond:
+            if not self._ring_cond.wait_for(lambda: self._seq > self._delivered_seq or self.thread_cancelled,
+                                            timeout):
+                return None
+            if self.thread_cancelled or self._seq <= self._delivered_seq:
+                return None
+            item = self._ring[-1]
+            self.frames_dropped += item[0] - self._delivered_seq - 1
+            self._delivered_seq = item[0]
+            return item
+
+    def recent_frames(self) -> List[Tuple[int, float, Any]]:
+        """:return: the buffer_size newest (sequence number, time, frame) of the latest mode, oldest first"""
+        with self._ring_cond:
+            return list(self._ring)
+
+    def _stream_latest(self):
+        while True:
+            item = self.read_latest()
+            if item is None:
+                return
+            yield item[2]
+
+    @threaded
+    def _stream_latest_non_blocking(self):
+        deliver = self._deliver()
+        for frame in self._stream_latest():
+            deliver(frame)
+
+    def open_shared_stream(self, queue: Any, slots: int = 8, ring: 'SharedFrameRing' = None) -> 'SharedFrameRing':
+        """
+        Copy each decoded frame into a shared memory ring and put a FrameRef on `queue` for it, so that
+        consumer processes get frames without pickling them. See utils/shared_frames.py.
+        A frame whose FrameRef does not fit in the queue is dropped and counted in frames_dropped.
+        Call stop_stream() before closing the ring. A ring closed under the stream ends it.
+        :param queue: where to put the FrameRefs, eg: multiprocessing.Queue(maxsize=slots // 2)
+        :param slots: size of the ring created from the shape of the first frame
+        :param ring: an existing ring to write to instead
+        :return: the ring, pass ring.spec to the consumer processes to attach it
+        """
+        from reolinkapi.utils.shared_frames import SharedFrameRing
+        if self.capture is None or not self.capture.isOpened():
+            self._open_video_capture()
+        self.thread_cancelled = False
+        self._last_frame_at = time.monotonic()
+        if ring is None:
+            frame = self._next_frame()
+            if frame is None:
+                raise ConnectionError("Could not read a first frame from the stream")
+            ring = SharedFrameRing.create(slots, frame.shape)
+            self._share_frame(ring, queue, frame)
+        self._reader = self._stream_shared(ring, queue)
+        return ring
+
+    @threaded
+    def _stream_shared(self, ring: 'SharedFrameRing', queue: Any):
+        for frame in self._read_frames():
+            try:
+                self._share_frame(ring, queue, frame)
+            except Exception as e:
+                # The frame no longer fits the ring, eg: the resolution changed on reconnection, or the ring was
+                # closed. Consumers are attached to this ring, so the stream ends instead.
                 print(e)
+                self.frames_dropped += 1
                 self.stop_stream()
+                return
+
+    def _share_frame(self, ring: 'SharedFrameRing', queue: Any, frame: Any) -> None:
+        if isinstance(frame, PooledFrame):
+            with frame:
+                ref = ring.put(frame.array)
+        else:
+            ref = ring.put(frame)
+        try:
+            queue.put_nowait(ref)
+        except Full:
+            self.frames_dropped += 1
+
+    def start_reader(self) -> threading.Thread:
+        """
+        Start the latest mode reader thread without a consumer, to poll read_latest() instead.
+        :return: the reader thread
+        """
+        if self.capture is None or not self.capture.isOpened():
+            self._open_video_capture()
+        self.thread_cancelled = False
+        self._last_frame_at = time.monotonic()
+        self._reader = self._read_latest()
+        return self._reader
+
+    def stats(self) -> Dict[str, float]:
+        """
+        :return: frame counters. Frames are only dropped in latest and shared memory modes, and only skipped
+        with sample_fps or keyframes_only. cpu_saved_seconds estimates the retrieve time the skipped frames
+        would have cost, from the average measured on the retrieved ones. With callback workers, the
+        FrameDispatcher metrics are added with a callback_ prefix, eg: callback_dropped.
+        """
+        retrieved = self.frames_grabbed - self.frames_skipped
+        per_frame = self._retrieve_seconds / retrieved if retrieved else 0.0
+        return {
+            "frames_read": self.frames_read,
+            "frames_dropped": self.frames_dropped,
+            "frames_grabbed": self.frames_grabbed,
+            "frames_skipped": self.frames_skipped,
+            "retrieve_cpu_seconds": self._retrieve_seconds,
+            "cpu_saved_seconds": self.frames_skipped * per_frame,
+            "reconnects": self.reconnects,
+            "stalls": self.stalls,
+            "pool_waits": self.pool.waits if self.pool is not None else 0,
+            **{f"callback_{name}": value for name, value in
+               (self.dispatcher.metrics() if self.dispatcher is not None else {}).items()},
+        }
 
     def stop_stream(self):
-        self.capture.release()
+        """
+        Stop the stream. A background reader may be inside a read of the capture, which is not thread-safe: it is
+        only told to stop, and releases the capture itself once its read returns.
+        """
         self.thread_cancelled = True
+        reader = self._reader
+        if self.capture is not None and (reader is None or reader is threading.current_thread()
+                                         or not reader.is_alive()):
+            self.capture.release()
+        with self._ring_cond:
+            self._ring_cond.notify_all()
+        if self.dispatcher is not None:
+            # The frames already queued are still handed to the callback
+            self.dispatcher.close(wait=False)
 
     def open_stream(self):
         """
@@ -96,10 +591,22 @@ class RtspClient:
 
         print("opening stream")
 
+        # reset the thread status if the object was not re-created
+        self.thread_cancelled = False
+        self._last_frame_at = time.monotonic()
+
+        if self.latest:
+            self.start_reader()
+            return self._stream_latest() if self.callback is None else self._stream_latest_non_blocking()
+
         if self.callback is None:
             return self._stream_blocking()
         else:
-            # reset the thread status if the object was not re-created
-            if not self.thread_cancelled:
-                self.thread_cancelled = False
-            return self._stream_non_blocking()
+            self._reader = self._stream_non_blocking()
+            return self._reader
+
+
+def _release(frame: Any) -> None:
+    """Give the buffer of a pooled frame the dispatcher dropped back to its pool."""
+    if isinstance(frame, PooledFrame):
+        frame.release()
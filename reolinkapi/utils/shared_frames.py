@@ -0,0 +1,138 @@
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Any, NamedTuple, Optional, Tuple
+
+
+class FrameRef(NamedTuple):
+    """What consumers receive instead of a frame: a few bytes to pickle instead of megabytes."""
+    slot: int
+    seq: int
+    timestamp: float
+
+
+class SharedFrameRing:
+    """
+    Ring of frame slots in shared memory, written by one RtspClient and read by other processes.
+        ring = client.open_shared_stream(queue, slots=16)
+        # in each worker process
+        ring = SharedFrameRing.attach(*spec)  # spec = ring.spec, sent when starting the worker
+        ref = queue.get()
+        frame = ring.get(ref)  # a view into shared memory, no copy
+        ... process frame ...
+        if not ring.valid(ref): result is unreliable, the slot was overwritten while processing
+
+    Slots are reused in turn. Each slot stores the sequence number of its frame, negated while it is being
+    written, so readers can tell whether the frame they were referred to is still there.
+    Make the ring larger than the number of frames consumers hold at once.
+    Closing the ring while its writer is still putting frames makes the next put raise ValueError.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, slots: int, shape: Tuple[int, ...], owner: bool):
+        import numpy as np
+        self._shm = shm
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.owner = owner
+        self._seqs = np.ndarray((slots,), dtype=np.int64, buffer=shm.buf, offset=0)
+        self._times = np.ndarray((slots,), dtype=np.float64, buffer=shm.buf, offset=8 * slots)
+        self._frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=shm.buf, offset=16 * slots)
+        self._next_seq = 1
+        # Held by put and close, so that the memory is never unmapped under a write
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size(slots: int, shape: Tuple[int, ...]) -> int:
+        frame_bytes = 1
+        for dim in shape:
+            frame_bytes *= dim
+        return 16 * slots + slots * frame_bytes
+
+    @classmethod
+    def create(cls, slots: int, shape: Tuple[int, ...], name: Optional[str] = None) -> "SharedFrameRing":
+        """
+        :param slots: number of frames the ring holds
+        :param shape: shape of every frame, eg: (1080, 1920, 3)
+        :param name: shared memory name, generated if None
+        """
+        shm = shared_memory.SharedMemory(name=name, create=True, size=cls._size(slots, shape))
+        ring = cls(shm, slots, shape, owner=True)
+        ring._seqs[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, slots: int, shape: Tuple[int, ...]) -> "SharedFrameRing":
+        """Open a ring created by another process, from its spec."""
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+            # Before 3.13 attaching registers the segment with this process' resource tracker, which would
+            # destroy it when this process exits while the creator still uses it
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, slots, shape, owner=False)
+
+    @property
+    def spec(self) -> Tuple[str, int, Tuple[int, ...]]:
+        """:return: (name, slots, shape), the picklable arguments of attach()"""
+        return self._shm.name, self.slots, self.shape
+
+    def put(self, frame: Any, timestamp: Optional[float] = None) -> FrameRef:
+        """
+        Copy a frame into the next slot. Only one process may write to a ring.
+        :param frame: array of the ring's shape
+        :param timestamp: defaults to time.time()
+        :return: the FrameRef to hand to a consumer
+        """
+        if frame.shape != self.shape:
+            raise ValueError(f"Frame of shape {frame.shape} does not fit a ring of {self.shape}")
+        with self._lock:
+            if self._frames is None:
+                raise ValueError("The ring is closed")
+            seq = self._next_seq
+            self._next_seq += 1
+            slot = seq % self.slots
+            timestamp = time.time() if timestamp is None else timestamp
+            self._seqs[slot] = -seq
+            self._frames[slot] = frame
+            self._times[slot] = timestamp
+            self._seqs[slot] = seq
+        return FrameRef(slot, seq, timestamp)
+
+    def valid(self, ref: FrameRef) -> bool:
+        """:return: whether the slot still holds the referred frame"""
+        return int(self._seqs[ref.slot]) == ref.seq
+
+    def get(self, ref: FrameRef, copy: bool = False) -> Optional[Any]:
+        """
+        :param ref: a FrameRef returned by put
+        :param copy: return a private copy instead of a view into shared memory
+        :return: the frame, None if it was already overwritten
+        """
+        if not self.valid(ref):
+            return None
+        frame = self._frames[ref.slot]
+        if copy:
+            frame = frame.copy()
+            # The slot may have been rewritten during the copy
+            if not self.valid(ref):
+                return None
+        return frame
+
+    def close(self) -> None:
+        """Detach from the shared memory, and free it if this ring created it. Closing twice does nothing."""
+        with self._lock:
+            if self._frames is None:
+                return
+            self._seqs = self._times = self._frames = None
+            self._shm.close()
+            if self.owner:
+                self._shm.unlink()
+
+    def __enter__(self) -> "SharedFrameRing":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,4 +1,8 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from threading import Thread
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
 
 
 def threaded(fn):
@@ -9,3 +13,45 @@ def threaded(fn):
         return thread
 
     return wrapper
+
+
+def split_time_range(start: datetime, end: datetime, step: timedelta) -> List[Tuple[datetime, datetime]]:
+    """
+    Split [start, end] into consecutive windows of at most `step`. Windows after the first start on a
+    multiple of step, counted from midnight, so day and hour windows line up with the calendar.
+    :return: [(window start, window end), ...]
+    """
+    if step <= timedelta(0):
+        raise ValueError("step must be positive")
+    windows = []
+    midnight = datetime.combine(start.date(), datetime.min.time(), tzinfo=start.tzinfo)
+    boundary = midnight + ((start - midnight) // step + 1) * step
+    while start < end:
+        window_end = min(boundary, end)
+        windows.append((start, window_end))
+        start, boundary = window_end, boundary + step
+    return windows
+
+
+def ordered_parallel_map(fn: Callable[[Any], Any], items: Iterable[Any], max_workers: int = 4) -> Iterator[Any]:
+    """
+    Lazily map fn over items on a thread pool, yielding the results in the order of items.
+    At most max_workers calls run at once and no more than that are started ahead of the consumer.
+    Closing the generator early cancels the calls that have not started.
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = deque()
+    items = iter(items)
+    try:
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= max_workers:
+                break
+        while pending:
+            result = pending.popleft().result()
+            for item in items:
+                pending.append(executor.submit(fn, item))
+                break
+            yield result
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
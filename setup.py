@@ -37,6 +37,9 @@ EXTRAS_REQUIRE = {
         'opencv-python==4.10.0.84',
         'Pillow==10.4.0',
     ],
+    'async': [
+        'aiohttp>=3.9.0',
+    ],
 }
 
 
@@ -0,0 +1,107 @@
+"""A minimal local stand-in for a camera's api.cgi endpoint, used by the offline tests."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import urlparse, parse_qs
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload: bytes, content_type: str = "application/json", headers: Dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        camera = self.server.camera
+        query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"[]")
+        with camera.lock:
+            camera.posts.append((query, body))
+        time.sleep(camera.delay)
+        self._send(200, json.dumps([camera.respond(command, query) for command in body]).encode())
+
+    def do_GET(self):
+        camera = self.server.camera
+        query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        with camera.lock:
+            camera.gets.append((query, dict(self.headers)))
+        if query.get("cmd") == "Snap":
+            self._send(200, camera.snapshot, content_type="image/jpeg")
+            return
+        content = camera.files.get(query.get("source"))
+        if content is None:
+            self._send(404, b"")
+            return
+        requested = self.headers.get("Range")
+        if camera.ranges and requested:
+            first, last = requested.split("=", 1)[1].split("-")
+            first, last = int(first), int(last) if last else len(content) - 1
+            if first >= len(content):
+                self._send(416, b"", headers={"Content-Range": f"bytes */{len(content)}"})
+                return
+            last = min(last, len(content) - 1)
+            self._send(206, content[first:last + 1], content_type="video/mp4",
+                       headers={"Content-Range": f"bytes {first}-{last}/{len(content)}"})
+            return
+        self._send(200, content, content_type="video/mp4")
+
+
+class FakeCamera:
+    """
+    Runs a threaded HTTP server on localhost answering Login, Logout and any command registered in `responses`.
+    Every request is recorded in `posts` / `gets` so tests can assert on what was sent.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.posts: List = []
+        self.gets: List = []
+        self.responses: Dict[str, Dict] = {}
+        self.files: Dict[str, bytes] = {}
+        # Whether downloads honour HTTP Range requests
+        self.ranges = True
+        self.snapshot = b""
+        self.token = "fake-token"
+        self.lease_time = 3600
+        self.logins = 0
+        # Seconds to wait before answering a POST
+        self.delay = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.camera = self
+        self.ip = f"127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self) -> "FakeCamera":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def respond(self, command: Dict, query: Dict) -> Dict:
+        cmd = command["cmd"]
+        if cmd == "Login":
+            self.logins += 1
+            return {"cmd": cmd, "code": 0,
+                    "value": {"Token": {"leaseTime": self.lease_time, "name": self.token}}}
+        if query.get("token") != self.token:
+            return {"cmd": cmd, "code": 1, "error": {"detail": "please login first", "rspCode": -6}}
+        if cmd in self.responses:
+            value = self.responses[cmd]
+            # A callable computes the answer from the command, eg: search results for the requested window
+            return {"cmd": cmd, "code": 0, "value": value(command) if callable(value) else value}
+        return {"cmd": cmd, "code": 0, "value": {"rspCode": 200}}
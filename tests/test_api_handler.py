@@ -0,0 +1,211 @@
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from time import monotonic
+from reolinkapi import Camera
+from reolinkapi.handlers.cache import ResponseCache
+from fake_camera import FakeCamera
+
+
+class TestAPIHandler(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.fake = FakeCamera().__enter__()
+        self.fake.responses["GetDevInfo"] = {"DevInfo": {"model": "RLC-411WS"}}
+        self.cam = Camera(self.fake.ip, "admin", "secret")
+
+    def tearDown(self) -> None:
+        self.cam.close()
+        self.fake.__exit__(None, None, None)
+
+    def test_login(self):
+        self.assertEqual(self.cam.token, "fake-token")
+        self.assertEqual(self.cam.get_information()[0]["value"]["DevInfo"]["model"], "RLC-411WS")
+
+    def test_transport_reuses_connections(self):
+        for _ in range(5):
+            self.cam.get_information()
+        stats = self.cam.transport.connection_stats()
+        self.assertEqual(stats["requests"], 6)
+        self.assertEqual(stats["connections"], 1)
+
+    def test_transport_is_per_camera(self):
+        other = Camera(self.fake.ip, "admin", "secret", proxy={"http": "socks5://127.0.0.1:1"}, defer_login=True)
+        self.assertIsNot(other.transport, self.cam.transport)
+        self.assertIsNone(self.cam.transport.proxies)
+
+    def test_batch(self):
+        self.fake.responses["GetOsd"] = {"Osd": {"bgcolor": 0}}
+        self.fake.responses["GetHddInfo"] = {"HddInfo": []}
+        with self.cam.batch() as b:
+            osd = b.get_osd()
+            ports = b.get_net_ports()
+            formatted = b.format_hdd()
+            b.get_hdd_info()
+        query, body = self.fake.posts[-1]
+        self.assertNotIn("cmd", query)
+        self.assertEqual([c["cmd"] for c in body], ["GetOsd", "GetNetPort", "GetUpnp", "GetP2p", "Format", "GetHddInfo"])
+        self.assertEqual(len(b.results), 4)
+        self.assertEqual(osd.result()[0]["value"], {"Osd": {"bgcolor": 0}})
+        self.assertEqual(len(ports.result()), 3)
+        self.assertTrue(formatted.result())
+        self.assertEqual(b.results[3][0]["cmd"], "GetHddInfo")
+
+    def test_relogin_on_rejected_token(self):
+        self.fake.token = "new-token"
+        self.assertEqual(self.cam.get_information()[0]["value"]["DevInfo"]["model"], "RLC-411WS")
+        self.assertEqual(self.cam.token, "new-token")
+        self.assertEqual(self.fake.logins, 2)
+
+    def test_single_flight_relogin(self):
+        self.fake.token = "new-token"
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cam.get_information())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(r[0]["code"] == 0 for r in results))
+        self.assertEqual(self.fake.logins, 2)
+
+    def test_refresh_before_lease_ends(self):
+        self.assertGreater(self.cam.token_ttl(), 3500)
+        self.cam._token_expires_at = monotonic() + 10
+        self.cam.get_information()
+        self.assertEqual(self.fake.logins, 2)
+        self.assertGreater(self.cam.token_ttl(), 3500)
+
+    def test_get_file_streams_to_disk(self):
+        content = os.urandom(300 * 1024)
+        self.fake.files["Mp4Record/clip.mp4"] = content
+        progress = []
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "clip.mp4")
+            self.assertTrue(self.cam.get_file("Mp4Record/clip.mp4", path, chunk_size=64 * 1024,
+                                              progress_callback=lambda done, total: progress.append((done, total))))
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), content)
+            self.assertEqual(os.listdir(tmp), ["clip.mp4"])
+            self.assertFalse(self.cam.get_file("Mp4Record/missing.mp4", os.path.join(tmp, "missing.mp4")))
+            self.assertEqual(os.listdir(tmp), ["clip.mp4"])
+        self.assertEqual(progress[-1], (len(content), len(content)))
+        self.assertGreater(len(progress), 1)
+        query, _ = self.fake.gets[0]
+        self.assertEqual((query["cmd"], query["source"]), ("Playback", "Mp4Record/clip.mp4"))
+        self.assertNotIn("chunk_size", query)
+
+    def test_get_file_resume(self):
+        content = os.urandom(200 * 1024)
+        self.fake.files["Mp4Record/clip.mp4"] = content
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "clip.mp4")
+            with open(path + ".part", "wb") as f:
+                f.write(content[:150 * 1024])
+            self.assertTrue(self.cam.get_file("Mp4Record/clip.mp4", path, resume=True))
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), content)
+            self.assertEqual(self.fake.gets[-1][1]["Range"], f"bytes={150 * 1024}-")
+            # a camera ignoring Range restarts from zero
+            self.fake.ranges = False
+            with open(path + ".part", "wb") as f:
+                f.write(b"garbage")
+            self.assertTrue(self.cam.get_file("Mp4Record/clip.mp4", path, resume=True))
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), content)
+
+    def test_get_file_resume_larger_part(self):
+        content = os.urandom(1024)
+        self.fake.files["Mp4Record/clip.mp4"] = content
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "clip.mp4")
+            # Left over from another recording with the same name: the camera answers 416
+            with open(path + ".part", "wb") as f:
+                f.write(os.urandom(4096))
+            self.assertTrue(self.cam.get_file("Mp4Record/clip.mp4", path, resume=True))
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), content)
+            self.assertEqual(os.listdir(tmp), ["clip.mp4"])
+            self.assertNotIn("Range", self.fake.gets[-1][1])
+
+    def test_get_file_parallel_ranges(self):
+        content = os.urandom(1024 * 1024 + 7)
+        self.fake.files["Mp4Record/clip.mp4"] = content
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "clip.mp4")
+            self.assertTrue(self.cam.get_file("Mp4Record/clip.mp4", path, parallel=4, chunk_size=64 * 1024))
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), content)
+            ranges = [headers.get("Range") for _, headers in self.fake.gets]
+            self.assertEqual(len(ranges), 5)
+            self.fake.ranges = False
+            os.remove(path)
+            self.assertTrue(self.cam.get_file("Mp4Record/clip.mp4", path, parallel=4, chunk_size=64 * 1024))
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), content)
+
+    def test_response_cache(self):
+        cam = Camera(self.fake.ip, "admin", "secret", cache=True)
+        self.fake.responses["GetOsd"] = {"Osd": {"bgcolor": 0}}
+        posts = len(self.fake.posts)
+        first = cam.get_osd()
+        first[0]["value"]["Osd"]["bgcolor"] = 1
+        self.assertEqual(cam.get_osd()[0]["value"]["Osd"]["bgcolor"], 0)
+        cam.get_net_ports()
+        cam.get_net_ports()
+        cam.get_recording_advanced()
+        cam.get_recording_advanced()
+        self.assertEqual(len(self.fake.posts) - posts, 4)
+        self.assertTrue(cam.set_osd())
+        cam.get_osd()
+        cam.get_net_ports()
+        self.assertEqual(len(self.fake.posts) - posts, 6)
+        self.assertEqual(cam.cache.hits, 3)
+        cam.close()
+
+    def test_response_cache_shared_by_cameras(self):
+        cache = ResponseCache()
+        with FakeCamera() as other:
+            self.fake.responses["GetDevInfo"] = {"DevInfo": {"serial": "first"}}
+            other.responses["GetDevInfo"] = {"DevInfo": {"serial": "second"}}
+            cameras = [Camera(fake.ip, "admin", "secret", cache=cache) for fake in (self.fake, other)]
+            serials = [cam.get_information()[0]["value"]["DevInfo"]["serial"] for cam in cameras * 2]
+            self.assertEqual(serials, ["first", "second", "first", "second"])
+            self.assertEqual(cache.hits, 2)
+            # A write only invalidates the answers of the camera it was sent to
+            cameras[0].reboot_camera()
+            self.assertEqual(len(cache), 1)
+            for cam in cameras:
+                cam.close()
+
+    def test_malformed_playback_files(self):
+        self.fake.responses["NvrDownload"] = {"fileList": [{"name": "RecM01_20240812_100000_100500_0_A.mp4"}]}
+        self.assertEqual(self.cam.get_playback_files(datetime(2024, 8, 12), datetime(2024, 8, 13)), [])
+
+    def test_codec(self):
+        from reolinkapi.utils.codec import JsonCodec
+
+        class CountingCodec(JsonCodec):
+            calls = 0
+
+            def loads(self, data):
+                CountingCodec.calls += 1
+                return super().loads(data)
+
+        cam = Camera(self.fake.ip, "admin", "secret", codec=CountingCodec())
+        self.fake.responses["GetDevName"] = {"DevName": {"name": "garage"}}
+        self.assertEqual(cam.get_device_name()[0]["value"]["DevName"]["name"], "garage")
+        self.assertEqual(CountingCodec.calls, 2)
+        auto = Camera(self.fake.ip, "admin", "secret", codec="auto")
+        self.assertIn(auto.transport.codec.name, ("orjson", "ujson", "json"))
+        self.assertTrue(auto.logout())
+        auto.close()
+        with self.assertRaises(ValueError):
+            Camera(self.fake.ip, "admin", "secret", codec="yaml", defer_login=True)
+        cam.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
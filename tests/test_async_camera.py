@@ -0,0 +1,73 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from reolinkapi import AsyncCamera
+from fake_camera import FakeCamera
+
+
+class TestAsyncCamera(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self) -> None:
+        self.fake = FakeCamera().__enter__()
+        self.fake.responses["GetDevInfo"] = {"DevInfo": {"model": "RLC-411WS"}}
+
+    def tearDown(self) -> None:
+        self.fake.__exit__(None, None, None)
+
+    async def test_commands(self):
+        async with AsyncCamera(self.fake.ip, "admin", "secret") as cam:
+            self.assertEqual(cam.token, "fake-token")
+            info = await cam.get_information()
+            self.assertEqual(info[0]["value"]["DevInfo"]["model"], "RLC-411WS")
+            # methods that post-process the response share the sync implementation
+            self.assertTrue(await cam.format_hdd())
+            self.assertTrue(await cam.add_user("foo", "bar"))
+
+    async def test_concurrent_commands_share_the_pool(self):
+        async with AsyncCamera(self.fake.ip, "admin", "secret", pool_size=4) as cam:
+            results = await asyncio.gather(*(cam.get_information() for _ in range(20)))
+            self.assertEqual(len(results), 20)
+            self.assertLessEqual(cam.transport.connection_stats()["connections"], 4)
+
+    async def test_single_flight_relogin(self):
+        async with AsyncCamera(self.fake.ip, "admin", "secret") as cam:
+            self.fake.token = "new-token"
+            results = await asyncio.gather(*(cam.get_information() for _ in range(8)))
+            self.assertTrue(all(r[0]["code"] == 0 for r in results))
+            self.assertEqual(self.fake.logins, 2)
+
+    async def test_get_file(self):
+        self.fake.files["Mp4Record/clip.mp4"] = b"\x00" * 1000
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "clip.mp4")
+            async with AsyncCamera(self.fake.ip, "admin", "secret") as cam:
+                self.assertTrue(await cam.get_file("Mp4Record/clip.mp4", path))
+            with open(path, "rb") as f:
+                self.assertEqual(len(f.read()), 1000)
+
+    async def test_get_file_parallel_ranges(self):
+        content = os.urandom(512 * 1024 + 3)
+        self.fake.files["Mp4Record/clip.mp4"] = content
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "clip.mp4")
+            async with AsyncCamera(self.fake.ip, "admin", "secret") as cam:
+                self.assertTrue(await cam.get_file("Mp4Record/clip.mp4", path, parallel=3, chunk_size=32 * 1024))
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), content)
+
+    async def test_get_file_resume_larger_part(self):
+        content = os.urandom(1024)
+        self.fake.files["Mp4Record/clip.mp4"] = content
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "clip.mp4")
+            with open(path + ".part", "wb") as f:
+                f.write(os.urandom(4096))
+            async with AsyncCamera(self.fake.ip, "admin", "secret") as cam:
+                self.assertTrue(await cam.get_file("Mp4Record/clip.mp4", path, resume=True))
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), content)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import asyncio
+import time
+import unittest
+from reolinkapi import AsyncCamera, Camera, CameraPool
+from fake_camera import FakeCamera
+
+
+class TestCameraPool(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.fakes = [FakeCamera().__enter__() for _ in range(4)]
+        for i, fake in enumerate(self.fakes):
+            fake.responses["GetDevInfo"] = {"DevInfo": {"serial": i}}
+            fake.delay = 0.3
+        self.fakes[3].delay = 2
+
+    def tearDown(self) -> None:
+        for fake in self.fakes:
+            fake.__exit__(None, None, None)
+
+    def test_call_runs_in_parallel_with_timeouts(self):
+        cameras = {f"cam{i}": Camera(fake.ip, "admin", "secret", defer_login=True)
+                   for i, fake in enumerate(self.fakes)}
+        with CameraPool(cameras, timeout=1.5) as pool:
+            start = time.monotonic()
+            result = pool.call("get_information")
+            elapsed = time.monotonic() - start
+        # login + command on every camera at once, the slow camera is cut off by the timeout
+        self.assertLess(elapsed, 1.9)
+        self.assertEqual(sorted(result.results), ["cam0", "cam1", "cam2"])
+        self.assertEqual(result.results["cam2"][0]["value"]["DevInfo"]["serial"], 2)
+        self.assertIsInstance(result.errors["cam3"], TimeoutError)
+        self.assertFalse(result.ok())
+
+    def test_timed_out_cameras_free_their_workers(self):
+        for fake in self.fakes[:2]:
+            fake.delay = 3
+        self.fakes[2].delay = 0.05
+        cameras = {f"cam{i}": Camera(fake.ip, "admin", "secret", defer_login=True)
+                   for i, fake in enumerate(self.fakes[:3])}
+        with CameraPool(cameras, max_workers=2, timeout=0.5) as pool:
+            start = time.monotonic()
+            result = pool.call("get_information")
+            elapsed = time.monotonic() - start
+        # The healthy camera queued behind the two silent ones is served once their requests time out
+        self.assertLess(elapsed, 2)
+        self.assertEqual(sorted(result.results), ["cam2"])
+        self.assertEqual(sorted(result.errors), ["cam0", "cam1"])
+
+    def test_acall(self):
+        pool = CameraPool([AsyncCamera(fake.ip, "admin", "secret") for fake in self.fakes[:3]])
+
+        async def run():
+            try:
+                return await pool.acall("get_information", timeout=1.5)
+            finally:
+                for camera in pool.cameras.values():
+                    await camera.close()
+        result = asyncio.run(run())
+        self.assertTrue(result.ok())
+        self.assertEqual(len(result.results), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from reolinkapi import Camera
+from reolinkapi.catalog import RecordingCatalog
+from reolinkapi.models import ResponseError
+from reolinkapi.utils.motion import to_epoch
+from fake_camera import FakeCamera
+
+
+def _file(day: int, hour: int) -> dict:
+    return {"StartTime": {"year": 2024, "mon": 8, "day": day, "hour": hour, "min": 0, "sec": 0},
+            "EndTime": {"year": 2024, "mon": 8, "day": day, "hour": hour, "min": 4, "sec": 59},
+            "name": f"Mp4Record/2024-08-{day:02}/RecS03_{hour:02}00.mp4", "size": 1024}
+
+
+class TestRecordingCatalog(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.fake = FakeCamera().__enter__()
+        self.fake.responses["Search"] = {"SearchResult": {"channel": 0, "File": [_file(12, 10), _file(13, 9)]}}
+        self.cam = Camera(self.fake.ip, "admin", "secret")
+
+    def tearDown(self) -> None:
+        self.cam.close()
+        self.fake.__exit__(None, None, None)
+
+    def _searches(self):
+        return [body[0]["param"]["Search"] for _, body in self.fake.posts if body[0]["cmd"] == "Search"]
+
+    def test_only_missing_windows_are_searched(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "catalog.db")
+            with RecordingCatalog(path) as catalog:
+                day = catalog.query(self.cam, datetime(2024, 8, 12), datetime(2024, 8, 13))
+                self.assertEqual([e.start for e in day], [datetime(2024, 8, 12, 10)])
+            with RecordingCatalog(path) as catalog:
+                catalog.query(self.cam, datetime(2024, 8, 12, 6), datetime(2024, 8, 12, 18))
+                self.assertEqual(len(self._searches()), 1)
+                two_days = catalog.query(self.cam, datetime(2024, 8, 12), datetime(2024, 8, 14))
+                self.assertEqual(len(two_days), 2)
+                delta = self._searches()[-1]
+                self.assertEqual((delta["StartTime"]["day"], delta["EndTime"]["day"]), (13, 14))
+                self.assertEqual(catalog.synced(self.cam),
+                                 [(to_epoch(datetime(2024, 8, 12)), to_epoch(datetime(2024, 8, 14)))])
+
+    def test_recent_window_is_searched_again(self):
+        catalog = RecordingCatalog(settle=600)
+        start = datetime.now() - timedelta(hours=1)
+        catalog.sync(self.cam, start)
+        catalog.sync(self.cam, start)
+        self.assertEqual(len(self._searches()), 2)
+        tail = self._searches()[1]["StartTime"]
+        tail = datetime(tail["year"], tail["mon"], tail["day"], tail["hour"], tail["min"], tail["sec"])
+        self.assertGreater(tail, start + timedelta(minutes=45))
+        catalog.close()
+
+    def test_playback_source(self):
+        self.fake.responses["NvrDownload"] = {"fileList": [{"fileName": "RecM01_20240812_100000.mp4"}]}
+        catalog = RecordingCatalog()
+        files = catalog.query(self.cam, datetime(2024, 8, 12), datetime(2024, 8, 13), source="playback")
+        self.assertEqual(files.filenames, ["RecM01_20240812_100000.mp4"])
+        catalog.close()
+
+    def test_failed_search_is_not_synced(self):
+        cam = Camera(self.fake.ip, "admin", "secret", auto_relogin=False)
+        self.fake.token = "rotated"
+        catalog = RecordingCatalog()
+        for source in RecordingCatalog.SOURCES:
+            with self.assertRaises(ResponseError):
+                catalog.query(cam, datetime(2024, 8, 12), datetime(2024, 8, 13), source=source)
+            self.assertEqual(catalog.synced(cam, source=source), [])
+        cam.login()
+        day = catalog.query(cam, datetime(2024, 8, 12), datetime(2024, 8, 13))
+        self.assertEqual([e.start for e in day], [datetime(2024, 8, 12, 10)])
+        catalog.close()
+        cam.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import threading
+import time
+import unittest
+from reolinkapi.utils.dispatch import DispatchOptions, FrameDispatcher
+
+
+def _square(value):
+    return value * value
+
+
+def _slow_square(value):
+    time.sleep(0.05)
+    return value * value
+
+
+class TestFrameDispatcher(unittest.TestCase):
+
+    def _blocked(self, policy: str):
+        """A dispatcher whose single worker is stuck on frame 0 until `release` is set."""
+        release = threading.Event()
+        seen = []
+
+        def callback(frame):
+            release.wait(5)
+            seen.append(frame)
+
+        dispatcher = FrameDispatcher(callback, workers=1, queue_size=2, policy=policy)
+        dispatcher.submit(0)
+        deadline = time.monotonic() + 5
+        while dispatcher.metrics()["queue_depth"] and time.monotonic() < deadline:
+            time.sleep(0.001)
+        return dispatcher, release, seen
+
+    def test_drop_oldest(self):
+        dispatcher, release, seen = self._blocked("drop_oldest")
+        for frame in range(1, 6):
+            self.assertTrue(dispatcher.submit(frame))
+        release.set()
+        dispatcher.close()
+        self.assertEqual(seen, [0, 4, 5])
+        metrics = dispatcher.metrics()
+        self.assertEqual((metrics["submitted"], metrics["dropped"], metrics["completed"]), (6, 3, 3))
+        self.assertEqual(metrics["max_queue_depth"], 2)
+
+    def test_drop_newest(self):
+        dispatcher, release, seen = self._blocked("drop_newest")
+        self.assertEqual([dispatcher.submit(frame) for frame in range(1, 6)], [True, True, False, False, False])
+        release.set()
+        dispatcher.close()
+        self.assertEqual(seen, [0, 1, 2])
+
+    def test_block(self):
+        seen = []
+        with FrameDispatcher(lambda frame: (time.sleep(0.002), seen.append(frame)), queue_size=1,
+                             policy="block") as dispatcher:
+            for frame in range(20):
+                dispatcher.submit(frame)
+        self.assertEqual(seen, list(range(20)))
+        self.assertEqual(dispatcher.metrics()["dropped"], 0)
+
+    def test_errors_counted(self):
+        with FrameDispatcher(lambda frame: 1 / frame, policy="block") as dispatcher:
+            for frame in (1, 0, 2):
+                dispatcher.submit(frame)
+        metrics = dispatcher.metrics()
+        self.assertEqual((metrics["completed"], metrics["errors"]), (2, 1))
+        self.assertFalse(dispatcher.submit(3))
+
+    def test_process_executor(self):
+        with FrameDispatcher(_square, workers=2, policy="block", executor="process") as dispatcher:
+            for frame in range(4):
+                dispatcher.submit(frame)
+        self.assertEqual(dispatcher.metrics()["completed"], 4)
+
+    def test_process_executor_close_without_waiting(self):
+        dispatcher = FrameDispatcher(_slow_square, workers=1, queue_size=4, policy="block", executor="process")
+        for frame in range(5):
+            dispatcher.submit(frame)
+        # The queued frames still reach the process pool
+        dispatcher.close(wait=False)
+        self.assertFalse(dispatcher.submit(5))
+        dispatcher.close()
+        metrics = dispatcher.metrics()
+        self.assertEqual((metrics["completed"], metrics["errors"]), (5, 0))
+
+    def test_close_while_submitting(self):
+        for _ in range(20):
+            dispatcher = FrameDispatcher(lambda frame: None, workers=2, queue_size=1, on_drop=lambda frame: None)
+            producer = threading.Thread(target=lambda: [dispatcher.submit(frame) for frame in range(2000)])
+            producer.start()
+            dispatcher.close(wait=False)
+            producer.join()
+            # Every worker got its stop marker: a marker dropped as the oldest frame would hang here
+            dispatcher.close()
+            self.assertFalse(any(worker.is_alive() for worker in dispatcher._workers))
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            FrameDispatcher(print, policy="drop_all")
+        with self.assertRaises(ValueError):
+            DispatchOptions(executor="fiber")
+
+    def test_from_options(self):
+        with FrameDispatcher.from_options(_square, DispatchOptions(workers=2, policy="block")) as dispatcher:
+            self.assertEqual(dispatcher.options, DispatchOptions(workers=2, policy="block"))
+            dispatcher.submit(3)
+        self.assertEqual(dispatcher.metrics()["completed"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
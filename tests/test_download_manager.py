@@ -0,0 +1,72 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from reolinkapi import DownloadManager
+
+
+class FakeCamera:
+    """Records the order of get_file calls and how many ran at once."""
+
+    def __init__(self, log, delay=0.05):
+        self.log = log
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def get_file(self, filename, output_path, **options):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            self.log.append(filename)
+        time.sleep(self.delay)
+        with open(output_path, "wb") as f:
+            f.write(filename.encode())
+        with self.lock:
+            self.running -= 1
+        return True
+
+
+class TestDownloadManager(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = []
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_priority_cancel_and_skip(self):
+        cam = FakeCamera(self.log)
+        with open(self.path("done.mp4"), "wb") as f:
+            f.write(b"x")
+        with DownloadManager(max_workers=1) as manager:
+            blocker = manager.submit(cam, "first", self.path("first.mp4"))
+            time.sleep(0.01)
+            low = manager.submit(cam, "low", self.path("low.mp4"), priority=5)
+            cancelled = manager.submit(cam, "cancelled", self.path("cancelled.mp4"), priority=1)
+            bumped = manager.submit(cam, "bumped", self.path("bumped.mp4"), priority=9)
+            skipped = manager.submit(cam, "done", self.path("done.mp4"))
+            self.assertTrue(manager.reprioritise(bumped, 0))
+            self.assertTrue(manager.cancel(cancelled))
+        self.assertEqual(self.log, ["first", "bumped", "low"])
+        self.assertTrue(blocker.result() and low.result() and bumped.result() and skipped.result())
+        self.assertTrue(cancelled.cancelled())
+
+    def test_concurrency_limits(self):
+        cams = [FakeCamera(self.log) for _ in range(3)]
+        with DownloadManager(max_workers=4, per_camera=2) as manager:
+            futures = [manager.submit(cam, f"{i}-{j}", self.path(f"{i}-{j}.mp4"))
+                       for i, cam in enumerate(cams) for j in range(4)]
+        self.assertTrue(all(f.result() for f in futures))
+        self.assertTrue(all(cam.max_running <= 2 for cam in cams))
+        self.assertEqual(len(self.log), 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
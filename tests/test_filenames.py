@@ -0,0 +1,46 @@
+import unittest
+from datetime import datetime
+from reolinkapi.utils.filenames import decode_filenames, decode_flags, parse_filename, MISSING
+
+V3 = "Mp4Record/2024-08-12/RecM13_DST20240812_214255_214348_1F1E828_4DDA4D.mp4"
+V9 = "Mp4Record_2024-09-13-RecS09_DST20240907_084519_084612_0_55289080000000_307BC0.mp4"
+
+
+class TestFilenames(unittest.TestCase):
+
+    def test_parse_v3(self):
+        name = parse_filename(V3)
+        self.assertEqual((name.stream, name.channel, name.version, name.dst), ("main", 1, 3, True))
+        self.assertEqual(name.start, datetime(2024, 8, 12, 21, 42, 55))
+        self.assertEqual(name.end, datetime(2024, 8, 12, 21, 43, 48))
+        self.assertEqual(name.size, 0x4DDA4D)
+        self.assertEqual(name.triggers, decode_flags("1F1E828"))
+        self.assertEqual(name.triggers["is_motion_record"], 1)
+
+    def test_parse_v9(self):
+        name = parse_filename(V9)
+        self.assertEqual((name.stream, name.channel, name.version, name.animal_type), ("sub", 0, 9, 0))
+        self.assertEqual(name.flags, 0x5528908)
+        self.assertEqual(name.size, 0x307BC0)
+
+    def test_midnight_and_invalid(self):
+        name = parse_filename("RecS03_20240812_235800_000200_1F1E828_100.mp4")
+        self.assertEqual(name.end, datetime(2024, 8, 13, 0, 2))
+        self.assertIsNone(parse_filename("snapshot.jpg"))
+
+    def test_bulk_decode(self):
+        person = "RecM03_20240812_100000_100500_{:X}_100.mp4".format(1 << 10 | 1 << 3)
+        vehicle = "RecM03_20240812_110000_110500_{:X}_100.mp4".format(1 << 8 | 1 << 3)
+        table = decode_filenames([V3, person, "garbage.mp4", vehicle, V9])
+        self.assertEqual(len(table), 4)
+        self.assertEqual(table.invalid, ["garbage.mp4"])
+        self.assertEqual(table.filter(ai_pd=1).filenames, [person])
+        self.assertEqual(table.select(is_motion_record=1, ai_vd=1), [2, 3])
+        self.assertEqual(table[0].start, parse_filename(V3).start)
+        self.assertEqual(table[1].triggers["ai_pd"], 1)
+        legacy = decode_filenames(["RecM01_20240812_100000_100500_ABC.mp4"])
+        self.assertEqual(list(legacy.flag("ai_pd")), [MISSING])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import threading
+import unittest
+import cv2
+import numpy as np
+from reolinkapi.utils.frame_pool import FramePool, FrameTransform
+
+
+class TestFramePool(unittest.TestCase):
+
+    def test_recycles_buffers(self):
+        pool = FramePool(2, (4, 6, 3))
+        first = pool.acquire()
+        second = pool.acquire()
+        self.assertIsNot(first.array, second.array)
+        self.assertEqual(pool.available, 0)
+        self.assertIsNone(pool.acquire(timeout=0.01))
+        array = first.array
+        with first:
+            pass
+        first.release()  # releasing twice gives the buffer back once
+        self.assertEqual(pool.available, 1)
+        self.assertIs(pool.acquire().array, array)
+        self.assertEqual(pool.waits, 1)
+
+    def test_acquire_waits_for_release(self):
+        pool = FramePool(1, (2, 2))
+        held = pool.acquire()
+        threading.Timer(0.02, held.release).start()
+        self.assertIsNotNone(pool.acquire(timeout=5))
+
+    def test_allocate_later(self):
+        pool = FramePool(3)
+        with self.assertRaises(ValueError):
+            pool.acquire()
+        pool.allocate((2, 3))
+        self.assertEqual(pool.acquire().shape, (2, 3))
+
+
+class TestFrameTransform(unittest.TestCase):
+
+    def setUp(self):
+        self.frame = np.random.randint(0, 255, (40, 60, 3), dtype=np.uint8)
+
+    def test_resize_in_place(self):
+        transform = FrameTransform(size=(30, 20))
+        dst = np.empty(transform.output_shape(self.frame.shape), dtype=np.uint8)
+        self.assertIs(transform.apply(self.frame, dst), dst)
+        np.testing.assert_array_equal(dst, cv2.resize(self.frame, (30, 20)))
+
+    def test_resize_and_convert(self):
+        transform = FrameTransform(size=(30, 20), color=cv2.COLOR_BGR2GRAY)
+        shape = transform.output_shape(self.frame.shape)
+        self.assertEqual(shape, (20, 30))
+        # Computed once per input shape, not for every frame
+        self.assertIs(transform.output_shape(self.frame.shape), shape)
+        dst = np.empty(shape, dtype=np.uint8)
+        transform.apply(self.frame, dst)
+        np.testing.assert_array_equal(dst, cv2.cvtColor(cv2.resize(self.frame, (30, 20)), cv2.COLOR_BGR2GRAY))
+        resized = transform._resized
+        transform.apply(self.frame, dst)
+        # The intermediate buffer is reused
+        self.assertIs(transform._resized, resized)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,19 @@
+import os
+import subprocess
+import sys
+import unittest
+
+
+class TestImports(unittest.TestCase):
+
+    def test_optional_dependencies_are_lazy(self):
+        root = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+        script = "import sys, reolinkapi; print(','.join(m for m in ('cv2', 'PIL', 'numpy', 'aiohttp') " \
+                 "if m in sys.modules))"
+        out = subprocess.run([sys.executable, "-c", script], env=dict(os.environ, PYTHONPATH=root),
+                             check=True, capture_output=True, text=True)
+        self.assertEqual(out.stdout.strip(), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
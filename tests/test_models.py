@@ -0,0 +1,68 @@
+import json
+import os
+import unittest
+from datetime import datetime
+from reolinkapi.models import DevInfo, Enc, HddInfo, Performance, ResponseError, SearchResult, Ability, \
+    from_response
+
+RESPONSES = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "examples", "response")
+
+
+def _load(name: str):
+    with open(os.path.join(RESPONSES, name)) as f:
+        return json.load(f)
+
+
+class TestModels(unittest.TestCase):
+
+    def test_dev_info(self):
+        info = DevInfo.from_response(_load("GetDevInfo.json"))
+        self.assertEqual(info.model, "RLC-411WS")
+        self.assertEqual(info.channel_num, 1)
+        self.assertFalse(hasattr(info, "__dict__"))
+        with self.assertRaises(AttributeError):
+            info.model = "other"
+
+    def test_hdd_and_performance(self):
+        hdd, = from_response(_load("GetHddInfo.json"))
+        self.assertIsInstance(hdd, HddInfo)
+        self.assertTrue(hdd.mounted)
+        self.assertEqual(Performance.from_response(_load("GetPerformance.json")).cpu_used, 14)
+
+    def test_enc(self):
+        response = _load("GetEnc.json")
+        response[0]["value"] = response[0]["initial"]
+        enc = Enc.from_response(response)
+        self.assertEqual(enc.main_stream.resolution, (3072, 1728))
+        self.assertEqual(enc.sub_stream.bit_rate, 160)
+
+    def test_search(self):
+        time = {"year": 2024, "mon": 8, "day": 12, "hour": 10, "min": 0, "sec": 5}
+        response = [{"cmd": "Search", "code": 0, "value": {"SearchResult": {
+            "channel": 0,
+            "File": [{"name": "a.mp4", "StartTime": time, "EndTime": dict(time, min=4), "size": "1024",
+                      "type": "main", "width": 2560, "height": 1440, "frameRate": 0}],
+            "Status": [{"year": 2024, "mon": 8, "table": "0000000000010"}],
+        }}}]
+        result = SearchResult.from_response(response)
+        self.assertEqual(result.files[0].start, datetime(2024, 8, 12, 10, 0, 5))
+        self.assertEqual(result.files[0].size, 1024)
+        self.assertEqual(result.status[0].days(), [12])
+
+    def test_ability(self):
+        response = [{"cmd": "GetAbility", "code": 0, "value": {"Ability": {
+            "push": {"permit": 6, "ver": 1},
+            "abilityChn": [{"ptzCtrl": {"permit": 6, "ver": 0}, "supportAi": {"permit": 6, "ver": 1}}],
+        }}}]
+        ability = Ability.from_response(response)
+        self.assertTrue(ability.supports("push"))
+        self.assertFalse(ability.supports("ptzCtrl", channel=0))
+        self.assertIs(ability.device["push"], ability.channels[0]["supportAi"])
+
+    def test_error(self):
+        with self.assertRaises(ResponseError):
+            DevInfo.from_response([{"cmd": "GetDevInfo", "code": 1, "error": {"rspCode": -6}}])
+
+
+if __name__ == '__main__':
+    unittest.main()
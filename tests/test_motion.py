@@ -0,0 +1,83 @@
+import copy
+import time
+import unittest
+from datetime import datetime, timedelta
+from reolinkapi import Camera
+from reolinkapi.mixins.motion import MotionAPIMixin
+from reolinkapi.utils.motion import MotionEvents, to_epoch
+from reolinkapi.utils.util import ordered_parallel_map, split_time_range
+from fake_camera import FakeCamera
+
+
+def _file(day: int, hour: int, minute: int) -> dict:
+    return {"StartTime": {"year": 2024, "mon": 8, "day": day, "hour": hour, "min": minute, "sec": 0},
+            "EndTime": {"year": 2024, "mon": 8, "day": day, "hour": hour, "min": minute + 4, "sec": 59},
+            "name": f"Mp4Record/2024-08-{day:02}/RecS03_{hour:02}{minute:02}.mp4", "size": "1024"}
+
+
+class TestMotion(unittest.TestCase):
+
+    def test_parsers_do_not_mutate(self):
+        files = [_file(12, 10, 0), _file(12, 9, 0)]
+        raw = copy.deepcopy(files)
+        legacy = MotionAPIMixin._process_motion_files(files)
+        events = MotionEvents.from_search(files)
+        self.assertEqual(files, raw)
+        self.assertEqual(legacy[0]["start"], datetime(2024, 8, 12, 10, 0))
+        self.assertEqual(events[0].start, datetime(2024, 8, 12, 9, 0))
+        self.assertEqual(events[1].duration, 299)
+        self.assertEqual(sorted(legacy, key=lambda e: e["start"]), events.to_dicts())
+
+    def test_between(self):
+        events = MotionEvents.from_search([_file(12, h, m) for h in range(24) for m in range(0, 60, 10)])
+        window = events.between(datetime(2024, 8, 12, 10, 2), datetime(2024, 8, 12, 11, 0))
+        self.assertEqual([e.start.strftime("%H%M") for e in window], ["1000", "1010", "1020", "1030", "1040", "1050"])
+        self.assertEqual(len(events.between(to_epoch(datetime(2024, 8, 13)))), 0)
+        self.assertEqual(len(MotionEvents.concat([events[:10], events[10:]])), len(events))
+
+    def test_get_motion_events(self):
+        with FakeCamera() as fake:
+            fake.responses["Search"] = {"SearchResult": {"channel": 0, "File": [_file(12, 10, 0)]}}
+            cam = Camera(fake.ip, "admin", "secret")
+            events = cam.get_motion_events(datetime(2024, 8, 12), datetime(2024, 8, 13))
+            self.assertEqual(events[0].filename, "Mp4Record/2024-08-12/RecS03_1000.mp4")
+            self.assertEqual(events[0].size, 1024)
+            self.assertEqual(cam.get_motion_files(datetime(2024, 8, 12))[0]["end"], datetime(2024, 8, 12, 10, 4, 59))
+            cam.close()
+
+    def test_split_and_ordered_map(self):
+        windows = split_time_range(datetime(2024, 8, 12, 10, 30), datetime(2024, 8, 14, 3), timedelta(days=1))
+        self.assertEqual([w[0].day for w in windows], [12, 13, 14])
+        self.assertEqual(windows[1], (datetime(2024, 8, 13), datetime(2024, 8, 14)))
+
+        def slow_square(x):
+            time.sleep(0.05 * (5 - x))
+            return x * x
+        self.assertEqual(list(ordered_parallel_map(slow_square, range(5), max_workers=3)), [0, 1, 4, 9, 16])
+
+    def test_iter_motion_events(self):
+        # One clip every 6 hours over three days, plus one crossing midnight between the 12th and the 13th
+        clips = [_file(day, hour, 0) for day in (12, 13, 14) for hour in (0, 6, 12, 18)]
+        clips.append({"StartTime": {"year": 2024, "mon": 8, "day": 12, "hour": 23, "min": 58, "sec": 0},
+                      "EndTime": {"year": 2024, "mon": 8, "day": 13, "hour": 0, "min": 2, "sec": 0},
+                      "name": "Mp4Record/2024-08-12/RecS03_2358.mp4", "size": "1024"})
+        events = MotionEvents.from_search(clips)
+
+        def search(command):
+            params = command["param"]["Search"]
+            window = events.between(*(datetime(t["year"], t["mon"], t["day"], t["hour"], t["min"], t["sec"])
+                                      for t in (params["StartTime"], params["EndTime"])))
+            # Answer out of order, the parser sorts
+            return {"SearchResult": {"channel": 0, "File": [c for c in clips if c["name"] in window.filenames][::-1]}}
+
+        with FakeCamera() as fake:
+            fake.responses["Search"] = search
+            cam = Camera(fake.ip, "admin", "secret")
+            found = list(cam.iter_motion_events(datetime(2024, 8, 12), datetime(2024, 8, 15), max_workers=3))
+            self.assertEqual(found, list(events))
+            self.assertEqual(sum(1 for _, body in fake.posts if body[0]["cmd"] == "Search"), 3)
+            cam.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,369 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import unittest
+import cv2
+import numpy as np
+from reolinkapi.utils.dispatch import DispatchOptions
+from reolinkapi.utils.multiplexer import FrameMultiplexer
+from reolinkapi.utils.rtsp_client import RtspClient, _CaptureOptions
+from reolinkapi.utils.shared_frames import SharedFrameRing
+
+
+class FakeCapture:
+    """Stands in for cv2.VideoCapture: produces numbered frames, each one `interval` seconds after the previous."""
+
+    def __init__(self, frames: int = 1000, interval: float = 0.0, shape=(4, 6, 3), end: str = "close"):
+        self.frames = frames
+        self.interval = interval
+        self.shape = shape
+        # "close": the camera ends the stream after the frames, "freeze": reads fail but the stream stays open
+        self.end = end
+        self.reads = 0
+        self.index = 0
+        self.opened = True
+        self.lock = threading.Lock()
+        self.released_by = None
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self, image=None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def grab(self):
+        time.sleep(self.interval)
+        with self.lock:
+            self.reads += 1
+            if self.index >= self.frames:
+                if self.end == "freeze":
+                    return False
+                # The camera ended the stream
+                self.opened = False
+            if not self.opened:
+                return False
+            self.index += 1
+        return True
+
+    def retrieve(self, image=None):
+        frame = np.full(self.shape, self.index % 256, dtype=np.uint8) if image is None else image
+        frame[...] = self.index % 256
+        return True, frame
+
+    def get(self, prop):
+        # Only CAP_PROP_LRF_HAS_KEY_FRAME is asked for: a key frame every 5 frames
+        return float(self.index % 5 == 1)
+
+    def release(self):
+        self.opened = False
+        self.released_by = threading.current_thread()
+
+
+def _sum_shared_frames(spec, refs, results):
+    ring = SharedFrameRing.attach(*spec)
+    for _ in range(3):
+        ref = refs.get(timeout=5)
+        results.put((ref.seq, int(ring.get(ref).sum()) if ring.valid(ref) else None))
+    ring.close()
+
+
+class FakeRtspClient(RtspClient):
+
+    def __init__(self, *captures: FakeCapture, **kwargs):
+        # Each (re)connection opens the next capture, the last one is kept once they are used up
+        self.fake_captures = list(captures) or [FakeCapture()]
+        super().__init__("127.0.0.1", "admin", "secret", **kwargs)
+
+    def _open_video_capture(self):
+        self.capture = self.fake_captures.pop(0) if len(self.fake_captures) > 1 else self.fake_captures[0]
+
+
+class TestRtspClient(unittest.TestCase):
+
+    def test_blocking(self):
+        client = FakeRtspClient(FakeCapture(frames=3))
+        self.assertEqual([int(f[0, 0, 0]) for f in client.open_stream()], [1, 2, 3])
+
+    def test_reconnect_after_stall(self):
+        client = FakeRtspClient(FakeCapture(frames=3, end="freeze"), FakeCapture(frames=2), reconnect=True,
+                                stall_timeout=0.05, backoff=0.01, max_reconnects=1)
+        self.assertEqual([int(f[0, 0, 0]) for f in client.open_stream()], [1, 2, 3, 1, 2])
+        stats = client.stats()
+        self.assertEqual((stats["stalls"], stats["reconnects"]), (1, 1))
+
+    def test_stall_without_reconnect(self):
+        capture = FakeCapture(frames=2, end="freeze")
+        client = FakeRtspClient(capture, stall_timeout=0.1)
+        started = time.monotonic()
+        self.assertEqual(len(list(client.open_stream())), 2)
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(client.stats()["stalls"], 1)
+        # Failed reads are spaced out instead of spinning
+        self.assertLess(capture.reads, 50)
+        self.assertFalse(capture.isOpened())
+
+    def test_reconnect_after_failed_open(self):
+        client = FakeRtspClient(FakeCapture(frames=1), FakeCapture(frames=2), reconnect=True, backoff=0.01,
+                                max_reconnects=2)
+        opens = []
+        fake_open = client._open_video_capture
+
+        def reopen():
+            opens.append(1)
+            if len(opens) == 1:
+                raise ConnectionError("ffprobe could not open the stream")
+            fake_open()
+        client._open_video_capture = reopen
+        self.assertEqual([int(f[0, 0, 0]) for f in client.open_stream()], [1, 1, 2])
+        # The failed open counts as an attempt, then the second capture ends and reconnecting gives up
+        self.assertEqual((len(opens), client.stats()["reconnects"]), (4, 1))
+
+    def test_reconnect_gives_up(self):
+        closed = FakeCapture(frames=0)
+        closed.opened = False  # the camera refuses the connection
+        client = FakeRtspClient(FakeCapture(frames=1), closed, reconnect=True, backoff=0.01, max_reconnects=2)
+        self.assertEqual(len(list(client.open_stream())), 1)
+        self.assertEqual(client.stats()["reconnects"], 0)
+
+    def test_read_error_ends_latest_stream(self):
+        capture = FakeCapture(frames=2)
+        client = FakeRtspClient(capture, latest=True)
+
+        def read(image=None):
+            raise RuntimeError("decoder error")
+        capture.read = read
+        client.start_reader()
+        started = time.monotonic()
+        while client.read_latest(timeout=5) is not None:
+            pass
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertTrue(client.thread_cancelled)
+
+    def test_capture_options(self):
+        client = FakeRtspClient(use_udp=False, low_latency=True, capture_options={"probesize": 500000})
+        options = client._ffmpeg_options()
+        self.assertTrue(options.startswith("rtsp_transport;tcp|fflags;nobuffer|"))
+        self.assertIn("|probesize;500000|", options)
+        self.assertEqual(FakeRtspClient()._ffmpeg_options(), "rtsp_transport;udp")
+
+    def test_capture_options_scoped_to_open(self):
+        scope = _CaptureOptions()
+        previous = os.environ.get(scope.VARIABLE)
+        os.environ[scope.VARIABLE] = "before"
+        try:
+            scope.acquire("rtsp_transport;udp")
+            # Same options open concurrently
+            scope.acquire("rtsp_transport;udp")
+            self.assertEqual(os.environ[scope.VARIABLE], "rtsp_transport;udp")
+            seen = []
+            other = threading.Thread(target=lambda: (scope.acquire("rtsp_transport;tcp"),
+                                                     seen.append(os.environ[scope.VARIABLE]), scope.release()))
+            other.start()
+            time.sleep(0.05)
+            # Other options wait for the opens in progress
+            self.assertEqual(seen, [])
+            scope.release()
+            scope.release()
+            other.join(5)
+            self.assertEqual(seen, ["rtsp_transport;tcp"])
+            self.assertEqual(os.environ[scope.VARIABLE], "before")
+        finally:
+            if previous is None:
+                os.environ.pop(scope.VARIABLE, None)
+            else:
+                os.environ[scope.VARIABLE] = previous
+
+    def test_callback_workers(self):
+        seen = []
+        done = threading.Event()
+
+        def callback(frame):
+            time.sleep(0.002)
+            seen.append(int(frame[0, 0, 0]))
+            if len(seen) == 10:
+                done.set()
+
+        client = FakeRtspClient(FakeCapture(frames=10), callback=callback,
+                                dispatch=DispatchOptions(workers=1, queue_size=10, policy="block"))
+        client.open_stream()
+        self.assertTrue(done.wait(5))
+        client.dispatcher.close()
+        self.assertEqual(seen, list(range(1, 11)))
+        self.assertEqual(client.stats()["callback_completed"], 10)
+
+    def test_frame_pool(self):
+        client = FakeRtspClient(FakeCapture(frames=6), pool_size=2)
+        values, buffers = [], set()
+        for frame in client.open_stream():
+            with frame:
+                values.append(int(frame.array[0, 0, 0]))
+                buffers.add(id(frame.array))
+        self.assertEqual(values, [1, 2, 3, 4, 5, 6])
+        self.assertLessEqual(len(buffers), 2)
+
+    def test_frame_pool_transform(self):
+        client = FakeRtspClient(FakeCapture(frames=3), pool_size=2, resize=(3, 2), color=cv2.COLOR_BGR2GRAY)
+        stream = client.open_stream()
+        frames = [next(stream), next(stream)]
+        self.assertEqual([f.shape for f in frames], [(2, 3), (2, 3)])
+        self.assertEqual([int(f.array[0, 0]) for f in frames], [1, 2])
+        # Both buffers are held: the next frame waits until one is released
+        threading.Timer(0.05, frames[0].release).start()
+        self.assertEqual(int(next(stream).array[0, 0]), 3)
+        self.assertEqual(client.stats()["pool_waits"], 1)
+        client.stop_stream()
+
+    def test_dropped_pooled_frames_released(self):
+        release = threading.Event()
+        client = FakeRtspClient(FakeCapture(frames=20), callback=lambda frame: (release.wait(5), frame.release()),
+                                dispatch=DispatchOptions(workers=1, queue_size=1), pool_size=3)
+        client.open_stream()
+        deadline = time.monotonic() + 5
+        while not client.thread_cancelled and time.monotonic() < deadline:
+            time.sleep(0.005)
+        release.set()
+        client.dispatcher.close()
+        # Only the frame being processed and the queued one were held, dropped ones went back to the pool
+        self.assertEqual(client.frames_read, 20)
+        self.assertEqual(client.pool.available, 3)
+
+    def test_latest_frame(self):
+        client = FakeRtspClient(FakeCapture(frames=200, interval=0.002), latest=True, buffer_size=4)
+        stream = client.open_stream()
+        first = next(stream)
+        time.sleep(0.1)
+        second = next(stream)
+        self.assertGreater(int(second[0, 0, 0]) - int(first[0, 0, 0]), 5)
+        self.assertGreater(client.stats()["frames_dropped"], 5)
+        self.assertEqual(len(client.recent_frames()), 4)
+        client.stop_stream()
+        self.assertEqual(list(stream), [])
+
+    def test_stop_stream_leaves_release_to_reader(self):
+        capture = FakeCapture(frames=1000, interval=0.01)
+        client = FakeRtspClient(capture, latest=True)
+        stream = client.open_stream()
+        next(stream)
+        client.stop_stream()
+        client._reader.join(5)
+        # Released by the reading thread once its read returned, not under it by the consumer
+        self.assertIs(capture.released_by, client._reader)
+        self.assertFalse(capture.isOpened())
+
+    def test_sample_fps(self):
+        client = FakeRtspClient(FakeCapture(frames=40, interval=0.005), sample_fps=50)
+        frames = list(client.open_stream())
+        stats = client.stats()
+        self.assertLess(len(frames), 30)
+        self.assertEqual(stats["frames_grabbed"], 40)
+        self.assertEqual(stats["frames_skipped"], 40 - len(frames))
+        self.assertGreaterEqual(stats["cpu_saved_seconds"], 0)
+
+    def test_keyframes_only(self):
+        client = FakeRtspClient(FakeCapture(frames=12), keyframes_only=True)
+        self.assertEqual([int(f[0, 0, 0]) for f in client.open_stream()], [1, 6, 11])
+        self.assertEqual(client.stats()["frames_skipped"], 9)
+        # One decoding thread, so that the key frame flag describes the frame retrieved
+        params = client._capture_params()
+        self.assertEqual(params[params.index(cv2.CAP_PROP_N_THREADS) + 1], 1)
+        self.assertNotIn(cv2.CAP_PROP_N_THREADS, FakeRtspClient()._capture_params())
+
+    def test_multiplexer(self):
+        clients = {
+            "front": FakeRtspClient(FakeCapture(frames=1000, interval=0.005)),
+            "garage": FakeRtspClient(FakeCapture(frames=1000, interval=0.005, shape=(8, 12, 3))),
+            "gone": FakeRtspClient(FakeCapture(frames=2, interval=0.005)),
+        }
+        with FrameMultiplexer(clients, fps=20, max_age=0.1) as mux:
+            self.assertTrue(mux.wait_ready(timeout=2))
+            time.sleep(0.2)
+            batch = next(iter(mux))
+        self.assertEqual(batch.frames.shape, (3, 4, 6, 3))
+        self.assertEqual(batch.names, ["front", "garage", "gone"])
+        self.assertEqual(batch.missing.tolist(), [False, False, True])
+        self.assertTrue(np.isnan(batch.timestamps[2]))
+        self.assertFalse(batch.frames[2].any())
+        self.assertTrue(batch.frames[1].any())
+
+    def test_multiplexer_clients(self):
+        same_ip = [FakeRtspClient(), FakeRtspClient()]
+        with self.assertRaises(ValueError):
+            FrameMultiplexer(same_ip)
+        with self.assertRaises(ValueError):
+            FrameMultiplexer({"pooled": FakeRtspClient(pool_size=2)})
+        # Channels behind one ip are named by the caller
+        with FrameMultiplexer({"ch1": same_ip[0], "ch2": same_ip[1]}) as mux:
+            self.assertTrue(mux.wait_ready(timeout=2))
+            self.assertEqual(mux.batch().names, ["ch1", "ch2"])
+        gray = FakeRtspClient(FakeCapture(shape=(8, 12, 3)), color=cv2.COLOR_BGR2GRAY)
+        with FrameMultiplexer([gray], size=(6, 4)) as mux:
+            self.assertTrue(mux.wait_ready(timeout=2))
+            self.assertEqual(mux.batch().frames.shape, (1, 4, 6))
+
+    def test_shared_frame_ring(self):
+        with SharedFrameRing.create(slots=2, shape=(2, 2, 3)) as ring:
+            first = ring.put(np.full((2, 2, 3), 7, dtype=np.uint8))
+            attached = SharedFrameRing.attach(*ring.spec)
+            self.assertEqual(int(attached.get(first)[0, 0, 0]), 7)
+            copy = attached.get(first, copy=True)
+            ring.put(np.zeros((2, 2, 3), dtype=np.uint8))
+            ring.put(np.zeros((2, 2, 3), dtype=np.uint8))
+            self.assertIsNone(attached.get(first))
+            self.assertEqual(int(copy[0, 0, 0]), 7)
+            attached.close()
+            with self.assertRaises(ValueError):
+                ring.put(np.zeros((3, 3, 3), dtype=np.uint8))
+
+    def test_shared_stream_to_process(self):
+        context = multiprocessing.get_context("fork")
+        refs, results = context.Queue(maxsize=3), context.Queue()
+        client = FakeRtspClient(FakeCapture(frames=3, interval=0.01))
+        ring = client.open_shared_stream(refs, slots=8)
+        worker = context.Process(target=_sum_shared_frames, args=(ring.spec, refs, results))
+        worker.start()
+        sums = sorted(results.get(timeout=10) for _ in range(3))
+        worker.join(timeout=10)
+        self.assertEqual(sums, [(1, 72), (2, 144), (3, 216)])
+        ring.close()
+
+    def test_shared_stream_ends_on_resolution_change(self):
+        client = FakeRtspClient(FakeCapture(frames=2), FakeCapture(frames=100, shape=(8, 12, 3)), reconnect=True,
+                                backoff=0.01)
+        refs = queue.Queue()
+        ring = client.open_shared_stream(refs, slots=4)
+        deadline = time.monotonic() + 5
+        while not client.thread_cancelled and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(client.thread_cancelled)
+        self.assertFalse(client.capture.isOpened())
+        self.assertEqual((refs.qsize(), client.frames_dropped), (2, 1))
+        ring.close()
+
+    def test_shared_stream_ends_when_ring_closed(self):
+        capture = FakeCapture(frames=1000, interval=0.005)
+        client = FakeRtspClient(capture)
+        ring = client.open_shared_stream(queue.Queue(), slots=4)
+        ring.close()
+        client._reader.join(5)
+        self.assertFalse(client._reader.is_alive())
+        self.assertTrue(client.thread_cancelled)
+        self.assertFalse(capture.isOpened())
+        with self.assertRaises(ValueError):
+            ring.put(np.zeros((4, 6, 3), dtype=np.uint8))
+        ring.close()
+
+    def test_shared_stream_drops_when_queue_full(self):
+        refs = queue.Queue(maxsize=2)
+        client = FakeRtspClient(FakeCapture(frames=5))
+        ring = client.open_shared_stream(refs, slots=8)
+        time.sleep(0.2)
+        self.assertEqual((refs.qsize(), client.frames_dropped), (2, 3))
+        ring.close()
+
+
+if __name__ == '__main__':
+    unittest.main()